@@ -0,0 +1,108 @@
+import functools
+import json
+
+from celery import shared_task
+from django.conf import settings
+
+from social_media_api.lazy import lazy_import
+
+redis = lazy_import("redis")
+
+
+class BatchedTask:
+    """
+    Buffers small work items in a Redis list and hands them to the wrapped
+    function in one task execution. A flush runs ``flush_after`` seconds
+    after the first buffered item, or right away once ``max_size`` items
+    wait. When Redis is down every item gets its own task instead.
+    """
+
+    redis_client = None
+
+    def __init__(self, func, max_size, flush_after, task_options):
+        self.func = func
+        self.max_size = max_size
+        self.flush_after = flush_after
+        self.name = f"{func.__module__}.{func.__name__}"
+        self.key = f"batch:{self.name}"
+        self.scheduled_key = f"{self.key}:scheduled"
+
+        def run(items=None):
+            return self.flush(items)
+
+        functools.update_wrapper(run, func)
+        self.task = shared_task(name=self.name, **task_options)(run)
+        functools.update_wrapper(self, func)
+
+    @classmethod
+    def get_redis(cls):
+        if BatchedTask.redis_client is None:
+            BatchedTask.redis_client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=0.1,
+                socket_connect_timeout=0.1,
+            )
+        return BatchedTask.redis_client
+
+    def __call__(self, items):
+        return self.func(items)
+
+    def enqueue(self, item) -> None:
+        try:
+            with self.get_redis().pipeline() as pipe:
+                pipe.rpush(self.key, json.dumps(item))
+                # Expires so a lost flush can't stop the batch from being scheduled
+                pipe.set(self.scheduled_key, 1, nx=True, ex=self.flush_after * 10)
+                length, scheduled = pipe.execute()
+        except redis.exceptions.RedisError:
+            self.task.delay([item])
+            return
+        if length >= self.max_size:
+            self.task.delay()
+        elif scheduled:
+            self.task.apply_async(countdown=self.flush_after)
+
+    def flush(self, items=None):
+        raw_items = []
+        if items is None:
+            client = self.get_redis()
+            client.delete(self.scheduled_key)
+            with client.pipeline() as pipe:
+                pipe.lrange(self.key, 0, self.max_size - 1)
+                pipe.ltrim(self.key, self.max_size, -1)
+                raw_items, _ = pipe.execute()
+            items = [json.loads(item) for item in raw_items]
+            if client.llen(self.key):
+                self.task.delay()
+        if not items:
+            return None
+        try:
+            return self.func(items)
+        except Exception:
+            if raw_items:
+                self.requeue(raw_items)
+            raise
+
+    def requeue(self, raw_items) -> None:
+        """Put a failed batch back at the head of the list and schedule a retry"""
+        try:
+            with self.get_redis().pipeline() as pipe:
+                pipe.lpush(self.key, *reversed(raw_items))
+                pipe.set(self.scheduled_key, 1, nx=True, ex=self.flush_after * 10)
+                _, scheduled = pipe.execute()
+        except redis.exceptions.RedisError:
+            return
+        if scheduled:
+            self.task.apply_async(countdown=self.flush_after)
+
+
+def batched_task(max_size=100, flush_after=5, **task_options):
+    """
+    Turn ``func(items)`` into a task fed item by item with ``func.enqueue(item)``.
+    Items must be JSON serializable.
+    """
+
+    def decorator(func):
+        return BatchedTask(func, max_size, flush_after, task_options)
+
+    return decorator
@@ -0,0 +1,262 @@
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.response import Response
+
+from social_media_api.lazy import lazy_import
+
+redis = lazy_import("redis")
+
+LOCK_TTL = 5
+LOCK_WAIT = 1
+POLL_INTERVAL = 0.025
+STATS_FLUSH_EVERY = 100
+
+_MISSING = object()
+
+
+class TwoTierCache:
+    """
+    Read-through cache with a per-process LRU in front of Redis.
+    Redis entries store how long they took to compute and are refreshed
+    early with a probability that grows towards their expiry (XFetch), so
+    hot keys are recomputed by one caller before they lapse. A cold key is
+    computed behind a short lock while concurrent callers wait for it.
+    Keys live under a namespace version; bumping it drops every entry at
+    once, in other processes after at most ``local_ttl`` seconds.
+    Computes directly when Redis is down.
+    """
+
+    redis_client = None
+    registry = {}
+
+    def __init__(self, namespace, ttl, local_ttl=5, local_size=1024, beta=1.0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.local_size = local_size
+        self.beta = beta
+        self.stats = Counter()
+        self._pending_stats = Counter()
+        self._local = OrderedDict()
+        self._version = (0, None)
+        self._lock = threading.Lock()
+        TwoTierCache.registry[namespace] = self
+
+    @classmethod
+    def get_redis(cls):
+        if TwoTierCache.redis_client is None:
+            TwoTierCache.redis_client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=0.1,
+                socket_connect_timeout=0.1,
+            )
+        return TwoTierCache.redis_client
+
+    @property
+    def version_key(self) -> str:
+        return f"cache:{self.namespace}:version"
+
+    @property
+    def stats_key(self) -> str:
+        return f"cache:{self.namespace}:stats"
+
+    def get_or_set(self, key, compute):
+        """Cached value of the key, computed and stored when missing"""
+        try:
+            version = self.version()
+        except redis.exceptions.RedisError:
+            self.count("errors")
+            return compute()
+        full_key = f"cache:{self.namespace}:v{version}:{key}"
+
+        value = self._get_local(full_key)
+        if value is not _MISSING:
+            self.count("local_hits")
+            return value
+        try:
+            value = self._get_remote(full_key, compute)
+        except redis.exceptions.RedisError:
+            self.count("errors")
+            return compute()
+        self._set_local(full_key, value)
+        return value
+
+    def delete(self, key) -> None:
+        try:
+            full_key = f"cache:{self.namespace}:v{self.version()}:{key}"
+            self.get_redis().delete(full_key)
+        except redis.exceptions.RedisError:
+            return
+        with self._lock:
+            self._local.pop(full_key, None)
+
+    def invalidate_all(self) -> None:
+        """Drop every entry of the namespace by moving to a new version"""
+        try:
+            version = self.get_redis().incr(self.version_key)
+        except redis.exceptions.RedisError:
+            version = None
+        with self._lock:
+            self._local.clear()
+            if version is not None:
+                self._version = (version, time.monotonic() + self.local_ttl)
+
+    def clear_local(self) -> None:
+        """Forget everything this process holds, counters included"""
+        with self._lock:
+            self._local.clear()
+            self._version = (0, None)
+            self.stats.clear()
+            self._pending_stats.clear()
+
+    def metrics(self) -> dict:
+        """Counters of all processes, plus this one's not yet sent to Redis"""
+        with self._lock:
+            totals = Counter(self._pending_stats)
+        try:
+            stored = self.get_redis().hgetall(self.stats_key)
+        except redis.exceptions.RedisError:
+            stored = {}
+        for field, amount in stored.items():
+            totals[field.decode()] += int(amount)
+        return {**totals, "hit_ratio": hit_ratio(totals)}
+
+    def version(self) -> int:
+        version, expires = self._version
+        if expires is None or expires <= time.monotonic():
+            version = int(self.get_redis().get(self.version_key) or 0)
+            self._version = (version, time.monotonic() + self.local_ttl)
+        return version
+
+    def count(self, name) -> None:
+        """Count an event, sending the counters to Redis every few events"""
+        with self._lock:
+            self.stats[name] += 1
+            self._pending_stats[name] += 1
+            if sum(self._pending_stats.values()) < STATS_FLUSH_EVERY:
+                return
+            pending, self._pending_stats = self._pending_stats, Counter()
+        try:
+            with self.get_redis().pipeline() as pipe:
+                for field, amount in pending.items():
+                    pipe.hincrby(self.stats_key, field, amount)
+                pipe.execute()
+        except redis.exceptions.RedisError:
+            pass
+
+    def _get_local(self, full_key):
+        with self._lock:
+            entry = self._local.get(full_key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._local[full_key]
+                return _MISSING
+            self._local.move_to_end(full_key)
+            return value
+
+    def _set_local(self, full_key, value) -> None:
+        with self._lock:
+            self._local[full_key] = (time.monotonic() + self.local_ttl, value)
+            self._local.move_to_end(full_key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def _get_remote(self, full_key, compute):
+        client = self.get_redis()
+        stored = client.get(full_key)
+        if stored is not None:
+            entry = json.loads(stored)
+            if not self._refresh_early(entry):
+                self.count("redis_hits")
+                return entry["value"]
+            self.count("early_refreshes")
+            return self._compute(full_key, compute)
+
+        lock_key = f"{full_key}:lock"
+        deadline = time.monotonic() + LOCK_WAIT
+        while not client.set(lock_key, 1, nx=True, ex=LOCK_TTL):
+            # Another caller computes the value, wait for it instead
+            if time.monotonic() >= deadline:
+                self.count("lock_timeouts")
+                return self._compute(full_key, compute)
+            time.sleep(POLL_INTERVAL)
+            stored = client.get(full_key)
+            if stored is not None:
+                self.count("redis_hits")
+                return json.loads(stored)["value"]
+        try:
+            self.count("misses")
+            return self._compute(full_key, compute)
+        finally:
+            client.delete(lock_key)
+
+    def _compute(self, full_key, compute):
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+        entry = {"value": value, "delta": delta, "expires": time.time() + self.ttl}
+        try:
+            self.get_redis().set(
+                full_key, json.dumps(entry, cls=DjangoJSONEncoder), ex=self.ttl
+            )
+        except redis.exceptions.RedisError:
+            self.count("errors")
+        return value
+
+    def _refresh_early(self, entry) -> bool:
+        # 1 - random() keeps the logarithm's argument in (0, 1]
+        gap = -entry["delta"] * self.beta * math.log(1 - random.random())
+        return time.time() + gap >= entry["expires"]
+
+
+def hit_ratio(stats) -> float:
+    hits = stats.get("local_hits", 0) + stats.get("redis_hits", 0)
+    total = hits + stats.get("misses", 0) + stats.get("early_refreshes", 0)
+    return hits / total if total else 0.0
+
+
+class CachedRetrieveMixin:
+    """
+    Serves retrieve payloads from ``retrieve_cache``. Keys hold the version
+    and modification time of the object, so any change to a VersionedModel
+    row moves it to a new entry. Only for payloads the same for every reader.
+    """
+
+    retrieve_cache = None
+    cache_key_fields = ("version", "updated_at")
+
+    def get_retrieve_state(self, **kwargs):
+        # Already looked up by ConditionalGetMixin when it runs first
+        state = getattr(self, "retrieve_state", None)
+        if state is not None:
+            return state
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset()
+        return (
+            queryset.model.objects.filter(pk__in=queryset.values("pk"))
+            .filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            .values_list("pk", *self.cache_key_fields)
+            .first()
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        state = self.get_retrieve_state(**kwargs)
+        if self.retrieve_cache is None or state is None:
+            return super().retrieve(request, *args, **kwargs)
+        key = ":".join(
+            str(part) for part in (request.get_host(), request.get_full_path(), *state)
+        )
+        view = super().retrieve
+        data = self.retrieve_cache.get_or_set(
+            key, lambda: view(request, *args, **kwargs).data
+        )
+        return Response(data)
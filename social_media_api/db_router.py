@@ -0,0 +1,108 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject, empty
+
+PRIMARY = "default"
+PIN_COOKIE = "db_pinned_until"
+
+_routing_state = ContextVar("routing_state", default=None)
+
+
+def replica_aliases() -> list:
+    return list(getattr(settings, "DATABASE_REPLICA_ALIASES", []))
+
+
+def pin_key(user_id) -> str:
+    return f"db-pin:{user_id}"
+
+
+class RoutingState:
+    """Per-request routing facts shared between the middleware and the router"""
+
+    def __init__(self, request):
+        self.request = request
+        self.read_only = request.method in ("GET", "HEAD", "OPTIONS")
+        self.wrote = False
+        self._pinned_user = None
+
+    def pinned(self) -> bool:
+        try:
+            if float(self.request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        # DRF copies the authenticated user onto the Django request. An
+        # unevaluated session user is skipped: loading it would read the DB.
+        user = getattr(self.request, "user", None)
+        if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+            return False
+        if user is None or not user.is_authenticated:
+            return False
+        if self._pinned_user is None or self._pinned_user[0] != user.pk:
+            try:
+                pinned = bool(cache.get(pin_key(user.pk)))
+            except Exception:
+                # The cache backend is down: only the cookie pins
+                pinned = False
+            self._pinned_user = (user.pk, pinned)
+        return self._pinned_user[1]
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads of safe requests to a random replica and everything else
+    to the primary. A user who wrote recently is pinned to the primary for
+    READ_YOUR_WRITES_SECONDS so they always see their own changes.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        state = _routing_state.get()
+        if not replicas or state is None or not state.read_only or state.wrote:
+            return PRIMARY
+        if state.pinned():
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(request)
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        if state.wrote and replica_aliases():
+            self.pin(request, response)
+        return response
+
+    @staticmethod
+    def pin(request, response):
+        window = settings.READ_YOUR_WRITES_SECONDS
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            try:
+                cache.set(pin_key(user.pk), True, window)
+            except Exception:
+                pass
+        response.set_cookie(PIN_COOKIE, str(time.time() + window), max_age=window)
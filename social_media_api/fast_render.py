@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import orjson
+from django.http import HttpResponse
+from rest_framework import serializers
+
+from social_media_api.sparse import parse_list_param
+
+FAST_RENDER_HEADER = "HTTP_X_FAST_RENDER"
+
+_datetime_field = serializers.DateTimeField()
+
+
+def to_json(data) -> bytes:
+    """Encode data exactly like DRF's JSONRenderer does, only faster"""
+    return (
+        orjson.dumps(data)
+        .replace(b"\xe2\x80\xa8", b"\\u2028")
+        .replace(b"\xe2\x80\xa9", b"\\u2029")
+    )
+
+
+class FastListMixin:
+    """
+    Opt-in list path (``X-Fast-Render: 1``) that builds rows from ``.values()``
+    projections instead of running the list serializer per row.
+    Sparse ``?fields=`` requests keep using the serializer.
+    ``fast_list_fields`` pairs output keys with value lookups in the serializer's
+    field order; keys with a ``None`` lookup are filled by ``fast_list_rows``.
+    """
+
+    fast_list_fields = ()
+
+    def fast_list_rows(self, rows):
+        return rows
+
+    def list(self, request, *args, **kwargs):
+        if request.META.get(FAST_RENDER_HEADER) != "1" or parse_list_param(
+            request, "fields"
+        ):
+            return super().list(request, *args, **kwargs)
+
+        lookups = [lookup for _, lookup in self.fast_list_fields if lookup]
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .values(*lookups)
+        )
+        page = self.paginate_queryset(queryset)
+        rows = [
+            {
+                key: self._fast_value(row[lookup]) if lookup else None
+                for key, lookup in self.fast_list_fields
+            }
+            for row in (queryset if page is None else page)
+        ]
+        rows = self.fast_list_rows(rows)
+        data = rows if page is None else self.get_paginated_response(rows).data
+        return HttpResponse(to_json(data), content_type="application/json")
+
+    @staticmethod
+    def _fast_value(value):
+        if isinstance(value, datetime):
+            return _datetime_field.to_representation(value)
+        return value
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from social_media_api.lazy import lazy_import
+
+redis = lazy_import("redis")
+
+IDEMPOTENCY_HEADER = "HTTP_IDEMPOTENCY_KEY"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+RESPONSE_TTL = 24 * 60 * 60
+LOCK_TTL = 30
+WAIT_FOR_DUPLICATE = 5
+POLL_INTERVAL = 0.05
+
+# Deletes the lock only if it still belongs to the request that took it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is still in progress."
+    default_code = "idempotency_conflict"
+
+
+class IdempotentReplay(Exception):
+    def __init__(self, record):
+        self.record = record
+
+
+class IdempotencyMixin:
+    """
+    Honours an ``Idempotency-Key`` header on the actions listed in
+    ``idempotent_actions``. The first response of a key is kept in Redis
+    for RESPONSE_TTL and replayed for retries; a retry that arrives while
+    the first request still runs waits for it behind a lock.
+    Keys are scoped by user, method and path, and reusing one with a
+    different payload is rejected. Requests run normally when Redis is down.
+    """
+
+    idempotent_actions = ()
+    redis_client = None
+
+    @classmethod
+    def get_redis(cls):
+        if IdempotencyMixin.redis_client is None:
+            IdempotencyMixin.redis_client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=0.1,
+                socket_connect_timeout=0.1,
+            )
+        return IdempotencyMixin.redis_client
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._idempotency = None
+        key = request.META.get(IDEMPOTENCY_HEADER)
+        if not key or self.action not in self.idempotent_actions:
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            raise ValidationError("Idempotency-Key is too long")
+
+        base = f"idempotency:{request.user.pk}:{request.method}:{request.path}:{key}"
+        state = {
+            "record_key": base,
+            "lock_key": f"{base}:lock",
+            "token": uuid.uuid4().hex,
+            "fingerprint": self._fingerprint(request),
+        }
+        try:
+            self._acquire(state)
+        except redis.exceptions.RedisError:
+            return
+        self._idempotency = state
+
+    def handle_exception(self, exc):
+        if isinstance(exc, IdempotentReplay):
+            response = Response(exc.record["data"], status=exc.record["status"])
+            response[REPLAYED_HEADER] = "true"
+            return response
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            # Unhandled errors skip finalize_response, so free the key here
+            self._release(getattr(self, "_idempotency", None))
+            self._idempotency = None
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        state = getattr(self, "_idempotency", None)
+        if state is None:
+            return response
+        self._idempotency = None
+        client = self.get_redis()
+        try:
+            if response.status_code < 500:
+                record = {
+                    "status": response.status_code,
+                    "data": response.data,
+                    "fingerprint": state["fingerprint"],
+                }
+                client.set(
+                    state["record_key"],
+                    json.dumps(record, cls=DjangoJSONEncoder),
+                    ex=RESPONSE_TTL,
+                )
+        except redis.exceptions.RedisError:
+            pass
+        self._release(state)
+        return response
+
+    def _release(self, state):
+        if state is None:
+            return
+        try:
+            self.get_redis().eval(
+                RELEASE_LOCK_SCRIPT, 1, state["lock_key"], state["token"]
+            )
+        except redis.exceptions.RedisError:
+            pass
+
+    def _acquire(self, state):
+        client = self.get_redis()
+        deadline = time.monotonic() + WAIT_FOR_DUPLICATE
+        while True:
+            self._replay_if_stored(state)
+            if client.set(state["lock_key"], state["token"], nx=True, ex=LOCK_TTL):
+                # The first request may have finished between the two calls
+                try:
+                    self._replay_if_stored(state)
+                except Exception:
+                    client.delete(state["lock_key"])
+                    raise
+                return
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict()
+            time.sleep(POLL_INTERVAL)
+
+    def _replay_if_stored(self, state):
+        stored = self.get_redis().get(state["record_key"])
+        if stored is None:
+            return
+        record = json.loads(stored)
+        if record["fingerprint"] != state["fingerprint"]:
+            raise ValidationError(
+                "Idempotency-Key was already used with a different payload"
+            )
+        raise IdempotentReplay(record)
+
+    @staticmethod
+    def _fingerprint(request) -> str:
+        data = request.data
+        if hasattr(data, "lists"):
+            data = {key: values for key, values in data.lists()}
+        payload = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
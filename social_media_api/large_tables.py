@@ -0,0 +1,82 @@
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from social_media_api.prefix_search import prefix_filter
+
+# Unfiltered tables estimated above this many rows are not counted exactly
+EXACT_COUNT_LIMIT = 10000
+
+
+def estimated_row_count(model, using="default"):
+    """
+    Row count of the model's table from the planner statistics, None when
+    the database has none (SQLite before ANALYZE, PostgreSQL before VACUUM).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                    [connection.ops.quote_name(table)],
+                )
+                row = cursor.fetchone()
+                return row[0] if row and row[0] >= 0 else None
+    except DatabaseError:
+        return None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Pages unfiltered querysets of large tables by the planner's row estimate
+    instead of a COUNT(*) over the whole table. Filtered querysets and
+    small tables are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, "query") and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Admin for tables with millions of rows: estimated page counts, no
+    second count of the unfiltered table, and searches that can use indexes.
+    A ``^field`` search field needs a ``field_lower`` column that the model
+    fills on save, like HashTag.name_lower or Profile.username_lower, and
+    matches the term as a range over that column's index; see
+    social_media_api.prefix_search. Any other search field is a lookup on
+    the whole term and needs an index of its own, like the unique index
+    behind ``email__exact``.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        search_fields = self.get_search_fields(request)
+        if not term or not search_fields:
+            return queryset, False
+        condition = Q()
+        for field in search_fields:
+            if field.startswith("^"):
+                condition |= prefix_filter(f"{field[1:]}_lower", term)
+            else:
+                condition |= Q(**{field: term})
+        return queryset.filter(condition), False
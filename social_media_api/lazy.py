@@ -0,0 +1,18 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """
+    Module that is only executed on first attribute access, so optional
+    heavy dependencies don't add to worker start-up until they are used.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
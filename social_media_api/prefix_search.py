@@ -0,0 +1,21 @@
+from django.db.models import Q
+
+# Sorts after any character a string can continue with
+PREFIX_END = chr(0x10FFFF)
+
+
+def normalize(value: str) -> str:
+    """
+    Lowercased in Python, not by the database: SQLite's LOWER() only folds
+    ASCII, so "Élise" would never match the prefix "é".
+    """
+    return (value or "").lower()
+
+
+def prefix_filter(field: str, prefix: str) -> Q:
+    """
+    Values of a normalized column starting with the prefix, as a range an
+    index on the column serves instead of a LIKE scan.
+    """
+    prefix = normalize(prefix)
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + PREFIX_END})
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+from social_media_api.conditional import make_etag
+
+SOURCE_PACKAGES = ("social_media_api", "social_network", "user")
+
+_schemas = {}
+_rendered = {}
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    CODE_VERSION when the deployment sets it, otherwise a digest
+    of the project sources the schema is generated from.
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    digest = hashlib.sha256(spectacular_settings.VERSION.encode())
+    for package in SOURCE_PACKAGES:
+        for path in sorted(Path(settings.BASE_DIR, package).rglob("*.py")):
+            if "tests" in path.parts or "migrations" in path.parts:
+                continue
+            digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def schema_path(version=None) -> Path:
+    return Path(settings.SCHEMA_CACHE_DIR) / f"openapi-{version or code_version()}.json"
+
+
+def build_schema() -> Path:
+    """Generate the schema and write it to the file of the current version"""
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    path = schema_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(schema))
+    temporary.replace(path)
+    _schemas[code_version()] = schema
+    return path
+
+
+def load_schema() -> dict:
+    """Schema of the current version from memory, the prebuilt file or a new build"""
+    version = code_version()
+    if version not in _schemas:
+        path = schema_path(version)
+        if not path.exists():
+            build_schema()
+        else:
+            _schemas[version] = json.loads(path.read_text())
+    return _schemas[version]
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    Serves the schema prebuilt by the ``build_schema`` command
+    (or built on the first request) from memory, rendered once per format,
+    with an ETag tied to the code version.
+    Translated and versioned schemas are still generated per request.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("lang") or request.GET.get("version"):
+            return super().get(request, *args, **kwargs)
+
+        renderer = request.accepted_renderer
+        media_type = request.accepted_media_type
+        etag = make_etag(code_version(), media_type)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = (code_version(), media_type)
+            if key not in _rendered:
+                _rendered[key] = renderer.render(load_schema(), media_type, {})
+            content_type = media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            response = HttpResponse(_rendered[key], content_type=content_type)
+            filename = self._get_filename(request, None)
+            response["Content-Disposition"] = f'inline; filename="{filename}"'
+        response["ETag"] = etag
+        return response
@@ -13,6 +13,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
+from kombu import Queue
 
 load_dotenv()
 
@@ -26,10 +27,14 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv("SECRET_KEY")
 
+# "development" or "production"; production drops the dev tooling below
+DJANGO_ENV = os.getenv("DJANGO_ENV", "development")
+PRODUCTION = DJANGO_ENV == "production"
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = not PRODUCTION
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = list(filter(None, os.getenv("ALLOWED_HOSTS", "").split(",")))
 
 
 # Application definition
@@ -42,7 +47,6 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
-    "debug_toolbar",
     "drf_spectacular",
     "django_celery_beat",
     "rest_framework_simplejwt.token_blacklist",
@@ -52,15 +56,19 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "social_media_api.db_router.ReplicaRoutingMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if not PRODUCTION:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "social_media_api.urls"
 
 TEMPLATES = [
@@ -79,6 +87,21 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        )
+    ]
+    TEMPLATES[0]["OPTIONS"]["context_processors"].remove(
+        "django.template.context_processors.debug"
+    )
+
 WSGI_APPLICATION = "social_media_api.wsgi.application"
 
 INTERNAL_IPS = [
@@ -88,13 +111,39 @@ INTERNAL_IPS = [
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Production workers keep connections open between requests
+CONN_MAX_AGE = int(os.getenv("CONN_MAX_AGE", 60 if PRODUCTION else 0))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": PRODUCTION,
     }
 }
 
+# Comma-separated replica database files, e.g. DATABASE_REPLICAS=replica1.sqlite3
+for index, name in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICAS", "").split(",")), start=1
+):
+    DATABASES[f"replica_{index}"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / name.strip(),
+        "CONN_MAX_AGE": CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": PRODUCTION,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_REPLICA_ALIASES = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["social_media_api.db_router.PrimaryReplicaRouter"]
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+# Posts older than this are moved with their engagement to the archive tables
+ARCHIVE_POSTS_AFTER_DAYS = int(os.getenv("ARCHIVE_POSTS_AFTER_DAYS", 365))
+# Clients that last synced before this have to refetch everything
+CHANGE_LOG_RETENTION_DAYS = int(os.getenv("CHANGE_LOG_RETENTION_DAYS", 30))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -145,8 +194,20 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 6,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_RATES": {
+        "post_like_unlike": "60/min",
+        "comment_like_unlike": "60/min",
+        "follow_unfollow": "30/min",
+    },
 }
 
+# Prebuilt schemas are keyed by this version, or by a digest of the sources
+CODE_VERSION = os.getenv("CODE_VERSION", "")
+SCHEMA_CACHE_DIR = BASE_DIR / "schema_cache"
+
+# Partial chunked uploads, shared by every web worker
+UPLOAD_PARTS_DIR = os.getenv("UPLOAD_PARTS_DIR", BASE_DIR / "upload_parts")
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Airport Service API",
     "DESCRIPTION": "Order tickets for your flights",
@@ -167,8 +228,90 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+# Shared by all processes in production, e.g. for the read-your-writes pins.
+# Hot API reads go through social_media_api.cache.TwoTierCache instead
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {"socket_timeout": 0.1, "socket_connect_timeout": 0.1},
+        }
+        if PRODUCTION
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
 CELERY_TIMEZONE = "Europe/Kiev"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+
+# realtime: short user-facing work, default: everything unrouted,
+# bulk: long maintenance jobs. Run one worker per queue, e.g.
+#   celery -A social_media_api worker -Q realtime -c 8
+#   celery -A social_media_api worker -Q default -c 4
+#   celery -A social_media_api worker -Q bulk -c 2
+CELERY_TASK_QUEUE_MAX_PRIORITY = 9
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_QUEUES = [
+    Queue(name, routing_key=name, queue_arguments={"x-max-priority": 9})
+    for name in ("realtime", "default", "bulk")
+]
+CELERY_TASK_ROUTES = {
+    "user.tasks.refresh_follow_suggestions": {"queue": "realtime", "priority": 7},
+    "user.tasks.compute_follow_suggestions": {"queue": "bulk"},
+    "social_network.tasks.compact_hashtag_buckets": {"queue": "bulk"},
+    "social_network.tasks.archive_old_posts": {"queue": "bulk", "priority": 2},
+    "social_network.tasks.purge_deleted": {"queue": "bulk"},
+    "social_network.tasks.resume_deletion_jobs": {"queue": "bulk"},
+    "social_network.tasks.expire_stale_uploads": {"queue": "bulk"},
+    "social_network.tasks.prune_change_log": {"queue": "bulk"},
+}
+# Redis emulates priorities with one list per step
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+# Long bulk tasks must not hold back tasks prefetched behind them
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
+
+# CELERY_TASK_ALWAYS_EAGER=1 runs tasks inline on an in-memory broker,
+# for tests and local work without Redis
+if os.getenv("CELERY_TASK_ALWAYS_EAGER") == "1":
+    CELERY_TASK_ALWAYS_EAGER = True
+    CELERY_TASK_EAGER_PROPAGATES = True
+    CELERY_BROKER_URL = "memory://"
+    CELERY_RESULT_BACKEND = "cache+memory://"
+CELERY_BEAT_SCHEDULE = {
+    "compact-hashtag-buckets": {
+        "task": "social_network.tasks.compact_hashtag_buckets",
+        "schedule": timedelta(minutes=5),
+    },
+    "compute-follow-suggestions": {
+        "task": "user.tasks.compute_follow_suggestions",
+        "schedule": timedelta(hours=6),
+    },
+    "archive-old-posts": {
+        "task": "social_network.tasks.archive_old_posts",
+        "schedule": timedelta(days=1),
+    },
+    "resume-deletion-jobs": {
+        "task": "social_network.tasks.resume_deletion_jobs",
+        "schedule": timedelta(minutes=30),
+    },
+    "expire-stale-uploads": {
+        "task": "social_network.tasks.expire_stale_uploads",
+        "schedule": timedelta(hours=1),
+    },
+    "prune-change-log": {
+        "task": "social_network.tasks.prune_change_log",
+        "schedule": timedelta(days=1),
+    },
+}
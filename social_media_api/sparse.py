@@ -0,0 +1,95 @@
+from rest_framework import serializers
+
+
+def parse_list_param(request, name) -> set:
+    if request is None or request.method != "GET":
+        return set()
+    value = request.query_params.get(name, "")
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Lets GET clients pick top-level fields with ``?fields=id,title`` and
+    swap collapsed relations for the nested serializers listed in
+    ``expandable_fields`` with ``?expand=post``.
+    """
+
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_root():
+            return fields
+        request = self.context.get("request")
+        for name in parse_list_param(request, "expand") & set(self.expandable_fields):
+            fields[name] = self.expandable_fields[name](read_only=True)
+        requested = parse_list_param(request, "fields")
+        if requested:
+            fields = {
+                name: field for name, field in fields.items() if name in requested
+            }
+        return fields
+
+    def _is_root(self) -> bool:
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+def field_sources(field) -> set:
+    """Top-level attributes a serializer field reads from its instance"""
+    if isinstance(field, serializers.SerializerMethodField):
+        return set()
+    if field.source == "*":
+        if isinstance(field, serializers.BaseSerializer):
+            return set().union(
+                *(field_sources(child) for child in field.fields.values())
+            )
+        return set()
+    return {field.source.split(".")[0]}
+
+
+class SparseQuerysetMixin:
+    """
+    Makes ``?fields=`` cheaper on list and retrieve: model columns no
+    requested field reads are deferred and prefetches feeding only
+    unrequested fields are dropped.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in ("list", "retrieve"):
+            return queryset
+        requested = parse_list_param(self.request, "fields")
+        if not requested:
+            return queryset
+        serializer = self.get_serializer_class()(context={})
+        needed = set(requested)
+        for name, field in serializer.fields.items():
+            if name in requested:
+                needed |= field_sources(field)
+
+        deferred = [
+            field.name
+            for field in queryset.model._meta.concrete_fields
+            if not field.primary_key
+            and not field.is_relation
+            and field.name not in needed
+        ]
+        prefetches = [
+            lookup
+            for lookup in queryset._prefetch_related_lookups
+            if self._prefetch_root(lookup) in needed
+        ]
+        return (
+            queryset.defer(*deferred)
+            .prefetch_related(None)
+            .prefetch_related(*prefetches)
+        )
+
+    @staticmethod
+    def _prefetch_root(lookup) -> str:
+        path = getattr(lookup, "prefetch_to", lookup)
+        return path.split("__")[0]
@@ -0,0 +1,90 @@
+import time
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from social_media_api.lazy import lazy_import
+
+redis = lazy_import("redis")
+
+# Refills the bucket for the elapsed time, then takes one token if there is one.
+# Returns {allowed, seconds until the next token} in a single round trip.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate))
+return {allowed, tostring(wait)}
+"""
+
+
+class ActionTokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket kept in Redis, scoped by the view action.
+    Budgets come from DEFAULT_THROTTLE_RATES keyed by action name,
+    e.g. ``"post_like_unlike": "30/min"`` allows bursts of 30 refilled
+    evenly over a minute. Requests are let through when Redis is down.
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+    redis_client = None
+    _script = None
+
+    def __init__(self):
+        # The rate depends on the view action, resolved in allow_request
+        pass
+
+    @classmethod
+    def get_script(cls):
+        if cls._script is None:
+            if cls.redis_client is None:
+                cls.redis_client = redis.Redis.from_url(
+                    settings.REDIS_URL,
+                    socket_timeout=0.1,
+                    socket_connect_timeout=0.1,
+                )
+            cls._script = cls.redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        return cls._script
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "action", None)
+        if self.scope not in self.THROTTLE_RATES:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        try:
+            allowed, wait = self.get_script()(
+                keys=[self.get_cache_key(request, view)],
+                args=[
+                    self.num_requests,
+                    self.num_requests / self.duration,
+                    time.time(),
+                ],
+            )
+        except redis.exceptions.RedisError:
+            return True
+        self.wait_seconds = float(wait)
+        return bool(allowed)
+
+    def wait(self):
+        return self.wait_seconds
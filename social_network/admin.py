@@ -1,8 +1,47 @@
 from django.contrib import admin
 
-from social_network.models import Like, Comment, HashTag, Post
+from social_media_api.large_tables import LargeTableAdmin
+from social_network.models import Like, Comment, HashTag, Post, DeletionJob
 
-admin.site.register(Like)
-admin.site.register(Comment)
-admin.site.register(HashTag)
-admin.site.register(Post)
+
+@admin.register(Like)
+class LikeAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "post", "comment", "created_at")
+    list_select_related = ("user", "post", "comment")
+    ordering = ("-id",)
+    raw_id_fields = ("user", "post", "comment")
+
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "post", "likes_count", "created_at")
+    list_select_related = ("user", "post")
+    ordering = ("-id",)
+    raw_id_fields = ("user", "post")
+    readonly_fields = ("likes_count", "recent_likers", "version", "updated_at")
+
+
+@admin.register(HashTag)
+class HashTagAdmin(LargeTableAdmin):
+    # Prefix range over the indexed name_lower column
+    search_fields = ("^name",)
+    ordering = ("id",)
+
+
+@admin.register(Post)
+class PostAdmin(LargeTableAdmin):
+    list_display = ("id", "title", "user", "likes_count", "created_at", "deleted_at")
+    list_select_related = ("user",)
+    # Post.title is unique=True, and its index serves exact matches only
+    search_fields = ("title__exact",)
+    ordering = ("-id",)
+    raw_id_fields = ("user",)
+    autocomplete_fields = ("hashtag",)
+    readonly_fields = ("likes_count", "recent_likers", "media", "version", "updated_at")
+
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "target", "object_id", "status", "step", "updated_at")
+    list_filter = ("status",)
+    ordering = ("-id",)
@@ -0,0 +1,126 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from social_network import changelog
+from social_network.models import (
+    ArchivedComment,
+    ArchivedLike,
+    ArchivedPost,
+    Attachment,
+    Comment,
+    Like,
+    Post,
+)
+
+CHUNK_SIZE = 500
+
+
+def archive_cutoff(now=None):
+    return (now or timezone.now()) - timedelta(days=settings.ARCHIVE_POSTS_AFTER_DAYS)
+
+
+def archive_posts(post_ids) -> int:
+    """
+    Copy the posts with their comments and likes into the archive tables
+    and remove the originals, all in one transaction.
+    The rows are deleted without loading them, so like and comment signals
+    don't recount objects that are being moved away anyway.
+    """
+    post_ids = list(post_ids)
+    with transaction.atomic():
+        posts = list(
+            Post.objects.select_for_update()
+            .filter(pk__in=post_ids)
+            .annotate(comments_total=Count("comments"))
+            .order_by("id")
+        )
+        if not posts:
+            return 0
+        post_ids = [post.id for post in posts]
+
+        hashtags = defaultdict(list)
+        through = Post.hashtag.through.objects.filter(post_id__in=post_ids)
+        for post_id, name in through.order_by("hashtag_id").values_list(
+            "post_id", "hashtag__name"
+        ):
+            hashtags[post_id].append(name)
+
+        ArchivedPost.objects.bulk_create(
+            [
+                ArchivedPost(
+                    id=post.id,
+                    user_id=post.user_id,
+                    created_at=post.created_at,
+                    updated_at=post.updated_at,
+                    title=post.title,
+                    text=post.text,
+                    hashtag_names=hashtags[post.id],
+                    comments_count=post.comments_total,
+                    likes_count=post.likes_count,
+                    recent_likers=post.recent_likers,
+                    media=post.media,
+                )
+                for post in posts
+            ]
+        )
+        comments = Comment.objects.filter(post_id__in=post_ids)
+        ArchivedComment.objects.bulk_create(
+            [
+                ArchivedComment(
+                    id=comment.id,
+                    user_id=comment.user_id,
+                    post_id=comment.post_id,
+                    text=comment.text,
+                    created_at=comment.created_at,
+                    likes_count=comment.likes_count,
+                    recent_likers=comment.recent_likers,
+                )
+                for comment in comments
+            ]
+        )
+        likes = Like.objects.filter(
+            Q(post_id__in=post_ids) | Q(comment__post_id__in=post_ids)
+        )
+        ArchivedLike.objects.bulk_create(
+            [
+                ArchivedLike(
+                    id=like.id,
+                    user_id=like.user_id,
+                    post_id=like.post_id,
+                    comment_id=like.comment_id,
+                    created_at=like.created_at,
+                )
+                for like in likes
+            ]
+        )
+
+        likes._raw_delete(likes.db)
+        comments._raw_delete(comments.db)
+        through._raw_delete(through.db)
+        # Detached attachments keep the blobs the archived media points to
+        Attachment.objects.filter(post_id__in=post_ids).update(post=None)
+        hot_posts = Post.objects.filter(pk__in=post_ids)
+        hot_posts._raw_delete(hot_posts.db)
+        # Synced clients drop archived posts, which are only served by id
+        changelog.record([changelog.post_change(post, deleted=True) for post in posts])
+    return len(posts)
+
+
+def archive_old_posts(now=None, chunk_size=CHUNK_SIZE) -> int:
+    """Move every post older than ARCHIVE_POSTS_AFTER_DAYS, oldest first"""
+    cutoff = archive_cutoff(now)
+    archived = 0
+    while True:
+        post_ids = list(
+            Post.objects.filter(created_at__lt=cutoff, deleted_at__isnull=True)
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not post_ids:
+            return archived
+        archived += archive_posts(post_ids)
@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from social_network.models import ChangeLogEntry
+
+SYNC_LIMIT = 500
+PRUNE_CHUNK_SIZE = 5000
+# Entries younger than this are held back: a concurrent insert that took a
+# lower seq may not have committed yet, and skipping past it would lose it
+SETTLE_DELAY = timedelta(seconds=2)
+
+
+def post_change(post, deleted=False) -> ChangeLogEntry:
+    return ChangeLogEntry(
+        kind="post",
+        object_id=post.pk,
+        deleted=deleted,
+        owner_id=post.user_id,
+        actor_id=post.user_id,
+        post_id=post.pk,
+    )
+
+
+def comment_change(comment, post_owner_id, deleted=False) -> ChangeLogEntry:
+    return ChangeLogEntry(
+        kind="comment",
+        object_id=comment.pk,
+        deleted=deleted,
+        owner_id=post_owner_id,
+        actor_id=comment.user_id,
+        post_id=comment.post_id,
+    )
+
+
+def like_change(like, owner_id, post_id, deleted=False) -> ChangeLogEntry:
+    return ChangeLogEntry(
+        kind="like",
+        object_id=like.pk,
+        deleted=deleted,
+        owner_id=owner_id,
+        actor_id=like.user_id,
+        post_id=post_id,
+        comment_id=like.comment_id,
+    )
+
+
+def follow_change(profile_id, owner_id, follower_id, deleted=False) -> ChangeLogEntry:
+    return ChangeLogEntry(
+        kind="follow",
+        object_id=profile_id,
+        deleted=deleted,
+        owner_id=owner_id,
+        actor_id=follower_id,
+    )
+
+
+def user_change(user, deleted=False) -> ChangeLogEntry:
+    return ChangeLogEntry(
+        kind="user",
+        object_id=user.pk,
+        deleted=deleted,
+        owner_id=user.pk,
+        actor_id=user.pk,
+    )
+
+
+def record(entries) -> None:
+    """
+    Write the entries once the caller's transaction commits, in a short
+    insert of their own. Seqs are then taken in commit order, so a long
+    transaction can't commit a seq below a watermark already handed out.
+    """
+    entries = list(entries)
+    if entries:
+        transaction.on_commit(
+            lambda: ChangeLogEntry.objects.bulk_create(
+                entries, batch_size=PRUNE_CHUNK_SIZE
+            )
+        )
+
+
+def latest_seq() -> int:
+    return ChangeLogEntry.objects.aggregate(latest=Max("seq"))["latest"] or 0
+
+
+def changes_since(since, user_ids, limit=None, now=None) -> dict:
+    """
+    Changes after the ``since`` watermark made by or to the given users,
+    collapsed so only the last change of every object is kept.
+    ``reset`` asks for a full refetch when the watermark is older than the
+    retained log.
+    """
+    oldest = ChangeLogEntry.objects.aggregate(oldest=Min("seq"))["oldest"]
+    if not since or (oldest is not None and since < oldest - 1):
+        return {"reset": True, "watermark": latest_seq(), "has_more": False}
+
+    limit = limit or SYNC_LIMIT
+    settled = (now or timezone.now()) - SETTLE_DELAY
+    entries = list(
+        ChangeLogEntry.objects.filter(
+            Q(owner_id__in=user_ids) | Q(actor_id__in=user_ids),
+            seq__gt=since,
+            created_at__lte=settled,
+        ).order_by("seq")[:limit]
+    )
+    latest = {}
+    for entry in entries:
+        key = (entry.kind, entry.object_id)
+        if entry.kind == "follow":
+            key += (entry.actor_id,)
+        latest[key] = entry
+    return {
+        "reset": False,
+        "watermark": entries[-1].seq if entries else since,
+        "has_more": len(entries) == limit,
+        "entries": list(latest.values()),
+    }
+
+
+def prune_change_log(now=None, chunk_size=PRUNE_CHUNK_SIZE) -> int:
+    """
+    Delete entries older than CHANGE_LOG_RETENTION_DAYS in chunks.
+    The newest entry always stays, so watermarks keep their meaning.
+    """
+    cutoff = (now or timezone.now()) - timedelta(
+        days=settings.CHANGE_LOG_RETENTION_DAYS
+    )
+    newest = latest_seq()
+    pruned = 0
+    while True:
+        seqs = list(
+            ChangeLogEntry.objects.filter(created_at__lt=cutoff, seq__lt=newest)
+            .order_by("seq")
+            .values_list("seq", flat=True)[:chunk_size]
+        )
+        if not seqs:
+            return pruned
+        pruned += ChangeLogEntry.objects.filter(seq__in=seqs).delete()[0]
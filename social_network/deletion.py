@@ -0,0 +1,284 @@
+import logging
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from social_network import changelog
+from social_network.models import (
+    ArchivedComment,
+    ArchivedLike,
+    ArchivedPost,
+    Attachment,
+    Comment,
+    DeletionJob,
+    Like,
+    Post,
+)
+from user.models import FollowSuggestion, Profile, User
+from user.stats import adjust_counter, reconcile_profiles
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+STALLED_AFTER = timedelta(minutes=30)
+
+# Rows of ``queryset`` are removed ``CHUNK_SIZE`` at a time, or get ``nullify``
+# set to NULL instead. ``refresh`` is a (function, lookup) pair; the function
+# gets the ids of the parents that lost rows, read through ``lookup``.
+# ``changes`` turns the rows of a chunk into change log entries.
+Step = namedtuple(
+    "Step", "label queryset nullify refresh changes", defaults=(None, None, None)
+)
+
+
+def touch_posts(post_ids) -> None:
+    Post.objects.filter(pk__in=post_ids).touch()
+
+
+def recount_archived_comments(post_ids) -> None:
+    """Archived posts keep a stored comments_count, recounted after removals"""
+    comments = (
+        ArchivedComment.objects.filter(post_id=OuterRef("pk"))
+        .order_by()
+        .values("post_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    ArchivedPost.objects.filter(pk__in=post_ids).update(
+        comments_count=Coalesce(Subquery(comments), 0)
+    )
+
+
+def comment_tombstones(rows) -> list:
+    return [
+        changelog.comment_change(
+            Comment(pk=pk, user_id=user_id, post_id=post_id),
+            post_owner_id or user_id,
+            deleted=True,
+        )
+        for pk, user_id, post_id, post_owner_id in rows.values_list(
+            "pk", "user_id", "post_id", "post__user_id"
+        )
+    ]
+
+
+def follow_tombstones(rows) -> list:
+    return [
+        changelog.follow_change(*edge, deleted=True)
+        for edge in rows.values_list("profile_id", "profile__user_id", "user_id")
+    ]
+
+
+def post_steps(post_id) -> list:
+    return [
+        Step("comment_likes", Like.objects.filter(comment__post_id=post_id)),
+        Step("likes", Like.objects.filter(post_id=post_id)),
+        Step("comments", Comment.objects.filter(post_id=post_id)),
+        Step("hashtags", Post.hashtag.through.objects.filter(post_id=post_id)),
+        Step("attachments", Attachment.objects.filter(post_id=post_id)),
+    ]
+
+
+def profile_steps(profile_id) -> list:
+    return [
+        Step(
+            "followers",
+            Profile.followers.through.objects.filter(profile_id=profile_id),
+            changes=follow_tombstones,
+        ),
+        Step(
+            "following", Profile.following.through.objects.filter(profile_id=profile_id)
+        ),
+    ]
+
+
+def user_steps(user_id) -> list:
+    return [
+        Step("post_comment_likes", Like.objects.filter(comment__post__user_id=user_id)),
+        Step("post_likes", Like.objects.filter(post__user_id=user_id)),
+        Step("post_comments", Comment.objects.filter(post__user_id=user_id)),
+        Step("comment_likes", Like.objects.filter(comment__user_id=user_id)),
+        Step(
+            "comments",
+            Comment.objects.filter(user_id=user_id),
+            refresh=(touch_posts, "post_id"),
+            changes=comment_tombstones,
+        ),
+        Step("likes", Like.objects.filter(user_id=user_id), nullify="user"),
+        Step(
+            "post_hashtags",
+            Post.hashtag.through.objects.filter(post__user_id=user_id),
+        ),
+        Step(
+            "attachments",
+            Attachment.objects.filter(Q(user_id=user_id) | Q(post__user_id=user_id)),
+        ),
+        Step(
+            "archived_post_comment_likes",
+            ArchivedLike.objects.filter(comment__post__user_id=user_id),
+        ),
+        Step("archived_post_likes", ArchivedLike.objects.filter(post__user_id=user_id)),
+        Step(
+            "archived_comment_likes",
+            ArchivedLike.objects.filter(comment__user_id=user_id),
+        ),
+        Step(
+            "archived_likes",
+            ArchivedLike.objects.filter(user_id=user_id),
+            nullify="user",
+        ),
+        Step(
+            "archived_post_comments",
+            ArchivedComment.objects.filter(post__user_id=user_id),
+        ),
+        Step(
+            "archived_comments",
+            ArchivedComment.objects.filter(user_id=user_id),
+            refresh=(recount_archived_comments, "post_id"),
+        ),
+        Step("archived_posts", ArchivedPost.objects.filter(user_id=user_id)),
+        Step("posts", Post.objects.filter(user_id=user_id)),
+        Step(
+            "followers",
+            Profile.followers.through.objects.filter(profile__user_id=user_id),
+            changes=follow_tombstones,
+        ),
+        Step(
+            "following",
+            Profile.following.through.objects.filter(profile__user_id=user_id),
+        ),
+        Step(
+            "followed_by",
+            Profile.followers.through.objects.filter(user_id=user_id),
+            refresh=(reconcile_profiles, "profile_id"),
+            changes=follow_tombstones,
+        ),
+        Step(
+            "following_by",
+            Profile.following.through.objects.filter(user_id=user_id),
+            refresh=(reconcile_profiles, "profile_id"),
+        ),
+        Step(
+            "suggestions",
+            FollowSuggestion.objects.filter(
+                Q(user_id=user_id) | Q(suggested_id=user_id)
+            ),
+        ),
+    ]
+
+
+TARGETS = {
+    "post": (Post, post_steps),
+    "profile": (Profile, profile_steps),
+    "user": (User, user_steps),
+}
+
+
+def hidden_changes(target, instance) -> list:
+    """
+    Change log entries for soft deleting the object. A deleted user is one
+    tombstone; their follow edges and their comments on other users' posts
+    are logged chunk by chunk as the job removes them.
+    """
+    if target == "post":
+        return [changelog.post_change(instance, deleted=True)]
+    if target == "user":
+        return [changelog.user_change(instance, deleted=True)]
+    return []
+
+
+def soft_delete(target, instance) -> DeletionJob:
+    """
+    Hide the object right away and leave removing it to a background job.
+    Deleting a user hides their profile and posts as well.
+    """
+    now = timezone.now()
+    hide = {"deleted_at": now, "version": F("version") + 1, "updated_at": now}
+    with transaction.atomic():
+        changes = hidden_changes(target, instance)
+        if target == "post":
+            if Post.objects.filter(pk=instance.pk, deleted_at__isnull=True).update(
+                **hide
+            ):
+                adjust_counter(
+                    Profile.objects.filter(user_id=instance.user_id), "posts_count", -1
+                )
+        elif target == "profile":
+            Profile.objects.filter(pk=instance.pk).update(**hide)
+        else:
+            User.objects.filter(pk=instance.pk).update(is_active=False)
+            Profile.objects.filter(user_id=instance.pk).update(**hide)
+            hidden_posts = Post.objects.filter(
+                user_id=instance.pk, deleted_at__isnull=True
+            ).update(**hide)
+            adjust_counter(
+                Profile.objects.filter(user_id=instance.pk),
+                "posts_count",
+                -hidden_posts,
+            )
+        changelog.record(changes)
+        return DeletionJob.objects.create(target=target, object_id=instance.pk)
+
+
+def stalled_jobs(now=None):
+    """Jobs whose worker died or whose task never got queued"""
+    cutoff = (now or timezone.now()) - STALLED_AFTER
+    return DeletionJob.objects.exclude(status="done").filter(updated_at__lt=cutoff)
+
+
+def delete_chunk(job, step) -> int:
+    with transaction.atomic():
+        # Locking the job keeps a resumed run from racing the original one
+        job = DeletionJob.objects.select_for_update().get(pk=job.pk)
+        ids = list(step.queryset.values_list("pk", flat=True)[:CHUNK_SIZE])
+        if not ids:
+            return 0
+        rows = step.queryset.model.objects.filter(pk__in=ids)
+        if step.changes:
+            changelog.record(step.changes(rows))
+        if step.refresh:
+            refresh, lookup = step.refresh
+            parent_ids = set(rows.values_list(lookup, flat=True))
+        if step.nullify:
+            rows.update(**{step.nullify: None})
+        else:
+            rows._raw_delete(rows.db)
+        if step.refresh:
+            refresh(parent_ids)
+        job.progress[step.label] = job.progress.get(step.label, 0) + len(ids)
+        job.save(update_fields=["progress", "updated_at"])
+    return len(ids)
+
+
+def run_deletion_job(job_id) -> dict:
+    """
+    Delete the dependents of the target in bounded chunks, then the target.
+    Progress is committed with every chunk, so a crashed job resumes
+    from the step it stopped at.
+    """
+    job = DeletionJob.objects.get(pk=job_id)
+    if job.status == "done":
+        return job.progress
+    model, steps = TARGETS[job.target]
+    job.status = "running"
+    job.save(update_fields=["status", "updated_at"])
+
+    steps = steps(job.object_id)
+    for index in range(job.step, len(steps)):
+        while delete_chunk(job, steps[index]):
+            job.refresh_from_db(fields=["progress"])
+            logger.info("Deletion job %s: %s", job.pk, job.progress)
+        job.step = index + 1
+        job.save(update_fields=["step", "updated_at"])
+
+    with transaction.atomic():
+        # Only rows the steps don't cover are left for the cascade collector
+        model.objects.filter(pk=job.object_id).delete()
+        job.status = "done"
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "finished_at", "updated_at"])
+    return job.progress
@@ -0,0 +1,65 @@
+import re
+
+from django.db import transaction
+
+from social_media_api.cache import TwoTierCache
+from social_network.models import HashTag, Post
+from social_network.trending import record_usage
+
+# A tag starts after a non-word character and holds at least one letter,
+# so "#1" or "a#b" are not tags
+HASHTAG_RE = re.compile(r"(?<![\w#&])#(\w*[^\W\d_]\w*)")
+MAX_NAME_LENGTH = HashTag._meta.get_field("name").max_length
+# Tags are never updated in place, so every write drops the whole namespace
+HASHTAG_CACHE = TwoTierCache("hashtags", ttl=600)
+
+
+def extract_hashtags(*texts) -> list:
+    """Lowercased tag names in order of first appearance"""
+    names = {}
+    for text in texts:
+        for match in HASHTAG_RE.finditer(text or ""):
+            name = match.group(1).lower()
+            if len(name) <= MAX_NAME_LENGTH:
+                names.setdefault(name, None)
+    return list(names)
+
+
+def resolve_hashtags(names) -> list:
+    """Ids of the named tags, creating the missing ones in one insert"""
+    if not names:
+        return []
+    by_name = HashTag.objects.filter(name_lower__in=names)
+    ids = dict(by_name.values_list("name_lower", "id"))
+    missing = [name for name in names if name not in ids]
+    if missing:
+        HashTag.objects.bulk_create(
+            [HashTag(name=name, name_lower=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        transaction.on_commit(HASHTAG_CACHE.invalidate_all)
+        # ignore_conflicts doesn't return ids, and rivals may have won the insert
+        ids.update(
+            HashTag.objects.filter(name_lower__in=missing).values_list(
+                "name_lower", "id"
+            )
+        )
+    return [ids[name] for name in names]
+
+
+def tag_post_from_text(post) -> list:
+    """Attach the tags written in the title and text of the post"""
+    hashtag_ids = resolve_hashtags(extract_hashtags(post.title, post.text))
+    if not hashtag_ids:
+        return []
+    Through = Post.hashtag.through
+    attached = set(
+        Through.objects.filter(post_id=post.pk).values_list("hashtag_id", flat=True)
+    )
+    added = [pk for pk in hashtag_ids if pk not in attached]
+    Through.objects.bulk_create(
+        [Through(post_id=post.pk, hashtag_id=pk) for pk in added],
+        ignore_conflicts=True,
+    )
+    record_usage(added, uses=1)
+    return added
@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from social_network.models import Comment, Like, Post
+
+RECENT_LIKERS_COUNT = 3
+
+
+def liker_name(user) -> str:
+    profile = getattr(user, "profile", None)
+    return profile.username if profile else user.email
+
+
+def liked_object(like):
+    if like.post_id is not None:
+        return Post, like.post_id, {"post_id": like.post_id}
+    if like.comment_id is not None:
+        return Comment, like.comment_id, {"comment_id": like.comment_id}
+    return None, None, None
+
+
+def first_likers(**lookup) -> list:
+    likes = (
+        Like.objects.filter(**lookup)
+        .select_related("user__profile")
+        .order_by("created_at", "id")[:RECENT_LIKERS_COUNT]
+    )
+    return [liker_name(like.user) for like in likes if like.user]
+
+
+def register_like(like) -> None:
+    """Count a new like and keep the first likers sample without a full scan"""
+    model, pk, _ = liked_object(like)
+    if model is None:
+        return
+    with transaction.atomic():
+        recent_likers = (
+            model.objects.select_for_update()
+            .filter(pk=pk)
+            .values_list("recent_likers", flat=True)
+            .first()
+        )
+        if recent_likers is None:
+            return
+        if len(recent_likers) < RECENT_LIKERS_COUNT and like.user:
+            recent_likers = recent_likers + [liker_name(like.user)]
+        model.objects.filter(pk=pk).update(
+            likes_count=F("likes_count") + 1,
+            recent_likers=recent_likers,
+            version=F("version") + 1,
+            updated_at=timezone.now(),
+        )
+
+
+def unregister_like(like) -> None:
+    """Discount a removed like, refilling the sample only if it held the liker"""
+    model, pk, lookup = liked_object(like)
+    if model is None:
+        return
+    with transaction.atomic():
+        recent_likers = (
+            model.objects.select_for_update()
+            .filter(pk=pk)
+            .values_list("recent_likers", flat=True)
+            .first()
+        )
+        if recent_likers is None:
+            return
+        if like.user and liker_name(like.user) in recent_likers:
+            recent_likers = first_likers(**lookup)
+        model.objects.filter(pk=pk, likes_count__gt=0).update(
+            likes_count=F("likes_count") - 1,
+            recent_likers=recent_likers,
+            version=F("version") + 1,
+            updated_at=timezone.now(),
+        )
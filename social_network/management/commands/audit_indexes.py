@@ -0,0 +1,91 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from social_network.sample_data import rolled_back, seed_sample_data
+from social_network.urls import router as social_network_router
+from user.urls import router as user_router
+
+ROUTERS = (("social_network", social_network_router), ("user", user_router))
+SQLITE_SCAN = re.compile(r"\bSCAN (\S+)(.*)")
+
+
+def plan_issues(plan: str, vendor: str) -> list:
+    """Full table scans and temporary sorts found in an EXPLAIN output"""
+    issues = []
+    for line in plan.splitlines():
+        if vendor == "sqlite":
+            scan = SQLITE_SCAN.search(line)
+            if scan and not scan.group(1).startswith(("(", "CONSTANT")):
+                if "USING" not in scan.group(2):
+                    issues.append(f"full scan of {scan.group(1)}")
+            if "USE TEMP B-TREE" in line:
+                issues.append(line.split("USE ", 1)[1].lower())
+        elif vendor == "postgresql":
+            if "Seq Scan on" in line:
+                issues.append(
+                    "full scan of " + line.split("Seq Scan on ")[1].split()[0]
+                )
+            if re.search(r"->\s+Sort\b|^\s*Sort\b", line):
+                issues.append("sort")
+    return issues
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the list and retrieve querysets of every registered viewset "
+        "through EXPLAIN on a rolled-back sample dataset and report full "
+        "table scans and temporary sorts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=20, help="Posts per user")
+        parser.add_argument(
+            "--strict", action="store_true", help="Exit with an error on any issue"
+        )
+        parser.add_argument(
+            "--verbose-plans", action="store_true", help="Print the full plans"
+        )
+
+    def handle(self, *args, **options):
+        flagged = 0
+        with rolled_back():
+            viewer = seed_sample_data(options["users"], options["posts"])
+            if connection.vendor == "sqlite":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+            for namespace, router in ROUTERS:
+                for prefix, viewset, _ in router.registry:
+                    for action in ("list", "retrieve"):
+                        if not hasattr(viewset, action):
+                            continue
+                        queryset = self.build_queryset(viewset, action, viewer)
+                        plan = queryset.explain()
+                        issues = plan_issues(plan, connection.vendor)
+                        flagged += bool(issues)
+                        self.report(f"{namespace}/{prefix} {action}", issues)
+                        if options["verbose_plans"]:
+                            self.stdout.write(plan)
+        if flagged and options["strict"]:
+            raise CommandError(f"{flagged} querysets need an index")
+
+    def build_queryset(self, viewset, action, viewer):
+        view = viewset(
+            action_map={"get": action}, format_kwarg=None, args=(), kwargs={}
+        )
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, viewer)
+        view.request = view.initialize_request(request)
+        queryset = view.filter_queryset(view.get_queryset())
+        if action == "retrieve":
+            return queryset.filter(pk=queryset.values_list("pk", flat=True).first())
+        return queryset[: view.paginator.get_limit(view.request) or 100]
+
+    def report(self, label, issues):
+        if issues:
+            self.stdout.write(self.style.WARNING(f"{label}: {'; '.join(issues)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{label}: OK"))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from social_network.sample_data import rolled_back, seed_sample_data
+from social_network.views import PostViewSet
+from user.views import ProfileViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare serializer and fast rendering of the post and profile lists "
+        "on a throwaway dataset that is rolled back afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=20, help="Posts per user")
+        parser.add_argument("--page", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            viewer = seed_sample_data(options["users"], options["posts"])
+            for name, viewset in (("posts", PostViewSet), ("profiles", ProfileViewSet)):
+                self.compare(name, viewset, viewer, options)
+
+    def compare(self, name, viewset, viewer, options):
+        view = viewset.as_view({"get": "list"})
+        factory = APIRequestFactory()
+
+        def render(fast):
+            headers = {"HTTP_HOST": "localhost"}
+            if fast:
+                headers["HTTP_X_FAST_RENDER"] = "1"
+            request = factory.get("/", {"limit": options["page"]}, **headers)
+            force_authenticate(request, viewer)
+            response = view(request)
+            if hasattr(response, "render"):
+                response.render()
+            return response.content
+
+        if render(fast=False) != render(fast=True):
+            raise CommandError(f"Fast {name} list differs from the serializer output")
+        timings = {}
+        for fast in (False, True):
+            start = time.perf_counter()
+            for _ in range(options["repeat"]):
+                render(fast)
+            timings[fast] = (time.perf_counter() - start) / options["repeat"]
+        self.stdout.write(
+            f"{name}: serializer {timings[False] * 1000:.1f} ms, "
+            f"fast {timings[True] * 1000:.1f} ms, "
+            f"speedup x{timings[False] / timings[True]:.1f}"
+        )
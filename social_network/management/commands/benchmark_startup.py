@@ -0,0 +1,96 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so every sample is a real cold start
+WORKER_SCRIPT = """
+import json, resource, sys, time
+
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+startup = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+from django.test import Client
+client = Client(REMOTE_ADDR="127.0.0.1")
+path, requests = sys.argv[1], int(sys.argv[2])
+client.get(path)
+started = time.perf_counter()
+for _ in range(requests):
+    client.get(path)
+per_request = (time.perf_counter() - started) / requests
+
+print(json.dumps({
+    "startup_ms": startup * 1000,
+    "rss_mb": rss,
+    "request_ms": per_request * 1000,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker cold start (import time and memory) and per-request "
+        "overhead of the development and production settings profiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Workers per profile")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--path",
+            default="/api/user/profiles/",
+            help="Endpoint answered without touching the database",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'profile':<12} {'startup ms':>11} {'rss MB':>8} "
+            f"{'request ms':>11} {'modules':>8}"
+        )
+        for profile in ("development", "production"):
+            samples = [self.sample(profile, options) for _ in range(options["runs"])]
+            medians = {
+                key: statistics.median(sample[key] for sample in samples)
+                for key in samples[0]
+            }
+            self.stdout.write(
+                f"{profile:<12} {medians['startup_ms']:>11.1f} "
+                f"{medians['rss_mb']:>8.1f} {medians['request_ms']:>11.3f} "
+                f"{medians['modules']:>8.0f}"
+            )
+
+    def sample(self, profile, options) -> dict:
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get(
+                "DJANGO_SETTINGS_MODULE", "social_media_api.settings"
+            ),
+            "DJANGO_ENV": profile,
+            "ALLOWED_HOSTS": "testserver",
+        }
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                WORKER_SCRIPT,
+                options["path"],
+                str(options["requests"]),
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"{profile} worker failed:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
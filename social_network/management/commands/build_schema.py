@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from social_media_api.schema import build_schema, code_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Prebuild the OpenAPI schema of the current code version "
+        "so /api/schema/ never generates it on a request"
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        path = build_schema()
+        self.stdout.write(
+            f"Schema {code_version()} written to {path} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
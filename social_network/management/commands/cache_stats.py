@@ -0,0 +1,23 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from social_media_api.cache import TwoTierCache
+
+
+class Command(BaseCommand):
+    help = "Print hits, misses and the hit ratio of every two-tier cache"
+
+    def handle(self, *args, **options):
+        # The caches register themselves when the views are imported
+        import_module(settings.ROOT_URLCONF)
+        for namespace, cache in sorted(TwoTierCache.registry.items()):
+            metrics = cache.metrics()
+            hit_ratio = metrics.pop("hit_ratio")
+            counters = ", ".join(
+                f"{key} {value}" for key, value in sorted(metrics.items())
+            )
+            self.stdout.write(
+                f"{namespace}: hit ratio {hit_ratio:.1%} ({counters or 'no reads'})"
+            )
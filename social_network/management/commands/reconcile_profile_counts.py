@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from user.stats import CHUNK_SIZE, reconcile_all_profiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount posts, followers and following of every profile chunk by "
+        "chunk and fix the stored counters that drifted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        checked = fixed = 0
+        for chunk_checked, chunk_fixed in reconcile_all_profiles(options["chunk_size"]):
+            checked += chunk_checked
+            fixed += chunk_fixed
+            if options["verbosity"] > 1:
+                self.stdout.write(f"checked {checked}, fixed {fixed}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Checked {checked} profiles, fixed {fixed}")
+        )
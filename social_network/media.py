@@ -0,0 +1,247 @@
+import hashlib
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from social_media_api.lazy import lazy_import
+from social_network import changelog
+from social_network.models import Attachment, MediaBlob, Post
+
+Image = lazy_import("PIL.Image")
+
+MAX_ATTACHMENT_SIZE = 50 * 1024 * 1024
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_ATTACHMENTS_PER_POST = 10
+READ_SIZE = 64 * 1024
+STALE_UPLOAD_AFTER = timedelta(hours=24)
+ALLOWED_CONTENT_TYPES = (
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "video/mp4",
+)
+
+
+class UploadOffsetMismatch(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Upload-Offset does not match the stored size."
+    default_code = "upload_offset_mismatch"
+
+    def __init__(self, received):
+        super().__init__()
+        # Kept out of the detail coercion so clients get the offset as a number
+        self.detail = {"detail": self.detail, "offset": received}
+
+
+def part_path(attachment_id) -> Path:
+    return Path(settings.UPLOAD_PARTS_DIR) / f"{attachment_id}.part"
+
+
+def write_chunk(attachment_id, offset, stream, length) -> Attachment:
+    """
+    Append a chunk read from the stream at ``offset``, which must be the
+    number of bytes received so far. Bytes written before a dropped
+    connection are kept, so the client resumes from the returned offset.
+    """
+    with transaction.atomic():
+        # Locked so two retries of one chunk can't interleave their writes
+        attachment = Attachment.objects.select_for_update().get(pk=attachment_id)
+        if attachment.status != "uploading":
+            raise ValidationError("The upload is already complete")
+        if offset != attachment.received:
+            raise UploadOffsetMismatch(attachment.received)
+        if offset + length > attachment.size:
+            raise ValidationError("The chunk runs past the declared size")
+
+        path = part_path(attachment.pk)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with open(path, "r+b" if path.exists() else "wb") as part:
+            part.seek(offset)
+            part.truncate()
+            while written < length:
+                data = stream.read(min(READ_SIZE, length - written))
+                if not data:
+                    break
+                part.write(data)
+                written += len(data)
+
+        attachment.received = offset + written
+        if attachment.received == attachment.size:
+            attachment.status = "processing"
+        attachment.save(update_fields=["received", "status", "updated_at"])
+    return attachment
+
+
+def hash_file(path):
+    """sha256 and size of a file, read READ_SIZE at a time"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as file:
+        while data := file.read(READ_SIZE):
+            digest.update(data)
+            size += len(data)
+    return digest.hexdigest(), size
+
+
+def image_dimensions(path):
+    """Width and height read from the image header, None when it isn't an image"""
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except (OSError, Image.DecompressionBombError):
+        return None
+
+
+def store_blob(path, digest, attachment, dimensions) -> MediaBlob:
+    """
+    Point the attachment at the blob of the digest, storing the part file
+    only if the content is new, and mark the attachment ready.
+    """
+    with transaction.atomic():
+        # Locked until the attachment refers to it: expire_stale_uploads
+        # locks it too, so it can't delete a blob that is being reused
+        blob = MediaBlob.objects.select_for_update().filter(sha256=digest).first()
+        if blob is not None:
+            return mark_ready(attachment, blob)
+    width, height = dimensions or (None, None)
+    blob = MediaBlob(
+        sha256=digest,
+        size=attachment.size,
+        content_type=attachment.content_type,
+        width=width,
+        height=height,
+    )
+    with open(path, "rb") as part:
+        blob.file.save(attachment.filename, File(part), save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # The same content was stored by a concurrent upload
+        blob.file.delete(save=False)
+        blob = MediaBlob.objects.get(sha256=digest)
+    # A blob created just now is too young for expiry to touch
+    return mark_ready(attachment, blob)
+
+
+def mark_ready(attachment, blob) -> MediaBlob:
+    attachment.blob = blob
+    attachment.status = "ready"
+    attachment.save(update_fields=["blob", "status", "updated_at"])
+    return blob
+
+
+def process_attachment(attachment_id) -> str:
+    """
+    Hash a completed upload, store it content-addressed unless an identical
+    file already exists, and publish it on its post.
+    """
+    attachment = Attachment.objects.filter(pk=attachment_id).first()
+    if attachment is None or attachment.status != "processing":
+        return "skipped"
+    path = part_path(attachment.pk)
+    try:
+        digest, size = hash_file(path)
+    except FileNotFoundError:
+        digest, size = None, None
+    dimensions = None
+    if attachment.content_type.startswith("image/"):
+        dimensions = image_dimensions(path)
+    if size != attachment.size or (
+        attachment.content_type.startswith("image/") and dimensions is None
+    ):
+        attachment.status = "failed"
+        attachment.save(update_fields=["status", "updated_at"])
+        path.unlink(missing_ok=True)
+        return attachment.status
+
+    store_blob(path, digest, attachment, dimensions)
+    path.unlink(missing_ok=True)
+    if attachment.post_id:
+        refresh_post_media(attachment.post_id)
+    return attachment.status
+
+
+def media_summary(attachments) -> list:
+    return [
+        {
+            "id": str(attachment.pk),
+            "url": attachment.blob.file.url,
+            "content_type": attachment.blob.content_type,
+            "size": attachment.blob.size,
+            "width": attachment.blob.width,
+            "height": attachment.blob.height,
+        }
+        for attachment in attachments
+    ]
+
+
+def refresh_post_media(post_id) -> None:
+    """Rewrite the media summary posts are served with, so lists need no join"""
+    attachments = (
+        Attachment.objects.filter(post_id=post_id, status="ready")
+        .select_related("blob")
+        .order_by("position", "created_at")
+    )
+    post = Post.objects.only("id", "user_id").filter(pk=post_id).first()
+    if post is None:
+        return
+    Post.objects.filter(pk=post_id).update(
+        media=media_summary(attachments),
+        version=F("version") + 1,
+        updated_at=timezone.now(),
+    )
+    changelog.record([changelog.post_change(post)])
+
+
+def remove_attachment(attachment) -> None:
+    """Delete the attachment and its partial file; unused blobs go on expiry"""
+    post_id = attachment.post_id
+    attachment.delete()
+    part_path(attachment.pk).unlink(missing_ok=True)
+    if post_id:
+        refresh_post_media(post_id)
+
+
+def expire_stale_uploads(now=None) -> dict:
+    """
+    Drop uploads abandoned for STALE_UPLOAD_AFTER, their leftover partial
+    files, and blobs no attachment refers to any more.
+    """
+    cutoff = (now or timezone.now()) - STALE_UPLOAD_AFTER
+    stale = Attachment.objects.filter(
+        status__in=("uploading", "failed"), updated_at__lt=cutoff
+    )
+    stale_ids = list(stale.values_list("pk", flat=True))
+    Attachment.objects.filter(pk__in=stale_ids).delete()
+
+    parts = 0
+    parts_dir = Path(settings.UPLOAD_PARTS_DIR)
+    if parts_dir.exists():
+        for path in parts_dir.glob("*.part"):
+            if path.stat().st_mtime < cutoff.timestamp():
+                path.unlink(missing_ok=True)
+                parts += 1
+
+    blobs = 0
+    for blob in MediaBlob.objects.filter(
+        attachments__isnull=True, created_at__lt=cutoff
+    ).iterator():
+        with transaction.atomic():
+            # Waits for a store_blob reusing it, then skips it if it was claimed
+            locked = MediaBlob.objects.select_for_update().filter(pk=blob.pk).first()
+            if locked is None or locked.attachments.exists():
+                continue
+            locked.delete()
+        blob.file.delete(save=False)
+        blobs += 1
+    return {"uploads": len(stale_ids), "parts": parts, "blobs": blobs}
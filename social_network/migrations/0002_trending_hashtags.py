@@ -0,0 +1,99 @@
+# Generated by Django 4.2.4 on 2026-10-19 08:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrendingHashTag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "window",
+                    models.CharField(
+                        choices=[
+                            ("1h", "1 hour"),
+                            ("24h", "24 hours"),
+                            ("7d", "7 days"),
+                        ],
+                        max_length=3,
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("uses", models.PositiveIntegerField()),
+                ("engagement", models.PositiveIntegerField()),
+                ("score", models.PositiveIntegerField()),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "hashtag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trending",
+                        to="social_network.hashtag",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("window", "rank"),
+            },
+        ),
+        migrations.CreateModel(
+            name="HashTagUsageBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                ("span", models.PositiveIntegerField()),
+                ("uses", models.PositiveIntegerField(default=0)),
+                ("engagement", models.PositiveIntegerField(default=0)),
+                (
+                    "hashtag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="usage_buckets",
+                        to="social_network.hashtag",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="trendinghashtag",
+            constraint=models.UniqueConstraint(
+                fields=("window", "rank"), name="unique_trending_window_rank"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="hashtagusagebucket",
+            index=models.Index(
+                fields=["span", "bucket_start"], name="social_netw_span_b90d2b_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="hashtagusagebucket",
+            constraint=models.UniqueConstraint(
+                fields=("hashtag", "bucket_start", "span"),
+                name="unique_hashtag_usage_bucket",
+            ),
+        ),
+    ]
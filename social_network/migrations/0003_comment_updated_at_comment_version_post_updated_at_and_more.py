@@ -0,0 +1,32 @@
+# Generated by Django 4.2.4 on 2026-10-19 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0002_trending_hashtags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
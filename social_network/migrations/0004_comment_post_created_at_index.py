@@ -0,0 +1,21 @@
+# Generated by Django 4.2.4 on 2026-10-19 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "social_network",
+            "0003_comment_updated_at_comment_version_post_updated_at_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "created_at"], name="social_netw_post_id_86dd91_idx"
+            ),
+        ),
+    ]
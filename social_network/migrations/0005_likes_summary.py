@@ -0,0 +1,63 @@
+# Generated by Django 4.2.4 on 2026-10-19 08:59
+
+from django.db import migrations, models
+from django.db.models import Count
+
+RECENT_LIKERS_COUNT = 3
+
+
+def backfill_like_summaries(apps, schema_editor):
+    Like = apps.get_model("social_network", "Like")
+    for model_name, field in (("Post", "post"), ("Comment", "comment")):
+        model = apps.get_model("social_network", model_name)
+        counts = (
+            Like.objects.filter(**{f"{field}__isnull": False})
+            .values_list(f"{field}_id")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for pk, total in counts.iterator():
+            likers = (
+                Like.objects.filter(**{f"{field}_id": pk}, user__isnull=False)
+                .order_by("created_at", "id")
+                .values_list("user__profile__username", "user__email")[
+                    :RECENT_LIKERS_COUNT
+                ]
+            )
+            model.objects.filter(pk=pk).update(
+                likes_count=total,
+                recent_likers=[username or email for username, email in likers],
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0004_comment_post_created_at_index"),
+        ("user", "0005_profile_updated_at_profile_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="recent_likers",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="recent_likers",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(
+            backfill_like_summaries, reverse_code=migrations.RunPython.noop
+        ),
+    ]
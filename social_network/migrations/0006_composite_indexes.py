@@ -0,0 +1,42 @@
+# Generated by Django 4.2.4 on 2026-10-19 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0005_likes_summary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["user", "post"], name="social_netw_user_id_fbd39f_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["user", "comment"], name="social_netw_user_id_ffe328_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["post", "created_at"], name="social_netw_post_id_6a2d5c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["comment", "created_at"], name="social_netw_comment_428448_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["user", "created_at"], name="social_netw_user_id_e126c0_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 4.2.4 on 2026-10-19 09:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("social_network", "0006_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedComment",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("text", models.TextField()),
+                ("created_at", models.DateTimeField()),
+                ("likes_count", models.PositiveIntegerField(default=0)),
+                ("recent_likers", models.JSONField(default=list)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedPost",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("title", models.CharField(max_length=60)),
+                ("text", models.TextField()),
+                ("hashtag_names", models.JSONField(default=list)),
+                ("comments_count", models.PositiveIntegerField(default=0)),
+                ("likes_count", models.PositiveIntegerField(default=0)),
+                ("recent_likers", models.JSONField(default=list)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_posts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedLike",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField()),
+                (
+                    "comment",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="likes",
+                        to="social_network.archivedcomment",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="likes",
+                        to="social_network.archivedpost",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_likes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="archivedcomment",
+            name="post",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="comments",
+                to="social_network.archivedpost",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedcomment",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_comments",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedcomment",
+            index=models.Index(
+                fields=["post", "created_at"], name="social_netw_post_id_a45921_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.4 on 2026-10-19 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0007_archive_tables"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="DeletionJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "target",
+                    models.CharField(
+                        choices=[
+                            ("user", "User"),
+                            ("profile", "Profile"),
+                            ("post", "Post"),
+                        ],
+                        max_length=7,
+                    ),
+                ),
+                ("object_id", models.PositiveBigIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                        ],
+                        default="pending",
+                        max_length=7,
+                    ),
+                ),
+                ("step", models.PositiveSmallIntegerField(default=0)),
+                ("progress", models.JSONField(default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "updated_at"],
+                        name="social_netw_status_85a2f7_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.4 on 2026-10-19 09:22
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import F
+import django.db.models.functions.text
+
+
+def merge_case_duplicates(apps, schema_editor):
+    """Fold hashtags differing only in case into the oldest one"""
+    HashTag = apps.get_model("social_network", "HashTag")
+    Through = apps.get_model("social_network", "Post").hashtag.through
+    Bucket = apps.get_model("social_network", "HashTagUsageBucket")
+    TrendingHashTag = apps.get_model("social_network", "TrendingHashTag")
+
+    groups = defaultdict(list)
+    for pk, name in HashTag.objects.order_by("id").values_list("id", "name"):
+        groups[name.lower()].append(pk)
+    for keeper, *duplicates in groups.values():
+        if not duplicates:
+            continue
+        tagged = set(
+            Through.objects.filter(hashtag_id=keeper).values_list("post_id", flat=True)
+        )
+        for row in Through.objects.filter(hashtag_id__in=duplicates):
+            if row.post_id not in tagged:
+                Through.objects.create(post_id=row.post_id, hashtag_id=keeper)
+                tagged.add(row.post_id)
+        for bucket in Bucket.objects.filter(hashtag_id__in=duplicates):
+            merged, _ = Bucket.objects.get_or_create(
+                hashtag_id=keeper, bucket_start=bucket.bucket_start, span=bucket.span
+            )
+            Bucket.objects.filter(pk=merged.pk).update(
+                uses=F("uses") + bucket.uses,
+                engagement=F("engagement") + bucket.engagement,
+            )
+        # Rankings are rebuilt by the next refresh
+        TrendingHashTag.objects.filter(hashtag_id__in=duplicates).delete()
+        HashTag.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0008_soft_delete"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_case_duplicates, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="hashtag",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("name"),
+                name="unique_hashtag_name_lower",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.4 on 2026-10-19 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0010_post_attachments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLogEntry",
+            fields=[
+                ("seq", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("post", "Post"),
+                            ("comment", "Comment"),
+                            ("like", "Like"),
+                            ("follow", "Follow"),
+                        ],
+                        max_length=7,
+                    ),
+                ),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("deleted", models.BooleanField(default=False)),
+                ("owner_id", models.PositiveBigIntegerField()),
+                ("actor_id", models.PositiveBigIntegerField(null=True)),
+                ("post_id", models.PositiveBigIntegerField(null=True)),
+                ("comment_id", models.PositiveBigIntegerField(null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["owner_id", "seq"],
+                        name="social_netw_owner_i_a4516b_idx",
+                    ),
+                    models.Index(
+                        fields=["actor_id", "seq"],
+                        name="social_netw_actor_i_8ca764_idx",
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="social_netw_created_db288c_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
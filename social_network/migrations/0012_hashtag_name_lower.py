@@ -0,0 +1,37 @@
+# Generated by Django 4.2.4 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_name_lower(apps, schema_editor):
+    HashTag = apps.get_model("social_network", "HashTag")
+    rows = HashTag.objects.only("id", "name").order_by("pk")
+    batch = []
+    for hashtag in rows.iterator(chunk_size=BATCH_SIZE):
+        hashtag.name_lower = hashtag.name.lower()
+        batch.append(hashtag)
+        if len(batch) == BATCH_SIZE:
+            HashTag.objects.bulk_update(batch, ["name_lower"], batch_size=BATCH_SIZE)
+            batch = []
+    HashTag.objects.bulk_update(batch, ["name_lower"], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0011_change_log"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hashtag",
+            name="name_lower",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_name_lower, migrations.RunPython.noop),
+    ]
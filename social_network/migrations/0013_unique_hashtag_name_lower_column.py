@@ -0,0 +1,53 @@
+# Generated by Django 4.2.4 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+def merge_duplicate_hashtags(apps, schema_editor):
+    """
+    Lower("name") is ASCII-only on SQLite, so tags like "Élise" and "élise"
+    could both exist. Keep the oldest of each group and move posts onto it.
+    """
+    HashTag = apps.get_model("social_network", "HashTag")
+    Post = apps.get_model("social_network", "Post")
+    Through = Post.hashtag.through
+    duplicates = (
+        HashTag.objects.values("name_lower")
+        .annotate(total=models.Count("id"), keep=models.Min("id"))
+        .filter(total__gt=1)
+    )
+    for group in list(duplicates):
+        merged = HashTag.objects.filter(name_lower=group["name_lower"]).exclude(
+            pk=group["keep"]
+        )
+        tagged = Through.objects.filter(hashtag_id=group["keep"]).values("post_id")
+        for hashtag_id in merged.values_list("id", flat=True):
+            Through.objects.filter(hashtag_id=hashtag_id).exclude(
+                post_id__in=tagged
+            ).update(hashtag_id=group["keep"])
+        merged.delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0012_hashtag_name_lower"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="hashtag",
+            name="unique_hashtag_name_lower",
+        ),
+        migrations.RunPython(merge_duplicate_hashtags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="hashtag",
+            name="name_lower",
+            field=models.CharField(editable=False, max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name="hashtag",
+            constraint=models.UniqueConstraint(
+                fields=("name_lower",), name="unique_hashtag_name_lower"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.4 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("social_network", "0013_unique_hashtag_name_lower_column"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="changelogentry",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("post", "Post"),
+                    ("comment", "Comment"),
+                    ("like", "Like"),
+                    ("follow", "Follow"),
+                    ("user", "User"),
+                ],
+                max_length=7,
+            ),
+        ),
+    ]
@@ -1,6 +1,11 @@
+import os
+import uuid
+
 from django.db import models
 
 from social_media_api import settings
+from social_media_api.prefix_search import normalize
+from user.models import VersionedModel
 
 
 class Like(models.Model):
@@ -18,11 +23,19 @@ class Like(models.Model):
         "Comment", on_delete=models.SET_NULL, null=True, related_name="likes"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=("user", "post")),
+            models.Index(fields=("user", "comment")),
+            models.Index(fields=("post", "created_at")),
+            models.Index(fields=("comment", "created_at")),
+        ]
+
     def __str__(self):
         return f"Liked at: {self.created_at} by {self.user}"
 
 
-class Comment(models.Model):
+class Comment(VersionedModel):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="comments"
     )
@@ -31,6 +44,11 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    likes_count = models.PositiveIntegerField(default=0)
+    recent_likers = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=("post", "created_at"))]
 
     def __str__(self):
         return f"Comment created at: {self.created_at}"
@@ -38,12 +56,28 @@ class Comment(models.Model):
 
 class HashTag(models.Model):
     name = models.CharField(max_length=255)
+    # Written on save, see social_media_api.prefix_search.normalize
+    name_lower = models.CharField(max_length=255, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("name_lower",), name="unique_hashtag_name_lower"
+            )
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.name_lower = normalize(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "name_lower"}
+        super().save(*args, **kwargs)
+
 
-class Post(models.Model):
+class Post(VersionedModel):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="posts"
     )
@@ -51,6 +85,243 @@ class Post(models.Model):
     title = models.CharField(max_length=60, unique=True)
     text = models.TextField()
     hashtag = models.ManyToManyField(HashTag, related_name="posts")
+    likes_count = models.PositiveIntegerField(default=0)
+    recent_likers = models.JSONField(default=list, blank=True)
+    media = models.JSONField(default=list, blank=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=("user", "created_at"))]
+
+    def __str__(self):
+        return self.title
+
+
+class HashTagUsageBucket(models.Model):
+    hashtag = models.ForeignKey(
+        HashTag, on_delete=models.CASCADE, related_name="usage_buckets"
+    )
+    bucket_start = models.DateTimeField()
+    span = models.PositiveIntegerField()
+    uses = models.PositiveIntegerField(default=0)
+    engagement = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("hashtag", "bucket_start", "span"),
+                name="unique_hashtag_usage_bucket",
+            )
+        ]
+        indexes = [models.Index(fields=("span", "bucket_start"))]
+
+    def __str__(self):
+        return f"{self.hashtag_id} at {self.bucket_start} ({self.span}s)"
+
+
+class TrendingHashTag(models.Model):
+    WINDOW_CHOICES = (("1h", "1 hour"), ("24h", "24 hours"), ("7d", "7 days"))
+
+    window = models.CharField(max_length=3, choices=WINDOW_CHOICES)
+    rank = models.PositiveSmallIntegerField()
+    hashtag = models.ForeignKey(
+        HashTag, on_delete=models.CASCADE, related_name="trending"
+    )
+    uses = models.PositiveIntegerField()
+    engagement = models.PositiveIntegerField()
+    score = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("window", "rank")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("window", "rank"), name="unique_trending_window_rank"
+            )
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} in {self.window}"
+
+
+class ArchivedPost(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_posts",
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    title = models.CharField(max_length=60)
+    text = models.TextField()
+    hashtag_names = models.JSONField(default=list)
+    comments_count = models.PositiveIntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0)
+    recent_likers = models.JSONField(default=list)
+    media = models.JSONField(default=list)
+    archived_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return self.title
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_comments",
+    )
+    post = models.ForeignKey(
+        ArchivedPost, on_delete=models.CASCADE, related_name="comments"
+    )
+    text = models.TextField()
+    created_at = models.DateTimeField()
+    likes_count = models.PositiveIntegerField(default=0)
+    recent_likers = models.JSONField(default=list)
+
+    class Meta:
+        indexes = [models.Index(fields=("post", "created_at"))]
+
+    def __str__(self):
+        return f"Comment created at: {self.created_at}"
+
+
+class ArchivedLike(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="archived_likes",
+    )
+    post = models.ForeignKey(
+        ArchivedPost, on_delete=models.CASCADE, null=True, related_name="likes"
+    )
+    comment = models.ForeignKey(
+        ArchivedComment, on_delete=models.CASCADE, null=True, related_name="likes"
+    )
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Liked at: {self.created_at} by {self.user}"
+
+
+class DeletionJob(models.Model):
+    TARGET_CHOICES = (("user", "User"), ("profile", "Profile"), ("post", "Post"))
+    STATUS_CHOICES = (("pending", "Pending"), ("running", "Running"), ("done", "Done"))
+
+    target = models.CharField(max_length=7, choices=TARGET_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default="pending")
+    step = models.PositiveSmallIntegerField(default=0)
+    progress = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=("status", "updated_at"))]
+
+    def __str__(self):
+        return f"Deletion of {self.target} {self.object_id}: {self.status}"
+
+
+def media_blob_file_path(instance, filename):
+    _, extension = os.path.splitext(filename)
+    digest = instance.sha256
+    return os.path.join(
+        "uploads/media/", digest[:2], digest[2:4], f"{digest}{extension.lower()}"
+    )
+
+
+class MediaBlob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=media_blob_file_path, max_length=255)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
+class Attachment(models.Model):
+    STATUS_CHOICES = (
+        ("uploading", "Uploading"),
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="attachments"
+    )
+    # Archiving a post detaches its attachments, which keeps their blobs
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, null=True, related_name="attachments"
+    )
+    blob = models.ForeignKey(
+        MediaBlob, on_delete=models.PROTECT, null=True, related_name="attachments"
+    )
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default="uploading"
+    )
+    position = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("post", "position")),
+            models.Index(fields=("status", "updated_at")),
+        ]
+
+    def __str__(self):
+        return f"{self.filename}: {self.status}"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Append-only record of changes for delta sync. Ids are plain integers so
+    entries outlive the rows they describe.
+    """
+
+    KIND_CHOICES = (
+        ("post", "Post"),
+        ("comment", "Comment"),
+        ("like", "Like"),
+        ("follow", "Follow"),
+        ("user", "User"),
+    )
+
+    seq = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    deleted = models.BooleanField(default=False)
+    # Author of the changed content, or the followed user
+    owner_id = models.PositiveBigIntegerField()
+    # User who made the change, or the follower
+    actor_id = models.PositiveBigIntegerField(null=True)
+    post_id = models.PositiveBigIntegerField(null=True)
+    comment_id = models.PositiveBigIntegerField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("owner_id", "seq")),
+            models.Index(fields=("actor_id", "seq")),
+            models.Index(fields=("created_at",)),
+        ]
+
+    def __str__(self):
+        action = "deleted" if self.deleted else "changed"
+        return f"{self.seq}: {self.kind} {self.object_id} {action}"
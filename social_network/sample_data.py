@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from social_network.models import Comment, HashTag, Like, Post
+from user.models import Profile, User
+
+
+def seed_sample_data(users_count: int, posts_count: int) -> User:
+    """
+    Bulk-create users following each other with tagged, commented and
+    liked posts. Returns the first user, who follows everyone else.
+    """
+    users = User.objects.bulk_create(
+        User(email=f"sample{i}@sample.local") for i in range(users_count)
+    )
+    profiles = Profile.objects.bulk_create(
+        Profile(
+            user=user, username=f"sample{i}", username_lower=f"sample{i}", bio="bio"
+        )
+        for i, user in enumerate(users)
+    )
+    viewer = profiles[0]
+    viewer.following.add(*users[1:])
+    for profile in profiles[1:]:
+        profile.followers.add(*users[:10])
+    hashtags = HashTag.objects.bulk_create(
+        HashTag(name=f"tag{i}", name_lower=f"tag{i}") for i in range(10)
+    )
+    posts = Post.objects.bulk_create(
+        Post(user=user, title=f"sample-{i}-{j}", text="text " * 20)
+        for i, user in enumerate(users)
+        for j in range(posts_count)
+    )
+    Post.hashtag.through.objects.bulk_create(
+        Post.hashtag.through(post=post, hashtag=hashtags[k])
+        for i, post in enumerate(posts)
+        for k in range(i % 4)
+    )
+    Comment.objects.bulk_create(
+        Comment(user=users[i % users_count], post=post, text="comment")
+        for i, post in enumerate(posts)
+    )
+    Like.objects.bulk_create(
+        Like(user=users[i % users_count], post=post) for i, post in enumerate(posts)
+    )
+    return viewer.user
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
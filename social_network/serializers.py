@@ -1,18 +1,141 @@
+from django.db import transaction
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from social_network.models import HashTag, Post, Comment, Like
-
-
-class HashTagSerializer(serializers.ModelSerializer):
+from social_media_api.prefix_search import normalize
+from social_media_api.sparse import SparseFieldsMixin
+from social_network.hashtags import tag_post_from_text
+from social_network.media import (
+    ALLOWED_CONTENT_TYPES,
+    MAX_ATTACHMENT_SIZE,
+    MAX_ATTACHMENTS_PER_POST,
+)
+from social_network.models import (
+    ArchivedComment,
+    ArchivedPost,
+    Attachment,
+    HashTag,
+    Post,
+    Comment,
+    Like,
+    TrendingHashTag,
+)
+
+LATEST_COMMENTS_COUNT = 3
+
+
+class HashTagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = HashTag
         fields = ("name",)
 
+    def validate_name(self, value):
+        duplicates = HashTag.objects.filter(name_lower=normalize(value))
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError("Hashtag with this name already exists.")
+        return value
+
+
+class TrendingHashTagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    name = serializers.CharField(source="hashtag.name", read_only=True)
+
+    class Meta:
+        model = TrendingHashTag
+        fields = ("rank", "name", "uses", "engagement", "score", "computed_at")
+
+
+class LikesSummarySerializer(serializers.Serializer):
+    count = serializers.IntegerField(source="likes_count", read_only=True)
+    recent = serializers.ListField(
+        source="recent_likers", child=serializers.CharField(), read_only=True
+    )
+    liked_by_me = serializers.SerializerMethodField()
+
+    def get_liked_by_me(self, obj) -> bool:
+        if hasattr(obj, "liked_by_me"):
+            return obj.liked_by_me
+        request = self.context.get("request")
+        if request is None or not request.user.is_authenticated:
+            return False
+        return obj.likes.filter(user=request.user).exists()
+
+
+class LikerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    user = serializers.StringRelatedField(many=False, read_only=True)
+    username = serializers.CharField(source="user.profile.username", read_only=True)
 
-class PostSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Like
+        fields = ("user", "username", "created_at")
+
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = ("id", "title", "text", "hashtag", "created_at")
+        extra_kwargs = {"hashtag": {"required": False, "allow_empty": True}}
+
+    def create(self, validated_data):
+        """Create post, adding the #tags found in its title and text"""
+        with transaction.atomic():
+            post = super().create(validated_data)
+            tag_post_from_text(post)
+        return post
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            post = super().update(instance, validated_data)
+            tag_post_from_text(post)
+        return post
+
+
+class PostMediaSerializer(serializers.Serializer):
+    id = serializers.CharField()
+    url = serializers.CharField()
+    content_type = serializers.CharField()
+    size = serializers.IntegerField()
+    width = serializers.IntegerField(allow_null=True)
+    height = serializers.IntegerField(allow_null=True)
+
+
+class AttachmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Attachment
+        fields = (
+            "id",
+            "post",
+            "filename",
+            "content_type",
+            "size",
+            "received",
+            "status",
+            "created_at",
+        )
+        read_only_fields = ("id", "post", "received", "status", "created_at")
+
+    def validate_content_type(self, value):
+        if value not in ALLOWED_CONTENT_TYPES:
+            raise serializers.ValidationError(
+                f"Allowed types are {', '.join(ALLOWED_CONTENT_TYPES)}"
+            )
+        return value
+
+    def validate_size(self, value):
+        if not 0 < value <= MAX_ATTACHMENT_SIZE:
+            raise serializers.ValidationError(
+                f"Size must be between 1 and {MAX_ATTACHMENT_SIZE} bytes"
+            )
+        return value
+
+    def validate(self, attrs):
+        post = self.context["post"]
+        if post.attachments.count() >= MAX_ATTACHMENTS_PER_POST:
+            raise serializers.ValidationError(
+                f"A post can have up to {MAX_ATTACHMENTS_PER_POST} attachments"
+            )
+        return attrs
 
 
 class PostListSerializer(PostSerializer):
@@ -20,6 +143,7 @@ class PostListSerializer(PostSerializer):
     hashtag = serializers.SlugRelatedField(many=True, read_only=True, slug_field="name")
     comments_count = serializers.IntegerField(read_only=True)
     likes_count = serializers.IntegerField(read_only=True)
+    media = PostMediaSerializer(many=True, read_only=True)
 
     class Meta:
         model = Post
@@ -28,6 +152,7 @@ class PostListSerializer(PostSerializer):
             "user",
             "title",
             "text",
+            "media",
             "comments_count",
             "likes_count",
             "hashtag",
@@ -35,13 +160,21 @@ class PostListSerializer(PostSerializer):
         )
 
 
+class PostCommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    user = serializers.StringRelatedField(many=False, read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ("id", "user", "text", "created_at")
+
+
 class PostDetailSerializer(PostSerializer):
     user = serializers.StringRelatedField(many=False, read_only=True)
     hashtag = serializers.SlugRelatedField(many=True, read_only=True, slug_field="name")
-    comments = serializers.SlugRelatedField(
-        many=True, read_only=True, slug_field="text"
-    )
-    likes = serializers.StringRelatedField(many=True, read_only=True)
+    comments_count = serializers.SerializerMethodField()
+    latest_comments = serializers.SerializerMethodField()
+    likes = LikesSummarySerializer(source="*", read_only=True)
+    media = PostMediaSerializer(many=True, read_only=True)
 
     class Meta:
         model = Post
@@ -50,14 +183,30 @@ class PostDetailSerializer(PostSerializer):
             "user",
             "title",
             "text",
-            "comments",
+            "media",
+            "comments_count",
+            "latest_comments",
             "likes",
             "hashtag",
             "created_at",
         )
 
+    def get_comments_count(self, obj) -> int:
+        if hasattr(obj, "comments_count"):
+            return obj.comments_count
+        return obj.comments.count()
+
+    @extend_schema_field(PostCommentSerializer(many=True))
+    def get_latest_comments(self, obj):
+        comments = getattr(obj, "latest_comments", None)
+        if comments is None:
+            comments = obj.comments.select_related("user").order_by(
+                "-created_at", "-id"
+            )[:LATEST_COMMENTS_COUNT]
+        return PostCommentSerializer(comments, many=True).data
 
-class CommentSerializer(serializers.ModelSerializer):
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ("id", "post", "text", "created_at")
@@ -65,35 +214,23 @@ class CommentSerializer(serializers.ModelSerializer):
 
 class CommentListSerializer(CommentSerializer):
     post = serializers.SlugRelatedField(many=False, read_only=True, slug_field="title")
-    likes = serializers.StringRelatedField(many=True, read_only=True)
+    likes = LikesSummarySerializer(source="*", read_only=True)
 
     class Meta:
         model = Comment
         fields = ("id", "post", "text", "likes", "created_at")
 
 
-class LikePostSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Like
-        fields = ("id", "user", "created_at")
-
-
-class LikeCommentSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Like
-        fields = ("id", "user", "created_at")
-
-
-class PostLikeSerializer(serializers.ModelSerializer):
-    likes = LikePostSerializer(many=True, read_only=True)
+class PostLikeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    likes = LikesSummarySerializer(source="*", read_only=True)
 
     class Meta:
         model = Post
         fields = ("likes",)
 
 
-class CommentLikeSerializer(serializers.ModelSerializer):
-    likes = LikeCommentSerializer(many=True, read_only=True)
+class CommentLikeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    likes = LikesSummarySerializer(source="*", read_only=True)
 
     class Meta:
         model = Comment
@@ -101,15 +238,16 @@ class CommentLikeSerializer(serializers.ModelSerializer):
 
 
 class CommentDetailSerializer(CommentSerializer):
-    post = PostDetailSerializer(many=False, read_only=True)
-    likes = serializers.StringRelatedField(many=True, read_only=True)
+    post = serializers.PrimaryKeyRelatedField(many=False, read_only=True)
+    likes = LikesSummarySerializer(source="*", read_only=True)
+    expandable_fields = {"post": PostDetailSerializer}
 
     class Meta:
         model = Comment
         fields = ("id", "post", "text", "likes", "created_at")
 
 
-class LikeListPostSerializer(serializers.ModelSerializer):
+class LikeListPostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     post = serializers.SlugRelatedField(many=False, read_only=True, slug_field="title")
 
     class Meta:
@@ -117,7 +255,7 @@ class LikeListPostSerializer(serializers.ModelSerializer):
         fields = ("id", "post", "created_at")
 
 
-class LikeListCommentSerializer(serializers.ModelSerializer):
+class LikeListCommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     comment = serializers.SlugRelatedField(
         many=False, read_only=True, slug_field="text"
     )
@@ -125,3 +263,57 @@ class LikeListCommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Like
         fields = ("id", "comment", "created_at")
+
+
+class ArchivedPostDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    user = serializers.StringRelatedField(many=False, read_only=True)
+    latest_comments = serializers.SerializerMethodField()
+    likes = LikesSummarySerializer(source="*", read_only=True)
+    hashtag = serializers.ListField(
+        source="hashtag_names", child=serializers.CharField(), read_only=True
+    )
+    media = PostMediaSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ArchivedPost
+        fields = PostDetailSerializer.Meta.fields + ("archived_at",)
+
+    @extend_schema_field(PostCommentSerializer(many=True))
+    def get_latest_comments(self, obj):
+        comments = obj.comments.select_related("user").order_by("-created_at", "-id")
+        return PostCommentSerializer(comments[:LATEST_COMMENTS_COUNT], many=True).data
+
+
+class ArchivedCommentDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    post = serializers.PrimaryKeyRelatedField(many=False, read_only=True)
+    likes = LikesSummarySerializer(source="*", read_only=True)
+
+    class Meta:
+        model = ArchivedComment
+        fields = CommentDetailSerializer.Meta.fields
+
+
+class LikeSyncSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Like
+        fields = ("id", "post", "comment", "created_at")
+
+
+class FollowSyncSerializer(serializers.Serializer):
+    profile = serializers.IntegerField()
+    user = serializers.IntegerField()
+
+
+class SyncSerializer(serializers.Serializer):
+    watermark = serializers.IntegerField()
+    has_more = serializers.BooleanField()
+    reset = serializers.BooleanField()
+    posts = PostListSerializer(many=True)
+    deleted_posts = serializers.ListField(child=serializers.IntegerField())
+    comments = CommentListSerializer(many=True)
+    deleted_comments = serializers.ListField(child=serializers.IntegerField())
+    likes = LikeSyncSerializer(many=True)
+    deleted_likes = serializers.ListField(child=serializers.IntegerField())
+    follows = FollowSyncSerializer(many=True)
+    unfollows = FollowSyncSerializer(many=True)
+    deleted_users = serializers.ListField(child=serializers.IntegerField())
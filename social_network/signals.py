@@ -0,0 +1,181 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from social_network import changelog
+from social_network.hashtags import HASHTAG_CACHE
+from social_network.models import (
+    Attachment,
+    Comment,
+    DeletionJob,
+    HashTag,
+    Like,
+    Post,
+)
+from social_network.likes import register_like, unregister_like
+from social_network.tasks import process_attachment, purge_deleted
+from social_network.trending import record_usage
+from user.models import Profile
+from user.stats import adjust_counter
+
+
+@receiver(post_save, sender=HashTag)
+@receiver(post_delete, sender=HashTag)
+def invalidate_hashtag_cache(sender, instance, **kwargs):
+    transaction.on_commit(HASHTAG_CACHE.invalidate_all)
+
+
+@receiver(m2m_changed, sender=Post.hashtag.through)
+def count_hashtag_usage(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        record_usage([instance.pk], uses=len(pk_set))
+    else:
+        record_usage(pk_set, uses=1)
+
+
+@receiver(post_save, sender=Like)
+def count_hashtag_engagement(sender, instance, created, **kwargs):
+    if not created or instance.post_id is None:
+        return
+    hashtag_ids = Post.hashtag.through.objects.filter(
+        post_id=instance.post_id
+    ).values_list("hashtag_id", flat=True)
+    record_usage(hashtag_ids, engagement=1)
+
+
+@receiver(post_save, sender=Like)
+def add_like_to_summary(sender, instance, created, **kwargs):
+    if created:
+        register_like(instance)
+
+
+@receiver(post_delete, sender=Like)
+def remove_like_from_summary(sender, instance, **kwargs):
+    unregister_like(instance)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_commented_post(sender, instance, **kwargs):
+    if instance.post_id is not None:
+        Post.objects.filter(pk=instance.post_id).touch()
+
+
+@receiver(post_save, sender=DeletionJob)
+def start_deletion_job(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: purge_deleted.delay(instance.pk))
+
+
+@receiver(post_save, sender=Attachment)
+def start_attachment_processing(sender, instance, update_fields, **kwargs):
+    if instance.status == "processing" and "status" in (update_fields or ()):
+        transaction.on_commit(lambda: process_attachment.delay(str(instance.pk)))
+
+
+@receiver(post_save, sender=Post)
+def count_created_post(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter(
+            Profile.objects.filter(user_id=instance.user_id), "posts_count", 1
+        )
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    # Soft-deleted posts were discounted when they were hidden
+    if instance.deleted_at is None:
+        adjust_counter(
+            Profile.objects.filter(user_id=instance.user_id), "posts_count", -1
+        )
+
+
+@receiver(post_save, sender=Post)
+def log_post_change(sender, instance, **kwargs):
+    changelog.record([changelog.post_change(instance)])
+
+
+@receiver(post_delete, sender=Post)
+def log_post_deletion(sender, instance, **kwargs):
+    if instance.deleted_at is None:
+        changelog.record([changelog.post_change(instance, deleted=True)])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def log_comment_change(sender, instance, **kwargs):
+    post_owner_id = (
+        Post.objects.filter(pk=instance.post_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    changelog.record(
+        [
+            changelog.comment_change(
+                instance,
+                post_owner_id or instance.user_id,
+                deleted=kwargs["signal"] is post_delete,
+            )
+        ]
+    )
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def log_like_change(sender, instance, **kwargs):
+    if kwargs["signal"] is post_save and not kwargs["created"]:
+        return
+    if instance.post_id is not None:
+        owner_id = (
+            Post.objects.filter(pk=instance.post_id)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+        post_id = instance.post_id
+    elif instance.comment_id is not None:
+        owner_id, post_id = (
+            Comment.objects.filter(pk=instance.comment_id)
+            .values_list("user_id", "post_id")
+            .first()
+        ) or (None, None)
+    else:
+        return
+    if owner_id is None:
+        return
+    changelog.record(
+        [
+            changelog.like_change(
+                instance, owner_id, post_id, deleted=kwargs["signal"] is post_delete
+            )
+        ]
+    )
+
+
+@receiver(m2m_changed, sender=Profile.followers.through)
+def log_follow_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if action == "pre_clear":
+        lookup = {"user_id": instance.pk} if reverse else {"profile_id": instance.pk}
+        pk_set = set(
+            sender.objects.filter(**lookup).values_list(
+                "profile_id" if reverse else "user_id", flat=True
+            )
+        )
+    if not pk_set:
+        return
+    deleted = action != "post_add"
+    if reverse:
+        edges = [
+            (profile_id, owner_id, instance.pk)
+            for profile_id, owner_id in Profile.objects.filter(
+                pk__in=pk_set
+            ).values_list("pk", "user_id")
+        ]
+    else:
+        edges = [(instance.pk, instance.user_id, user_id) for user_id in pk_set]
+    changelog.record(
+        [changelog.follow_change(*edge, deleted=deleted) for edge in edges]
+    )
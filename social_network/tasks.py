@@ -0,0 +1,44 @@
+from celery import shared_task
+
+from social_network import archive, changelog, deletion, media
+from social_network.trending import compact_buckets, refresh_trending
+
+
+@shared_task
+def compact_hashtag_buckets() -> int:
+    compacted = compact_buckets()
+    refresh_trending()
+    return compacted
+
+
+@shared_task
+def archive_old_posts() -> int:
+    return archive.archive_old_posts()
+
+
+@shared_task
+def purge_deleted(job_id: int) -> dict:
+    return deletion.run_deletion_job(job_id)
+
+
+@shared_task
+def resume_deletion_jobs() -> int:
+    job_ids = list(deletion.stalled_jobs().values_list("id", flat=True))
+    for job_id in job_ids:
+        purge_deleted.delay(job_id)
+    return len(job_ids)
+
+
+@shared_task
+def process_attachment(attachment_id: str) -> str:
+    return media.process_attachment(attachment_id)
+
+
+@shared_task
+def expire_stale_uploads() -> dict:
+    return media.expire_stale_uploads()
+
+
+@shared_task
+def prune_change_log() -> int:
+    return changelog.prune_change_log()
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.archive import archive_old_posts
+from social_network.models import (
+    ArchivedLike,
+    ArchivedPost,
+    Comment,
+    HashTag,
+    Like,
+    Post,
+)
+from user.models import Profile
+
+
+@override_settings(ARCHIVE_POSTS_AFTER_DAYS=30)
+class ArchiveTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@tests.com", "password")
+        self.other = get_user_model().objects.create_user("b@tests.com", "password")
+        Profile.objects.create(user=self.user, username="a", bio="bio")
+        Profile.objects.create(user=self.other, username="b", bio="bio")
+        self.client.force_authenticate(self.user)
+
+        self.old_posts = [
+            Post.objects.create(user=self.user, title=f"old{i}", text="t")
+            for i in range(3)
+        ]
+        self.new_post = Post.objects.create(user=self.user, title="new", text="t")
+        Post.objects.filter(pk__in=[post.id for post in self.old_posts]).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+        self.old_posts[0].hashtag.add(HashTag.objects.create(name="#old"))
+        self.comment = Comment.objects.create(
+            user=self.other, post=self.old_posts[0], text="c"
+        )
+        Like.objects.create(user=self.user, post=self.old_posts[0])
+        Like.objects.create(user=self.other, comment=self.comment)
+
+    def test_old_posts_moved_in_chunks(self):
+        archived = archive_old_posts(chunk_size=2)
+
+        self.assertEquals(archived, 3)
+        self.assertEquals(
+            list(Post.objects.values_list("id", flat=True)), [self.new_post.id]
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Like.objects.exists())
+        self.assertEquals(ArchivedPost.objects.count(), 3)
+        self.assertEquals(ArchivedLike.objects.count(), 2)
+
+    def test_post_detail_falls_back_to_archive(self):
+        archive_old_posts()
+        post = self.old_posts[0]
+
+        res = self.client.get(reverse("social_network:post-detail", args=[post.id]))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["title"], post.title)
+        self.assertEquals(res.data["hashtag"], ["#old"])
+        self.assertEquals(res.data["comments_count"], 1)
+        self.assertEquals(res.data["latest_comments"][0]["text"], "c")
+        self.assertEquals(
+            res.data["likes"], {"count": 1, "recent": ["a"], "liked_by_me": True}
+        )
+
+    def test_comment_detail_falls_back_to_archive(self):
+        archive_old_posts()
+
+        res = self.client.get(
+            reverse("social_network:comment-detail", args=[self.comment.id])
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.user.profile.following.add(self.other)
+        res = self.client.get(
+            reverse("social_network:comment-detail", args=[self.comment.id])
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["post"], self.old_posts[0].id)
+        self.assertEquals(res.data["likes"]["count"], 1)
@@ -0,0 +1,179 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network import media
+from social_network.models import Attachment, MediaBlob, Post
+from user.models import Profile
+
+
+def attachments_url(post_id):
+    return reverse("social_network:post-detail", args=[post_id]) + "attachments/"
+
+
+def upload_url(attachment_id):
+    return reverse("social_network:attachment-detail", args=[attachment_id]) + "upload/"
+
+
+def png_bytes(size=(3, 2)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class AttachmentUploadTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@tests.com", "password")
+        Profile.objects.create(user=self.user, username="a", bio="bio")
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(user=self.user, title="t", text="text")
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(
+            MEDIA_ROOT=directory, UPLOAD_PARTS_DIR=f"{directory}/parts"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def start_upload(self, content, post=None):
+        res = self.client.post(
+            attachments_url((post or self.post).id),
+            {"filename": "a.png", "content_type": "image/png", "size": len(content)},
+        )
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        return res.data["id"]
+
+    def send(self, attachment_id, chunk, offset):
+        return self.client.patch(
+            upload_url(attachment_id),
+            chunk,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def upload(self, content, chunk_size=50):
+        attachment_id = self.start_upload(content)
+        for offset in range(0, len(content), chunk_size):
+            self.send(attachment_id, content[offset : offset + chunk_size], offset)
+        media.process_attachment(attachment_id)
+        return attachment_id
+
+    def test_chunked_upload_processed_into_post_media(self):
+        content = png_bytes()
+        attachment_id = self.start_upload(content)
+
+        res = self.send(attachment_id, content[:40], 0)
+        self.assertEquals(res.data["status"], "uploading")
+        self.assertEquals(res["Upload-Offset"], "40")
+        res = self.send(attachment_id, content[40:], 40)
+        self.assertEquals(res.data["status"], "processing")
+
+        self.assertEquals(media.process_attachment(attachment_id), "ready")
+        res = self.client.get(
+            reverse("social_network:post-detail", args=[self.post.id])
+        )
+        [item] = res.data["media"]
+        self.assertEquals(item["id"], str(attachment_id))
+        self.assertEquals(
+            (item["width"], item["height"], item["size"]), (3, 2, len(content))
+        )
+        self.assertIn("uploads/media/", item["url"])
+
+    def test_resume_after_offset_mismatch(self):
+        content = png_bytes()
+        attachment_id = self.start_upload(content)
+        self.send(attachment_id, content[:30], 0)
+
+        res = self.send(attachment_id, content[:30], 0)
+        self.assertEquals(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEquals(res.data["offset"], 30)
+
+        res = self.client.get(
+            reverse("social_network:attachment-detail", args=[attachment_id])
+        )
+        self.assertEquals(res.data["received"], 30)
+        res = self.send(attachment_id, content[30:], 30)
+        self.assertEquals(res.data["status"], "processing")
+
+    def test_identical_files_stored_once(self):
+        content = png_bytes()
+        first = self.upload(content)
+        second = self.upload(content, chunk_size=len(content))
+
+        self.assertEquals(MediaBlob.objects.count(), 1)
+        self.assertEquals(
+            Attachment.objects.get(pk=first).blob_id,
+            Attachment.objects.get(pk=second).blob_id,
+        )
+        self.assertEquals(len(Post.objects.get(pk=self.post.id).media), 2)
+
+    def test_invalid_upload_rejected(self):
+        res = self.client.post(
+            attachments_url(self.post.id),
+            {
+                "filename": "a.exe",
+                "content_type": "application/x-msdownload",
+                "size": 1,
+            },
+        )
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        attachment_id = self.upload(b"not an image at all")
+        self.assertEquals(Attachment.objects.get(pk=attachment_id).status, "failed")
+        self.assertEquals(Post.objects.get(pk=self.post.id).media, [])
+
+    def test_other_users_cannot_upload_to_post(self):
+        other = get_user_model().objects.create_user("b@tests.com", "password")
+        Profile.objects.create(user=other, username="b", bio="bio").following.add(
+            self.user
+        )
+        attachment_id = self.start_upload(png_bytes())
+        self.client.force_authenticate(other)
+
+        res = self.client.post(
+            attachments_url(self.post.id),
+            {"filename": "a.png", "content_type": "image/png", "size": 1},
+        )
+        self.assertEquals(res.status_code, status.HTTP_403_FORBIDDEN)
+        res = self.send(attachment_id, b"x", 0)
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_expiry_drops_stale_uploads_and_unused_blobs(self):
+        stale = self.start_upload(png_bytes())
+        self.send(stale, b"\x89PNG", 0)
+        removed = self.upload(png_bytes(size=(5, 5)))
+        self.client.delete(reverse("social_network:attachment-detail", args=[removed]))
+        kept = self.upload(png_bytes())
+
+        later = timezone.now() + media.STALE_UPLOAD_AFTER + timedelta(minutes=1)
+        self.assertEquals(
+            media.expire_stale_uploads(now=later),
+            {"uploads": 1, "parts": 1, "blobs": 1},
+        )
+        self.assertEquals(
+            [str(pk) for pk in Attachment.objects.values_list("pk", flat=True)], [kept]
+        )
+        self.assertEquals(MediaBlob.objects.count(), 1)
+
+    def test_expiry_keeps_an_old_blob_reused_by_a_new_upload(self):
+        removed = self.upload(png_bytes())
+        self.client.delete(reverse("social_network:attachment-detail", args=[removed]))
+        MediaBlob.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        reused = self.upload(png_bytes())
+
+        self.assertEquals(media.expire_stale_uploads()["blobs"], 0)
+        attachment = Attachment.objects.select_related("blob").get(pk=reused)
+        self.assertEquals(attachment.status, "ready")
+        self.assertTrue(attachment.blob.file.storage.exists(attachment.blob.file.name))
@@ -0,0 +1,33 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from social_network.management.commands.audit_indexes import plan_issues
+
+
+class AuditIndexesTests(TestCase):
+    def test_sqlite_plan_issues(self):
+        plan = "\n".join(
+            [
+                "3 0 0 SCAN social_network_post",
+                "4 0 0 SCAN user_user USING INDEX sqlite_autoindex_user_user_1",
+                "5 0 0 SCAN CONSTANT ROW",
+                "6 0 0 SEARCH social_network_like USING INDEX idx (user_id=?)",
+                "7 0 0 USE TEMP B-TREE FOR ORDER BY",
+            ]
+        )
+
+        self.assertEquals(
+            plan_issues(plan, "sqlite"),
+            ["full scan of social_network_post", "temp b-tree for order by"],
+        )
+
+    def test_likes_lists_use_indexes(self):
+        out = StringIO()
+
+        call_command("audit_indexes", users=5, posts=2, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("social_network/likes-list-post list: OK", output)
+        self.assertIn("social_network/likes-list-comment list: OK", output)
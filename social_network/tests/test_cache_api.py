@@ -0,0 +1,165 @@
+import json
+import time
+from io import StringIO
+from unittest import mock
+
+import fakeredis
+import redis
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media_api import cache
+from social_media_api.cache import TwoTierCache
+from social_network.hashtags import HASHTAG_CACHE
+from social_network.models import HashTag, Post
+from user.models import Profile
+from user.views import PROFILE_CACHE
+
+HASHTAGS_URL = reverse("social_network:hashtag-list")
+POSTS_URL = reverse("social_network:post-list")
+
+
+def profile_url(profile_id):
+    return reverse("user:profile-detail", args=[profile_id])
+
+
+class TwoTierCacheTests(TestCase):
+    def setUp(self) -> None:
+        self.redis = fakeredis.FakeRedis()
+        self.redis.flushall()
+        patch = mock.patch.object(TwoTierCache, "redis_client", self.redis)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.cache = TwoTierCache("tests", ttl=60)
+        self.compute = mock.Mock(return_value={"value": 1})
+
+    def test_local_tier_answers_before_redis(self):
+        other_process = TwoTierCache("tests", ttl=60)
+
+        self.cache.get_or_set("key", self.compute)
+        self.cache.get_or_set("key", self.compute)
+        other_process.get_or_set("key", self.compute)
+
+        self.assertEquals(self.compute.call_count, 1)
+        self.assertEquals(self.cache.stats["misses"], 1)
+        self.assertEquals(self.cache.stats["local_hits"], 1)
+        self.assertEquals(other_process.stats["redis_hits"], 1)
+
+    def test_invalidate_all_drops_every_key(self):
+        self.cache.get_or_set("a", self.compute)
+        self.cache.get_or_set("b", self.compute)
+
+        self.cache.invalidate_all()
+        self.cache.get_or_set("a", self.compute)
+        self.cache.get_or_set("b", self.compute)
+
+        self.assertEquals(self.compute.call_count, 4)
+
+    def test_entry_near_expiry_is_refreshed_early(self):
+        self.cache.get_or_set("key", self.compute)
+        self.cache._local.clear()
+        (full_key,) = [key for key in self.redis.keys() if b"version" not in key]
+        entry = json.loads(self.redis.get(full_key))
+        entry["delta"], entry["expires"] = 10, time.time() + 1
+        self.redis.set(full_key, json.dumps(entry))
+
+        self.cache.get_or_set("key", self.compute)
+
+        self.assertEquals(self.compute.call_count, 2)
+        self.assertEquals(self.cache.stats["early_refreshes"], 1)
+
+    def test_concurrent_miss_waits_for_the_lock_holder(self):
+        full_key = "cache:tests:v0:key"
+        self.redis.set(f"{full_key}:lock", 1)
+
+        def holder_finishes(seconds):
+            entry = {"value": "computed", "delta": 0, "expires": time.time() + 60}
+            self.redis.set(full_key, json.dumps(entry))
+
+        with mock.patch.object(cache.time, "sleep", side_effect=holder_finishes):
+            value = self.cache.get_or_set("key", self.compute)
+
+        self.assertEquals(value, "computed")
+        self.compute.assert_not_called()
+
+    def test_redis_errors_fall_back_to_computing(self):
+        broken = mock.Mock()
+        broken.get.side_effect = redis.exceptions.ConnectionError
+        with mock.patch.object(TwoTierCache, "redis_client", broken):
+            value = self.cache.get_or_set("key", self.compute)
+
+        self.assertEquals(value, {"value": 1})
+        self.assertEquals(self.cache.stats["errors"], 1)
+
+    def test_metrics_report_hit_ratio_across_processes(self):
+        self.redis.hset(self.cache.stats_key, mapping={"redis_hits": 2, "misses": 1})
+        self.cache.get_or_set("key", self.compute)
+
+        metrics = self.cache.metrics()
+
+        self.assertEquals(metrics["misses"], 2)
+        self.assertEquals(metrics["hit_ratio"], 0.5)
+
+
+class CachedReadsTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("user@tests.com", "password")
+        self.profile = Profile.objects.create(user=self.user, username="user")
+        self.client.force_authenticate(self.user)
+
+        patch = mock.patch.object(TwoTierCache, "redis_client", fakeredis.FakeRedis())
+        patch.start()
+        self.addCleanup(patch.stop)
+        TwoTierCache.redis_client.flushall()
+        for two_tier in (PROFILE_CACHE, HASHTAG_CACHE):
+            two_tier.clear_local()
+            self.addCleanup(two_tier.clear_local)
+
+    def test_profile_detail_is_cached_until_it_changes(self):
+        self.client.get(profile_url(self.profile.id))
+        # Only the ETag lookup, which also keys the cache
+        with self.assertNumQueries(1):
+            res = self.client.get(profile_url(self.profile.id))
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+        self.profile.bio = "new bio"
+        self.profile.save()
+        res = self.client.get(profile_url(self.profile.id))
+
+        self.assertEquals(res.data["bio"], "new bio")
+
+    def test_deleted_profile_is_not_served_from_cache(self):
+        self.client.get(profile_url(self.profile.id))
+        self.client.delete(profile_url(self.profile.id))
+
+        res = self.client.get(profile_url(self.profile.id))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_new_hashtag_invalidates_hashtag_reads(self):
+        HashTag.objects.create(name="first")
+        with self.captureOnCommitCallbacks(execute=True):
+            pass
+        self.client.get(HASHTAGS_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(POSTS_URL, {"title": "title", "text": "#second tag"})
+        res = self.client.get(HASHTAGS_URL)
+
+        names = [row["name"] for row in res.data["results"]]
+        self.assertEquals(sorted(names), ["first", "second"])
+        self.assertEquals(Post.objects.count(), 1)
+
+    def test_cache_stats_command_prints_hit_ratio(self):
+        self.client.get(profile_url(self.profile.id))
+        self.client.get(profile_url(self.profile.id))
+        out = StringIO()
+
+        call_command("cache_stats", stdout=out)
+
+        self.assertIn("profiles: hit ratio 50.0%", out.getvalue())
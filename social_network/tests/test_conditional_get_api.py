@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.models import Comment, Like, Post
+from user.models import Profile
+
+POST_URL = reverse("social_network:post-list")
+
+
+def detail_url(post_id):
+    return reverse("social_network:post-detail", args=[post_id])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "testunique@tests.com", "unique_password"
+        )
+        self.profile = Profile.objects.create(
+            user=self.user, username="test1", bio="testbio1"
+        )
+        self.post = Post.objects.create(user=self.user, title="t1", text="text")
+        self.client.force_authenticate(self.user)
+
+    def test_detail_not_modified(self):
+        res = self.client.get(detail_url(self.post.id))
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", res)
+
+        res = self.client.get(detail_url(self.post.id), HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_differs_per_reader_and_fields(self):
+        res = self.client.get(detail_url(self.post.id))
+        etag = res["ETag"]
+
+        res = self.client.get(
+            detail_url(self.post.id), {"fields": "id"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+        other = get_user_model().objects.create_user("other@tests.com", "password")
+        Profile.objects.create(user=other, username="other", bio="bio")
+        other.profile.following.add(self.user)
+        self.client.force_authenticate(other)
+        res = self.client.get(detail_url(self.post.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+    def test_like_and_comment_change_etag(self):
+        etag = self.client.get(detail_url(self.post.id))["ETag"]
+
+        Like.objects.create(user=self.user, post=self.post)
+        res = self.client.get(detail_url(self.post.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+        Comment.objects.create(user=self.user, post=self.post, text="comment")
+        res2 = self.client.get(detail_url(self.post.id), HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEquals(res2.status_code, status.HTTP_200_OK)
+        self.assertEquals(Post.objects.get(pk=self.post.pk).version, 3)
+
+    def test_list_not_modified_until_new_post(self):
+        etag = self.client.get(POST_URL)["ETag"]
+        res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Post.objects.create(user=self.user, title="t2", text="text")
+        res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+    def test_list_removal_not_hidden_by_if_modified_since(self):
+        res = self.client.get(POST_URL)
+        self.assertNotIn("Last-Modified", res)
+        other = Post.objects.create(user=self.user, title="t2", text="text")
+        detail = self.client.get(detail_url(other.id))
+
+        other.delete()
+        res = self.client.get(POST_URL, HTTP_IF_MODIFIED_SINCE=detail["Last-Modified"])
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals([row["id"] for row in res.data["results"]], [self.post.id])
+
+    def test_follow_changes_profile_etag(self):
+        user2 = get_user_model().objects.create_user("test2@tests.com", "password2")
+        profile2 = Profile.objects.create(user=user2, username="test2", bio="bio")
+        url = reverse("user:profile-detail", args=[profile2.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.client.post(url + "follow_unfollow/")
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from social_media_api import db_router
+
+from social_network.models import HashTag
+
+HASHTAG_URL = reverse("social_network:hashtag-list")
+REPLICA = "replica_routing_test"
+
+
+@override_settings(DATABASE_REPLICA_ALIASES=[REPLICA], READ_YOUR_WRITES_SECONDS=60)
+class ReplicaRoutingTests(TestCase):
+    """The primary is the test database, the replica a separate SQLite file"""
+
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        configured = connections.configure_settings(
+            {
+                "default": connections.settings["default"],
+                REPLICA: {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": os.path.join(cls.tmp_dir, "replica.sqlite3"),
+                },
+            }
+        )
+        connections.settings[REPLICA] = configured[REPLICA]
+        call_command("migrate", database=REPLICA, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections.settings[REPLICA]
+        shutil.rmtree(cls.tmp_dir)
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "testunique@tests.com", "unique_password"
+        )
+        self.client.force_authenticate(self.user)
+        HashTag.objects.using("default").create(name="primary")
+        HashTag.objects.using(REPLICA).create(name="replica")
+
+    def names(self, res):
+        return [hashtag["name"] for hashtag in res.data["results"]]
+
+    def test_reads_go_to_replica(self):
+        res = self.client.get(HASHTAG_URL)
+
+        self.assertEquals(self.names(res), ["replica"])
+
+    def test_writes_go_to_primary_and_pin_reads(self):
+        other = APIClient()
+        other.force_authenticate(self.user)
+
+        res = self.client.post(HASHTAG_URL, {"name": "new"})
+
+        self.assertEquals(res.status_code, 201)
+        self.assertTrue(HashTag.objects.using("default").filter(name="new").exists())
+        self.assertEquals(self.names(self.client.get(HASHTAG_URL)), ["primary", "new"])
+        # Pinned by user as well, not only by the cookie
+        self.assertEquals(self.names(other.get(HASHTAG_URL)), ["primary", "new"])
+
+    def test_cache_outage_falls_back_to_the_cookie_pin(self):
+        broken = mock.Mock()
+        broken.get.side_effect = ConnectionError
+        broken.set.side_effect = ConnectionError
+
+        with mock.patch.object(db_router, "cache", broken):
+            read = self.client.get(HASHTAG_URL)
+            write = self.client.post(HASHTAG_URL, {"name": "new"})
+            pinned = self.client.get(HASHTAG_URL)
+
+        self.assertEquals(self.names(read), ["replica"])
+        self.assertEquals(write.status_code, 201)
+        self.assertEquals(self.names(pinned), ["primary", "new"])
+        broken.get.assert_called()
+        broken.set.assert_called()
@@ -0,0 +1,162 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network import deletion
+from social_network.archive import archive_posts
+from social_network.models import (
+    ArchivedComment,
+    ArchivedLike,
+    ArchivedPost,
+    Comment,
+    DeletionJob,
+    HashTag,
+    Like,
+    Post,
+)
+from user.models import Profile
+
+
+def detail_url(post_id):
+    return reverse("social_network:post-detail", args=[post_id])
+
+
+class DeletionTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@tests.com", "password")
+        self.other = get_user_model().objects.create_user("b@tests.com", "password")
+        self.profile = Profile.objects.create(user=self.user, username="a", bio="b")
+        self.other_profile = Profile.objects.create(
+            user=self.other, username="b", bio="b"
+        )
+        self.profile.following.add(self.other)
+        self.other_profile.followers.add(self.user)
+        self.client.force_authenticate(self.user)
+
+        self.post = Post.objects.create(user=self.user, title="mine", text="t")
+        self.post.hashtag.add(HashTag.objects.create(name="#tag"))
+        self.other_post = Post.objects.create(user=self.other, title="theirs", text="t")
+        for post in (self.post, self.other_post):
+            comment = Comment.objects.create(user=self.user, post=post, text="c")
+            Like.objects.create(user=self.user, post=post)
+            Like.objects.create(user=self.other, comment=comment)
+
+    def test_deleted_post_hidden_then_purged_in_chunks(self):
+        res = self.client.delete(detail_url(self.post.id))
+
+        self.assertEquals(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEquals(
+            self.client.get(detail_url(self.post.id)).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        job = DeletionJob.objects.get(target="post", object_id=self.post.id)
+
+        with mock.patch.object(deletion, "CHUNK_SIZE", 1):
+            progress = deletion.run_deletion_job(job.id)
+
+        self.assertEquals(
+            progress, {"comment_likes": 1, "likes": 1, "comments": 1, "hashtags": 1}
+        )
+        self.assertFalse(Post.objects.filter(pk=self.post.id).exists())
+        self.assertEquals(Comment.objects.count(), 1)
+        self.assertEquals(Like.objects.count(), 2)
+
+    def test_interrupted_job_resumes(self):
+        self.client.delete(detail_url(self.post.id))
+        job = DeletionJob.objects.get(target="post", object_id=self.post.id)
+        delete_chunk = deletion.delete_chunk
+        calls = []
+
+        def failing_delete_chunk(job, step):
+            calls.append(step.label)
+            if len(calls) == 3:
+                raise RuntimeError("worker lost")
+            return delete_chunk(job, step)
+
+        with mock.patch.object(deletion, "delete_chunk", failing_delete_chunk):
+            with self.assertRaises(RuntimeError):
+                deletion.run_deletion_job(job.id)
+        job.refresh_from_db()
+        self.assertEquals(job.status, "running")
+        self.assertEquals(job.step, 1)
+
+        progress = deletion.run_deletion_job(job.id)
+
+        self.assertEquals(progress["likes"], 1)
+        self.assertEquals(progress["comments"], 1)
+        self.assertFalse(Post.objects.filter(pk=self.post.id).exists())
+
+    def test_deleted_user_content_purged(self):
+        res = self.client.delete(reverse("user:manage"))
+
+        self.assertEquals(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Post.objects.get(pk=self.post.id).deleted_at is None)
+
+        job = DeletionJob.objects.get(target="user", object_id=self.user.id)
+        progress = deletion.run_deletion_job(job.id)
+
+        self.assertEquals(progress["posts"], 1)
+        self.assertEquals(progress["followed_by"], 1)
+        self.assertFalse(get_user_model().objects.filter(pk=self.user.id).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.other_post.refresh_from_db()
+        self.assertEquals(self.other_post.likes_count, 1)
+        self.assertEquals(
+            list(Like.objects.values_list("post_id", "user_id")),
+            [(self.other_post.id, None)],
+        )
+
+    def test_deleted_user_archive_purged_in_chunks(self):
+        archive_posts([self.post.id, self.other_post.id])
+        self.client.delete(reverse("user:manage"))
+        job = DeletionJob.objects.get(target="user", object_id=self.user.id)
+
+        with mock.patch.object(deletion, "CHUNK_SIZE", 1):
+            progress = deletion.run_deletion_job(job.id)
+
+        archived = {
+            label: count
+            for label, count in progress.items()
+            if label.startswith("archived")
+        }
+        self.assertEquals(
+            archived,
+            {
+                "archived_post_comment_likes": 1,
+                "archived_post_likes": 1,
+                "archived_comment_likes": 1,
+                "archived_likes": 1,
+                "archived_post_comments": 1,
+                "archived_comments": 1,
+                "archived_posts": 1,
+            },
+        )
+        self.assertEquals(
+            list(ArchivedPost.objects.values_list("id", "comments_count")),
+            [(self.other_post.id, 0)],
+        )
+        self.assertFalse(ArchivedComment.objects.exists())
+        self.assertEquals(
+            list(ArchivedLike.objects.values_list("post_id", "user_id")),
+            [(self.other_post.id, None)],
+        )
+
+    def test_liked_lists_leave_out_deleted_content(self):
+        Post.objects.filter(pk=self.other_post.id).update(deleted_at=timezone.now())
+
+        res = self.client.get(reverse("social_network:likes-list-post-list"))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(res.data["results"]), 1)
+
+        self.client.force_authenticate(self.other)
+        res = self.client.get(reverse("social_network:likes-list-comment-list"))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(res.data["results"]), 1)
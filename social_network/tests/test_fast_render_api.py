@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from social_network.models import Comment, HashTag, Like, Post
+from user.models import Profile
+
+POST_URL = reverse("social_network:post-list")
+PROFILE_URL = reverse("user:profile-list")
+
+
+class FastListRenderingTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "testunique@tests.com", "unique_password"
+        )
+        self.user2 = get_user_model().objects.create_user(
+            "test2unique@tests.com", "unique_password2"
+        )
+        profile1 = Profile.objects.create(user=self.user, username="test1", bio="b1")
+        profile2 = Profile.objects.create(
+            user=self.user2, username="тест2", bio="bio line"
+        )
+        profile1.following.add(self.user2)
+        profile2.followers.add(self.user)
+        post = Post.objects.create(user=self.user2, title="post", text="ünïcode")
+        post.hashtag.add(
+            HashTag.objects.create(name="b"), HashTag.objects.create(name="a")
+        )
+        Post.objects.create(user=self.user, title="own post", text="text")
+        Comment.objects.create(user=self.user, post=post, text="comment")
+        Like.objects.create(user=self.user, post=post)
+        self.client.force_authenticate(self.user)
+
+    def assert_identical(self, url):
+        res = self.client.get(url)
+        fast = self.client.get(url, HTTP_X_FAST_RENDER="1")
+        self.assertEquals(fast.status_code, res.status_code)
+        self.assertEquals(fast.content, res.content)
+
+    def test_post_list_identical(self):
+        self.assert_identical(POST_URL)
+        self.assert_identical(POST_URL + "?hashtag=a&limit=1")
+
+    def test_profile_list_identical(self):
+        self.assert_identical(PROFILE_URL)
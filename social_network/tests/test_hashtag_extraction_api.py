@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.hashtags import extract_hashtags, resolve_hashtags
+from social_network.models import HashTag, HashTagUsageBucket, Post
+from user.models import Profile
+
+POSTS_URL = reverse("social_network:post-list")
+
+
+class HashTagExtractionTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@tests.com", "password")
+        Profile.objects.create(user=self.user, username="a", bio="bio")
+        self.client.force_authenticate(self.user)
+        self.python = HashTag.objects.create(name="Python")
+
+    def test_extract_hashtags(self):
+        self.assertEquals(
+            extract_hashtags("#Django tips", "a#b #1 ##x #django, #Python_3!"),
+            ["django", "python_3"],
+        )
+
+    def test_missing_tags_created_in_one_insert(self):
+        with self.assertNumQueries(3):
+            ids = resolve_hashtags(["django", "python"])
+
+        self.assertEquals(ids[1], self.python.id)
+        self.assertEquals(HashTag.objects.get(pk=ids[0]).name, "django")
+
+    def test_post_create_tags_from_text(self):
+        payload = {"title": "Week #1 of #Django", "text": "More #python and #django"}
+
+        res = self.client.post(POSTS_URL, payload)
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        post = Post.objects.get(pk=res.data["id"])
+        self.assertEquals(
+            sorted(post.hashtag.values_list("name", flat=True)), ["Python", "django"]
+        )
+        self.assertEquals(
+            sorted(res.data["hashtag"]),
+            sorted(post.hashtag.values_list("id", flat=True)),
+        )
+        self.assertEquals(HashTagUsageBucket.objects.get(hashtag=self.python).uses, 1)
+
+    def test_post_update_adds_new_tags(self):
+        post = Post.objects.create(user=self.user, title="t", text="#python")
+        url = reverse("social_network:post-detail", args=[post.id])
+
+        res = self.client.patch(url, {"text": "#python #rust"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            sorted(post.hashtag.values_list("name", flat=True)), ["Python", "rust"]
+        )
+
+    def test_hashtag_names_unique_ignoring_case(self):
+        res = self.client.post(
+            reverse("social_network:hashtag-list"), {"name": "PYTHON"}
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_ascii_names_unique_ignoring_case(self):
+        elise = HashTag.objects.create(name="Élise")
+
+        res = self.client.post(POSTS_URL, {"title": "t", "text": "Hi #élise"})
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(res.data["hashtag"], [elise.id])
+        self.assertEquals(HashTag.objects.filter(name_lower="élise").count(), 1)
+
+        res = self.client.post(
+            reverse("social_network:hashtag-list"), {"name": "éLISE"}
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,83 @@
+from unittest import mock
+
+import fakeredis
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media_api import idempotency
+from social_media_api.idempotency import IdempotencyMixin
+from social_network.models import HashTag, Like, Post
+from user.models import Profile
+
+POSTS_URL = reverse("social_network:post-list")
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@tests.com", "password")
+        Profile.objects.create(user=self.user, username="a", bio="bio")
+        self.client.force_authenticate(self.user)
+        self.redis = fakeredis.FakeRedis()
+        self.hashtag = HashTag.objects.create(name="#tag")
+
+        patch = mock.patch.object(IdempotencyMixin, "redis_client", self.redis)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_retried_create_replays_first_response(self):
+        payload = {"title": "t1", "text": "text", "hashtag": [self.hashtag.id]}
+
+        first = self.client.post(POSTS_URL, payload, HTTP_IDEMPOTENCY_KEY="k1")
+        second = self.client.post(POSTS_URL, payload, HTTP_IDEMPOTENCY_KEY="k1")
+
+        self.assertEquals(first.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(second.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(second.data, first.data)
+        self.assertEquals(second["Idempotent-Replayed"], "true")
+        self.assertEquals(Post.objects.count(), 1)
+
+    def test_retried_toggle_does_not_flip_back(self):
+        post = Post.objects.create(user=self.user, title="t1", text="text")
+        url = reverse("social_network:post-detail", args=[post.id])
+        url += "post_like_unlike/"
+
+        self.client.post(url, HTTP_IDEMPOTENCY_KEY="like")
+        self.client.post(url, HTTP_IDEMPOTENCY_KEY="like")
+        self.assertEquals(Like.objects.filter(post=post).count(), 1)
+
+        res = self.client.post(url, HTTP_IDEMPOTENCY_KEY="unlike")
+        self.assertEquals(res.data, {"status": "unliked"})
+
+    def test_key_reused_with_other_payload_rejected(self):
+        self.client.post(
+            POSTS_URL,
+            {"title": "t1", "text": "a", "hashtag": [self.hashtag.id]},
+            HTTP_IDEMPOTENCY_KEY="k",
+        )
+
+        res = self.client.post(
+            POSTS_URL,
+            {"title": "t2", "text": "b", "hashtag": [self.hashtag.id]},
+            HTTP_IDEMPOTENCY_KEY="k",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(Post.objects.count(), 1)
+
+    def test_duplicate_in_flight_gets_conflict(self):
+        lock_key = f"idempotency:{self.user.pk}:POST:{POSTS_URL}:k:lock"
+        self.redis.set(lock_key, "other-request")
+
+        with mock.patch.object(idempotency, "WAIT_FOR_DUPLICATE", 0):
+            res = self.client.post(
+                POSTS_URL,
+                {"title": "t1", "text": "a", "hashtag": [self.hashtag.id]},
+                HTTP_IDEMPOTENCY_KEY="k",
+            )
+
+        self.assertEquals(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Post.objects.exists())
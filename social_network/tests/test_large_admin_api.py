@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from social_media_api import large_tables
+from social_media_api.large_tables import (
+    EstimatedCountPaginator,
+    estimated_row_count,
+)
+from social_network.models import HashTag, Like, Post
+from user.models import Profile
+
+
+class LargeTableAdminTests(TestCase):
+    def setUp(self) -> None:
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@tests.com", "password"
+        )
+        self.client.force_login(self.admin)
+        self.users = [
+            get_user_model().objects.create_user(f"user{index}@tests.com", "password")
+            for index in range(3)
+        ]
+        for user in self.users:
+            Profile.objects.create(user=user, username=user.email[:5], bio="bio")
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_unfiltered_count_uses_the_planner_estimate(self):
+        self.analyze()
+        queryset = Profile.objects.order_by("id")
+
+        self.assertEquals(estimated_row_count(Profile), 3)
+        with mock.patch.object(large_tables, "EXACT_COUNT_LIMIT", 2):
+            with self.assertNumQueries(1):
+                self.assertEquals(EstimatedCountPaginator(queryset, 2).count, 3)
+            paginator = EstimatedCountPaginator(queryset.filter(username="user0"), 2)
+            with self.assertNumQueries(1):
+                self.assertEquals(paginator.count, 1)
+
+    def test_small_tables_are_counted_exactly(self):
+        self.analyze()
+        Profile.objects.filter(username="user0").delete()
+
+        paginator = EstimatedCountPaginator(Profile.objects.order_by("id"), 2)
+
+        self.assertEquals(paginator.count, 2)
+
+    def test_changelists_query_related_rows_once(self):
+        post = Post.objects.create(user=self.users[0], title="title", text="text")
+        for user in self.users:
+            Like.objects.create(user=user, post=post)
+        url = reverse("admin:social_network_like_changelist")
+        self.client.get(url)
+
+        # Session, user, row estimate, count and one joined page of rows
+        with self.assertNumQueries(5):
+            res = self.client.get(url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertContains(res, "user2@tests.com")
+
+    def test_prefix_search_matches_case_insensitively(self):
+        for name in ("Django", "djangocon", "Éclair", "python"):
+            HashTag.objects.create(name=name)
+
+        res = self.client.get(
+            reverse("admin:social_network_hashtag_changelist"), {"q": "DJANGO"}
+        )
+
+        names = sorted(tag.name for tag in res.context["cl"].result_list)
+        self.assertEquals(names, ["Django", "djangocon"])
+
+        res = self.client.get(
+            reverse("admin:social_network_hashtag_changelist"), {"q": "é"}
+        )
+
+        names = [tag.name for tag in res.context["cl"].result_list]
+        self.assertEquals(names, ["Éclair"])
+
+    def test_profile_form_does_not_list_every_user(self):
+        res = self.client.get(
+            reverse("admin:user_profile_change", args=[self.users[0].profile.id])
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertNotContains(res, "user2@tests.com")
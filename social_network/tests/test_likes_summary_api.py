@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.likes import RECENT_LIKERS_COUNT
+from social_network.models import Comment, Like, Post
+from user.models import Profile
+
+
+def detail_url(post_id):
+    return reverse("social_network:post-detail", args=[post_id])
+
+
+class LikesSummaryTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(f"user{i}@tests.com", "password")
+            for i in range(RECENT_LIKERS_COUNT + 2)
+        ]
+        for i, user in enumerate(self.users):
+            Profile.objects.create(user=user, username=f"user{i}", bio="bio")
+        self.post = Post.objects.create(user=self.users[0], title="t1", text="t")
+        self.client.force_authenticate(self.users[0])
+
+    def test_summary_maintained_incrementally(self):
+        for user in self.users[1:]:
+            Like.objects.create(user=user, post=self.post)
+
+        self.post.refresh_from_db()
+        self.assertEquals(self.post.likes_count, len(self.users) - 1)
+        self.assertEquals(
+            self.post.recent_likers,
+            [f"user{i}" for i in range(1, RECENT_LIKERS_COUNT + 1)],
+        )
+
+        Like.objects.filter(user=self.users[1]).delete()
+
+        self.post.refresh_from_db()
+        self.assertEquals(self.post.likes_count, len(self.users) - 2)
+        self.assertEquals(
+            self.post.recent_likers,
+            [f"user{i}" for i in range(2, RECENT_LIKERS_COUNT + 2)],
+        )
+
+    def test_detail_returns_summary(self):
+        Like.objects.create(user=self.users[0], post=self.post)
+        Like.objects.create(user=self.users[1], post=self.post)
+
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            res.data["likes"],
+            {"count": 2, "recent": ["user0", "user1"], "liked_by_me": True},
+        )
+
+    def test_like_toggle_returns_summary(self):
+        res = self.client.post(detail_url(self.post.id) + "post_like_unlike/")
+
+        self.assertEquals(
+            res.data["likes"],
+            {"count": 1, "recent": ["user0"], "liked_by_me": True},
+        )
+
+    def test_comment_like_toggle_returns_summary(self):
+        comment = Comment.objects.create(user=self.users[0], post=self.post, text="c")
+        Like.objects.create(user=self.users[1], comment=comment)
+        url = reverse("social_network:comment-detail", args=[comment.id])
+
+        res = self.client.post(url + "comment_like_unlike/")
+
+        self.assertEquals(
+            res.data["likes"],
+            {"count": 2, "recent": ["user1", "user0"], "liked_by_me": True},
+        )
+
+    def test_comment_likers_paginated(self):
+        comment = Comment.objects.create(user=self.users[0], post=self.post, text="c")
+        for user in self.users:
+            Like.objects.create(user=user, comment=comment)
+        url = reverse("social_network:comment-likers", args=[comment.id])
+
+        res = self.client.get(url, {"limit": 2})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [liker["username"] for liker in res.data["results"]],
+            [f"user{len(self.users) - 1}", f"user{len(self.users) - 2}"],
+        )
+        self.assertIsNotNone(res.data["next"])
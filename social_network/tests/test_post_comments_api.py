@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.models import Comment, Post
+from social_network.serializers import LATEST_COMMENTS_COUNT
+from user.models import Profile
+
+
+def detail_url(post_id):
+    return reverse("social_network:post-detail", args=[post_id])
+
+
+def comments_url(post_id):
+    return reverse("social_network:post-comments", args=[post_id])
+
+
+class PostCommentsApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "testunique@tests.com", "unique_password"
+        )
+        Profile.objects.create(user=self.user, username="test1", bio="testbio1")
+        self.post = Post.objects.create(user=self.user, title="t1", text="text")
+        self.comments = [
+            Comment.objects.create(user=self.user, post=self.post, text=f"c{i}")
+            for i in range(5)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def test_detail_has_count_and_latest_comments(self):
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["comments_count"], 5)
+        self.assertEquals(
+            [comment["text"] for comment in res.data["latest_comments"]],
+            ["c4", "c3", "c2"][:LATEST_COMMENTS_COUNT],
+        )
+
+    def test_comments_keyset_paginated(self):
+        res = self.client.get(comments_url(self.post.id), {"limit": 2})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals([c["text"] for c in res.data["results"]], ["c4", "c3"])
+
+        texts = [c["text"] for c in res.data["results"]]
+        next_url = res.data["next"]
+        while next_url:
+            res = self.client.get(next_url)
+            texts += [c["text"] for c in res.data["results"]]
+            next_url = res.data["next"]
+        self.assertEquals(texts, ["c4", "c3", "c2", "c1", "c0"])
+
+    def test_other_posts_comments_excluded(self):
+        other = Post.objects.create(user=self.user, title="t2", text="text")
+        Comment.objects.create(user=self.user, post=other, text="other")
+
+        res = self.client.get(comments_url(other.id))
+
+        self.assertEquals([c["text"] for c in res.data["results"]], ["other"])
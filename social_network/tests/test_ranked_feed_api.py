@@ -0,0 +1,85 @@
+from datetime import timedelta
+from unittest import mock
+
+import fakeredis
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.models import Like, Post
+from social_network.ranking import RankedFeed
+from user.models import Profile
+
+POSTS_URL = reverse("social_network:post-list")
+
+
+class RankedFeedTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(f"{name}@tests.com", "password")
+            for name in ("viewer", "friend", "other")
+        ]
+        for user in self.users:
+            Profile.objects.create(user=user, username=user.email[:5], bio="bio")
+        self.viewer = self.users[0]
+        for user in self.users[1:]:
+            self.viewer.profile.following.add(user)
+        self.client.force_authenticate(self.viewer)
+
+        patch = mock.patch.object(RankedFeed, "redis_client", fakeredis.FakeRedis())
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def create_post(self, user, title, hours_ago=0, likes=0):
+        post = Post.objects.create(user=user, title=title, text="text")
+        Post.objects.filter(pk=post.pk).update(
+            created_at=timezone.now() - timedelta(hours=hours_ago)
+        )
+        for liker in self.users[:likes]:
+            Like.objects.create(user=liker, post=post)
+        return post
+
+    def titles(self, res):
+        return [row["title"] for row in res.data["results"]]
+
+    def test_engagement_outweighs_small_age_difference(self):
+        self.create_post(self.users[2], "fresh", hours_ago=1)
+        self.create_post(self.users[2], "liked", hours_ago=3, likes=3)
+        self.create_post(self.users[2], "stale", hours_ago=96, likes=3)
+
+        res = self.client.get(POSTS_URL, {"mode": "top"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(self.titles(res), ["liked", "fresh", "stale"])
+
+    def test_author_affinity_boosts_posts(self):
+        liked_before = self.create_post(self.users[1], "old friend post", 200)
+        Like.objects.create(user=self.viewer, post=liked_before)
+        self.create_post(self.users[2], "other", hours_ago=2)
+        self.create_post(self.users[1], "friend", hours_ago=2)
+
+        res = self.client.get(POSTS_URL, {"mode": "top"})
+
+        self.assertEquals(self.titles(res)[:2], ["friend", "other"])
+
+    def test_ranking_is_cached_across_pages(self):
+        for i in range(4):
+            self.create_post(self.users[1], f"t{i}", hours_ago=i)
+
+        first = self.client.get(POSTS_URL, {"mode": "top", "limit": 2})
+        self.create_post(self.users[1], "new", likes=3)
+        second = self.client.get(POSTS_URL, {"mode": "top", "limit": 2, "offset": 2})
+
+        self.assertEquals(first.data["count"], 4)
+        self.assertEquals(
+            self.titles(first) + self.titles(second), ["t0", "t1", "t2", "t3"]
+        )
+
+    def test_unknown_mode_rejected(self):
+        res = self.client.get(POSTS_URL, {"mode": "random"})
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,56 @@
+import json
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media_api import schema
+
+SCHEMA_URL = reverse("schema")
+
+
+class CachedSchemaTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("a@tests.com", "password")
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(SCHEMA_CACHE_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        patches = [
+            mock.patch.dict(schema._schemas, clear=True),
+            mock.patch.dict(schema._rendered, clear=True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_prebuilt_schema_served_without_generating(self):
+        call_command("build_schema", stdout=mock.MagicMock())
+        schema._schemas.clear()
+
+        with mock.patch.object(schema, "SchemaGenerator") as generator:
+            res = self.client.get(SCHEMA_URL, {"format": "json"})
+            self.client.get(SCHEMA_URL)
+
+        generator.assert_not_called()
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertIn("/api/social_network/posts/", json.loads(res.content)["paths"])
+
+    def test_unchanged_schema_answers_not_modified(self):
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(schema.schema_path().exists())
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
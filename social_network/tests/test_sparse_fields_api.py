@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.models import Comment, HashTag, Post
+from user.models import Profile
+
+POST_URL = reverse("social_network:post-list")
+
+
+def detail_url(post_id):
+    return reverse("social_network:post-detail", args=[post_id])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "testunique@tests.com", "unique_password"
+        )
+        Profile.objects.create(user=self.user, username="test1", bio="testbio1")
+        self.post = Post.objects.create(user=self.user, title="t1", text="long text")
+        self.post.hashtag.add(HashTag.objects.create(name="tag"))
+        self.comment = Comment.objects.create(
+            user=self.user, post=self.post, text="comment"
+        )
+        self.client.force_authenticate(self.user)
+
+    def get_with_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        return res, queries
+
+    def test_fields_limit_response_and_queries(self):
+        full, full_queries = self.get_with_queries(detail_url(self.post.id))
+        res, queries = self.get_with_queries(
+            detail_url(self.post.id), {"fields": "id,title"}
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data, {"id": self.post.id, "title": "t1"})
+        self.assertLess(len(queries), len(full_queries))
+        post_query = queries[-1]["sql"]
+        self.assertNotIn('"social_network_post"."text"', post_query)
+
+    def test_list_fields(self):
+        res = self.client.get(POST_URL, {"fields": "id,hashtag"})
+
+        self.assertEquals(
+            res.data["results"], [{"id": self.post.id, "hashtag": ["tag"]}]
+        )
+
+    def test_comment_post_expansion(self):
+        url = reverse("social_network:comment-detail", args=[self.comment.id])
+
+        collapsed = self.client.get(url)
+        expanded = self.client.get(url, {"expand": "post", "fields": "id,post"})
+
+        self.assertEquals(collapsed.data["post"], self.post.id)
+        self.assertEquals(set(expanded.data), {"id", "post"})
+        self.assertEquals(expanded.data["post"]["title"], "t1")
+
+    def test_profile_fields(self):
+        res = self.client.get(reverse("user:profile-list"), {"fields": "username"})
+
+        self.assertEquals(res.data["results"], [{"username": "test1"}])
@@ -0,0 +1,160 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network import changelog, deletion
+from social_network.deletion import soft_delete
+from social_network.models import ChangeLogEntry, Comment, Like, Post
+from user.models import Profile
+
+SYNC_URL = reverse("social_network:sync-list")
+
+
+class SyncTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("a@tests.com", "password")
+        self.friend = get_user_model().objects.create_user("b@tests.com", "password")
+        self.stranger = get_user_model().objects.create_user("c@tests.com", "pass")
+        self.profile = Profile.objects.create(user=self.user, username="a", bio="b")
+        self.friend_profile = Profile.objects.create(
+            user=self.friend, username="b", bio="b"
+        )
+        Profile.objects.create(user=self.stranger, username="c", bio="b")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.friend_profile.followers.add(self.user)
+        self.profile.following.add(self.friend)
+        self.client.force_authenticate(self.user)
+
+        for patch in (
+            mock.patch.object(changelog, "SETTLE_DELAY", timedelta(0)),
+            mock.patch("social_network.signals.purge_deleted"),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def sync(self, since):
+        res = self.client.get(SYNC_URL, {"since": since})
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_first_sync_asks_for_reset(self):
+        data = self.sync(0)
+
+        self.assertTrue(data["reset"])
+        self.assertEquals(data["watermark"], changelog.latest_seq())
+        self.assertEquals(data["posts"], [])
+
+    def test_returns_only_relevant_changes_since_watermark(self):
+        watermark = self.sync(0)["watermark"]
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(user=self.friend, title="friend", text="t")
+            Post.objects.create(user=self.stranger, title="stranger", text="t")
+            comment = Comment.objects.create(user=self.friend, post=post, text="c")
+            like = Like.objects.create(user=self.user, post=post)
+
+        data = self.sync(watermark)
+
+        self.assertFalse(data["reset"])
+        self.assertEquals([row["title"] for row in data["posts"]], ["friend"])
+        self.assertEquals(data["posts"][0]["comments_count"], 1)
+        self.assertEquals([row["id"] for row in data["comments"]], [comment.id])
+        self.assertEquals([row["id"] for row in data["likes"]], [like.id])
+        self.assertEquals(self.sync(data["watermark"])["posts"], [])
+
+    def test_queries_do_not_grow_with_changed_comments(self):
+        watermark = self.sync(0)["watermark"]
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(user=self.friend, title="friend", text="t")
+            comments = [
+                Comment.objects.create(user=self.friend, post=post, text="c")
+                for _ in range(5)
+            ]
+            Like.objects.create(user=self.user, comment=comments[0])
+
+        # Profile check, following, log bounds and entries, then one per kind
+        with self.assertNumQueries(8):
+            data = self.sync(watermark)
+
+        self.assertEquals(len(data["comments"]), 5)
+        self.assertEquals(
+            [row["likes"]["liked_by_me"] for row in data["comments"]],
+            [True, False, False, False, False],
+        )
+
+    def test_deletions_and_unfollows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(user=self.friend, title="friend", text="t")
+            like = Like.objects.create(user=self.user, post=post)
+        like_id = like.id
+        watermark = changelog.latest_seq()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            like.delete()
+            soft_delete("post", post)
+            self.friend_profile.followers.remove(self.user)
+
+        data = self.sync(watermark)
+        self.assertEquals(data["deleted_posts"], [post.id])
+        self.assertEquals(data["deleted_likes"], [like_id])
+        self.assertEquals(
+            data["unfollows"],
+            [{"profile": self.friend_profile.id, "user": self.user.id}],
+        )
+
+    def test_paging_and_pruned_watermark(self):
+        watermark = changelog.latest_seq()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Post.objects.create(user=self.friend, title=f"t{i}", text="t")
+
+        with mock.patch.object(changelog, "SYNC_LIMIT", 2):
+            first = self.client.get(SYNC_URL, {"since": watermark}).data
+        self.assertTrue(first["has_more"])
+        self.assertEquals(len(first["posts"]), 2)
+        self.assertEquals(len(self.sync(first["watermark"])["posts"]), 1)
+
+        entries = ChangeLogEntry.objects.count()
+        later = timezone.now() + timedelta(days=31)
+        self.assertEquals(changelog.prune_change_log(now=later), entries - 1)
+        self.assertTrue(self.sync(watermark)["reset"])
+
+    def test_entries_are_written_when_the_transaction_commits(self):
+        watermark = changelog.latest_seq()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Post.objects.create(user=self.friend, title="friend", text="t")
+            self.assertEquals(changelog.latest_seq(), watermark)
+        for callback in callbacks:
+            callback()
+
+        self.assertEquals(len(self.sync(watermark)["posts"]), 1)
+
+    def test_deleted_user_is_one_tombstone_then_purged_rows(self):
+        post = Post.objects.create(user=self.user, title="mine", text="t")
+        comment = Comment.objects.create(user=self.friend, post=post, text="c")
+        Post.objects.create(user=self.friend, title="friend", text="t")
+        watermark = changelog.latest_seq()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job = soft_delete("user", self.friend)
+        self.assertEquals(changelog.latest_seq(), watermark + 1)
+
+        data = self.sync(watermark)
+        self.assertEquals(data["deleted_users"], [self.friend.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deletion.run_deletion_job(job.id)
+        data = self.sync(data["watermark"])
+
+        self.assertEquals(data["deleted_comments"], [comment.id])
+        self.assertEquals(
+            data["unfollows"],
+            [{"profile": self.friend_profile.id, "user": self.user.id}],
+        )
@@ -0,0 +1,70 @@
+from unittest import mock
+
+import fakeredis
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_media_api.throttling import ActionTokenBucketThrottle
+from social_network.models import Post
+from user.models import Profile
+
+
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "testunique@tests.com", "unique_password"
+        )
+        Profile.objects.create(user=self.user, username="test1", bio="testbio1")
+        self.post = Post.objects.create(user=self.user, title="t1", text="text")
+        self.client.force_authenticate(self.user)
+        self.like_url = (
+            reverse("social_network:post-detail", args=[self.post.id])
+            + "post_like_unlike/"
+        )
+
+        patches = [
+            mock.patch.object(
+                ActionTokenBucketThrottle, "redis_client", fakeredis.FakeRedis()
+            ),
+            mock.patch.object(ActionTokenBucketThrottle, "_script", None),
+            mock.patch.object(
+                ActionTokenBucketThrottle,
+                "THROTTLE_RATES",
+                {"post_like_unlike": "2/min", "follow_unfollow": "1/min"},
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_bucket_exhausted_returns_retry_after(self):
+        self.assertEquals(self.client.post(self.like_url).status_code, 200)
+        self.assertEquals(self.client.post(self.like_url).status_code, 200)
+
+        res = self.client.post(self.like_url)
+
+        self.assertEquals(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEquals(res["Retry-After"], "30")
+
+    def test_budgets_are_per_action(self):
+        user2 = get_user_model().objects.create_user("test2@tests.com", "password2")
+        profile2 = Profile.objects.create(user=user2, username="test2", bio="bio")
+        follow_url = (
+            reverse("user:profile-detail", args=[profile2.id]) + "follow_unfollow/"
+        )
+
+        self.assertEquals(self.client.post(follow_url).status_code, 200)
+        self.assertEquals(self.client.post(follow_url).status_code, 429)
+        self.assertEquals(self.client.post(self.like_url).status_code, 200)
+
+    def test_refill_over_time(self):
+        with mock.patch("social_media_api.throttling.time.time", return_value=1000):
+            self.client.post(self.like_url)
+            self.client.post(self.like_url)
+            self.assertEquals(self.client.post(self.like_url).status_code, 429)
+        with mock.patch("social_media_api.throttling.time.time", return_value=1030):
+            self.assertEquals(self.client.post(self.like_url).status_code, 200)
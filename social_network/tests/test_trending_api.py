@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.models import HashTag, HashTagUsageBucket, Like, Post
+from social_network.trending import (
+    BUCKET_SPAN,
+    COMPACTED_SPAN,
+    bucket_start,
+    compact_buckets,
+    record_usage,
+    refresh_trending,
+)
+
+TRENDING_URL = reverse("social_network:hashtag-trending")
+
+
+class TrendingEngineTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "testunique@tests.com", "unique_password"
+        )
+        self.python = HashTag.objects.create(name="python")
+        self.django = HashTag.objects.create(name="django")
+
+    def test_tagging_and_liking_update_buckets(self):
+        post = Post.objects.create(user=self.user, title="t1", text="text")
+        post.hashtag.add(self.python, self.django)
+        Like.objects.create(user=self.user, post=post)
+
+        bucket = HashTagUsageBucket.objects.get(hashtag=self.python)
+        self.assertEquals(bucket.span, BUCKET_SPAN)
+        self.assertEquals(bucket.uses, 1)
+        self.assertEquals(bucket.engagement, 1)
+
+    def test_compaction_merges_old_buckets_into_hours(self):
+        now = timezone.now()
+        old = bucket_start(now - timedelta(days=2), COMPACTED_SPAN)
+        record_usage([self.python.id], uses=1, moment=old)
+        record_usage([self.python.id], uses=2, moment=old + timedelta(minutes=5))
+        record_usage([self.python.id], uses=1, moment=now - timedelta(days=8))
+        record_usage([self.python.id], uses=1, moment=now)
+
+        compact_buckets(now=now)
+
+        buckets = HashTagUsageBucket.objects.filter(hashtag=self.python)
+        self.assertEquals(buckets.filter(span=COMPACTED_SPAN).count(), 1)
+        self.assertEquals(buckets.get(span=COMPACTED_SPAN).uses, 3)
+        self.assertEquals(buckets.filter(span=BUCKET_SPAN).count(), 1)
+
+    def test_refresh_ranks_each_window(self):
+        now = timezone.now()
+        record_usage([self.python.id], uses=1, moment=now)
+        record_usage([self.django.id], uses=5, moment=now - timedelta(hours=3))
+
+        refresh_trending(now=now)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        res = client.get(TRENDING_URL, {"window": "1h"})
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals([row["name"] for row in res.data], ["python"])
+
+        res = client.get(TRENDING_URL, {"window": "24h"})
+        self.assertEquals([row["name"] for row in res.data], ["django", "python"])
+
+    def test_unknown_window_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        res = client.get(TRENDING_URL, {"window": "1y"})
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
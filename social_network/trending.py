@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from social_network.models import HashTagUsageBucket, TrendingHashTag
+
+BUCKET_SPAN = 5 * 60
+COMPACTED_SPAN = 60 * 60
+COMPACT_AFTER = timedelta(hours=24)
+RETENTION = timedelta(days=7)
+WINDOWS = {
+    "1h": timedelta(hours=1),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+}
+TOP_N = 50
+USES_WEIGHT = 2
+ENGAGEMENT_WEIGHT = 1
+
+
+def bucket_start(moment: datetime, span: int = BUCKET_SPAN) -> datetime:
+    """Align a moment to the start of its bucket"""
+    seconds = int(moment.timestamp())
+    return datetime.fromtimestamp(seconds - seconds % span, tz=dt_timezone.utc)
+
+
+def record_usage(hashtag_ids, uses=0, engagement=0, moment=None) -> None:
+    """Increment the current bucket of every given hashtag in two queries"""
+    hashtag_ids = set(hashtag_ids)
+    if not hashtag_ids or not (uses or engagement):
+        return
+    start = bucket_start(moment or timezone.now())
+    HashTagUsageBucket.objects.bulk_create(
+        [
+            HashTagUsageBucket(
+                hashtag_id=hashtag_id, bucket_start=start, span=BUCKET_SPAN
+            )
+            for hashtag_id in hashtag_ids
+        ],
+        ignore_conflicts=True,
+    )
+    HashTagUsageBucket.objects.filter(
+        hashtag_id__in=hashtag_ids, bucket_start=start, span=BUCKET_SPAN
+    ).update(uses=F("uses") + uses, engagement=F("engagement") + engagement)
+
+
+def compact_buckets(now=None) -> int:
+    """
+    Merge fine buckets older than COMPACT_AFTER into hourly ones
+    and drop everything outside of the longest window.
+    Only whole hours are compacted, so an hourly bucket is never written twice.
+    """
+    now = now or timezone.now()
+    cutoff = bucket_start(now - COMPACT_AFTER, COMPACTED_SPAN)
+    with transaction.atomic():
+        HashTagUsageBucket.objects.filter(bucket_start__lt=now - RETENTION).delete()
+        fine = HashTagUsageBucket.objects.filter(
+            span=BUCKET_SPAN, bucket_start__lt=cutoff
+        )
+        merged = (
+            fine.annotate(hour=TruncHour("bucket_start"))
+            .values("hashtag_id", "hour")
+            .annotate(total_uses=Sum("uses"), total_engagement=Sum("engagement"))
+        )
+        compacted = HashTagUsageBucket.objects.bulk_create(
+            [
+                HashTagUsageBucket(
+                    hashtag_id=row["hashtag_id"],
+                    bucket_start=row["hour"],
+                    span=COMPACTED_SPAN,
+                    uses=row["total_uses"],
+                    engagement=row["total_engagement"],
+                )
+                for row in merged
+            ]
+        )
+        fine.delete()
+    return len(compacted)
+
+
+def refresh_trending(now=None, top_n: int = TOP_N) -> None:
+    """Precompute the top hashtags of every window"""
+    now = now or timezone.now()
+    for window, length in WINDOWS.items():
+        rows = (
+            HashTagUsageBucket.objects.filter(bucket_start__gte=now - length)
+            .values("hashtag_id")
+            .annotate(total_uses=Sum("uses"), total_engagement=Sum("engagement"))
+            .annotate(
+                score=F("total_uses") * USES_WEIGHT
+                + F("total_engagement") * ENGAGEMENT_WEIGHT
+            )
+            .order_by("-score", "hashtag_id")[:top_n]
+        )
+        trending = [
+            TrendingHashTag(
+                window=window,
+                rank=rank,
+                hashtag_id=row["hashtag_id"],
+                uses=row["total_uses"],
+                engagement=row["total_engagement"],
+                score=row["score"],
+                computed_at=now,
+            )
+            for rank, row in enumerate(rows, start=1)
+        ]
+        with transaction.atomic():
+            TrendingHashTag.objects.filter(window=window).delete()
+            TrendingHashTag.objects.bulk_create(trending)
@@ -2,7 +2,9 @@ from django.urls import path, include
 from rest_framework import routers
 
 from social_network.views import (
+    AttachmentViewSet,
     HashTagViewSet,
+    SyncViewSet,
     PostViewSet,
     CommentViewSet,
     LikedListPostsProfileOnlyView,
@@ -13,6 +15,8 @@ router = routers.DefaultRouter()
 router.register("hashtags", HashTagViewSet)
 router.register("posts", PostViewSet)
 router.register("comments", CommentViewSet)
+router.register("attachments", AttachmentViewSet)
+router.register("sync", SyncViewSet, basename="sync")
 router.register(
     "likes-list-post", LikedListPostsProfileOnlyView, basename="likes-list-post"
 )
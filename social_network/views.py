@@ -1,16 +1,45 @@
-from django.db.models import Q, Count
+from collections import defaultdict
+
+from django.db.models import Q, Count, Prefetch, Exists, OuterRef
+from django.http import Http404
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, status, mixins
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from social_network.models import HashTag, Post, Like, Comment
+from social_media_api.conditional import ConditionalGetMixin
+from social_media_api.fast_render import FastListMixin
+from social_media_api.idempotency import IdempotencyMixin
+from social_media_api.sparse import SparseQuerysetMixin
+from social_media_api.throttling import ActionTokenBucketThrottle
+from social_network.changelog import changes_since
+from social_network.deletion import soft_delete
+from social_network.hashtags import HASHTAG_CACHE
+from social_network.media import MAX_CHUNK_SIZE, remove_attachment, write_chunk
+from social_network.models import (
+    ArchivedComment,
+    ArchivedLike,
+    ArchivedPost,
+    Attachment,
+    ChangeLogEntry,
+    HashTag,
+    Post,
+    Like,
+    Comment,
+    TrendingHashTag,
+)
+from social_network.ranking import FEED_MODES, RankedFeed
 from social_network.serializers import (
     HashTagSerializer,
+    TrendingHashTagSerializer,
+    LATEST_COMMENTS_COUNT,
     PostSerializer,
     PostListSerializer,
     PostDetailSerializer,
+    PostCommentSerializer,
+    LikerSerializer,
     PostLikeSerializer,
     CommentSerializer,
     CommentListSerializer,
@@ -18,19 +47,128 @@ from social_network.serializers import (
     CommentLikeSerializer,
     LikeListPostSerializer,
     LikeListCommentSerializer,
+    ArchivedPostDetailSerializer,
+    ArchivedCommentDetailSerializer,
+    AttachmentSerializer,
+    SyncSerializer,
 )
+from social_network.pagination import NewestFirstCursorPagination
+from social_network.trending import WINDOWS, TOP_N
 from user.permissions import IsOwnerOrIsAdminOrReadOnly, IsUserHaveProfile
 
 
+UPLOAD_OFFSET_HEADER = "Upload-Offset"
+
+
+class ArchiveFallbackMixin:
+    """
+    Serves retrieve from the archive tables when the object
+    has already been moved out of the hot ones. Only the archived rows
+    of the user and the users they follow are visible.
+    """
+
+    archive_queryset = None
+    archive_serializer_class = None
+    archive_like_field = None
+
+    def get_archive_queryset(self):
+        following_users = self.request.user.profile.following.all()
+        return self.archive_queryset.all().filter(
+            Q(user=self.request.user) | Q(user__in=following_users)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            instance = (
+                self.get_archive_queryset()
+                .filter(pk=kwargs[lookup_url_kwarg])
+                .annotate(
+                    liked_by_me=Exists(
+                        ArchivedLike.objects.filter(
+                            **{
+                                self.archive_like_field: OuterRef("pk"),
+                                "user": request.user,
+                            }
+                        )
+                    )
+                )
+                .first()
+            )
+            if instance is None:
+                raise
+            serializer = self.archive_serializer_class(
+                instance, context=self.get_serializer_context()
+            )
+            return Response(serializer.data)
+
+
 @extend_schema(description="Endpoint for managing hashtags")
-class HashTagViewSet(viewsets.ModelViewSet):
+class HashTagViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = HashTag.objects.all()
     serializer_class = HashTagSerializer
     permission_classes = (IsAuthenticated,)
 
+    def cached(self, view, request, *args, **kwargs):
+        key = f"{request.get_host()}:{request.get_full_path()}"
+        data = HASHTAG_CACHE.get_or_set(
+            key, lambda: view(request, *args, **kwargs).data
+        )
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "window",
+                type={"type": "string"},
+                description="Trending window: 1h, 24h or 7d (ex. ?window=1h)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type={"type": "integer"},
+                description="Number of hashtags to return (ex. ?limit=10)",
+            ),
+        ]
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="trending",
+        serializer_class=TrendingHashTagSerializer,
+    )
+    def trending(self, request):
+        """Endpoint for precomputed top hashtags of the window"""
+        window = request.query_params.get("window", "24h")
+        if window not in WINDOWS:
+            raise ValidationError(f"Window must be one of: {', '.join(WINDOWS)}")
+        try:
+            limit = min(int(request.query_params.get("limit", TOP_N)), TOP_N)
+        except ValueError:
+            raise ValidationError("Limit must be an integer")
+        queryset = TrendingHashTag.objects.filter(window=window).select_related(
+            "hashtag"
+        )[: max(limit, 0)]
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
 @extend_schema(description="Endpoint for managing Posts")
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(
+    ArchiveFallbackMixin,
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    FastListMixin,
+    SparseQuerysetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = (
@@ -38,6 +176,21 @@ class PostViewSet(viewsets.ModelViewSet):
         IsAuthenticated,
         IsUserHaveProfile,
     )
+    fast_list_fields = (
+        ("id", "id"),
+        ("user", "user__email"),
+        ("title", "title"),
+        ("text", "text"),
+        ("media", "media"),
+        ("comments_count", "comments_count"),
+        ("likes_count", "likes_count"),
+        ("hashtag", None),
+        ("created_at", "created_at"),
+    )
+    archive_queryset = ArchivedPost.objects.select_related("user")
+    archive_serializer_class = ArchivedPostDetailSerializer
+    archive_like_field = "post"
+    idempotent_actions = ("create", "post_like_unlike", "attachments")
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -46,18 +199,14 @@ class PostViewSet(viewsets.ModelViewSet):
             return PostDetailSerializer
         return PostSerializer
 
-    def get_queryset(self):
-        queryset = self.queryset
-
+    def get_followed_queryset(self):
         following_users = self.request.user.profile.following.all()
-        queryset = queryset.select_related("user__profile").filter(
-            Q(user=self.request.user) | Q(user__in=following_users)
+        return self.queryset.select_related("user__profile").filter(
+            Q(user=self.request.user) | Q(user__in=following_users),
+            deleted_at__isnull=True,
         )
 
-        if self.action == "list":
-            queryset = queryset.select_related("user").annotate(
-                comments_count=Count("comments"), likes_count=Count("likes")
-            )
+    def filter_by_params(self, queryset):
         """Filtering posts by title & hashtags"""
         title = self.request.query_params.get("title")
         hashtag = self.request.query_params.get("hashtag")
@@ -65,7 +214,81 @@ class PostViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(title__icontains=title)
         if hashtag:
             queryset = queryset.filter(hashtag__name__icontains=hashtag)
-        return queryset.select_related("user").prefetch_related("hashtag").distinct()
+        return queryset
+
+    def get_queryset(self):
+        queryset = self.get_followed_queryset()
+
+        if self.action == "list":
+            queryset = queryset.select_related("user").annotate(
+                comments_count=Count("comments")
+            )
+        if self.action == "retrieve":
+            queryset = queryset.annotate(
+                comments_count=Count("comments")
+            ).prefetch_related(
+                Prefetch(
+                    "comments",
+                    queryset=Comment.objects.select_related("user").order_by(
+                        "-created_at", "-id"
+                    )[:LATEST_COMMENTS_COUNT],
+                    to_attr="latest_comments",
+                )
+            )
+        queryset = self.filter_by_params(queryset)
+        return (
+            queryset.select_related("user")
+            .prefetch_related(
+                Prefetch("hashtag", queryset=HashTag.objects.order_by("id"))
+            )
+            .distinct()
+        )
+
+    def get_validator_queryset(self):
+        queryset = self.filter_by_params(self.get_followed_queryset())
+        return Post.objects.filter(pk__in=queryset.values("pk"))
+
+    def fast_list_rows(self, rows):
+        hashtags = defaultdict(list)
+        through = Post.hashtag.through.objects.filter(
+            post_id__in=[row["id"] for row in rows]
+        )
+        for post_id, name in through.order_by("hashtag_id").values_list(
+            "post_id", "hashtag__name"
+        ):
+            hashtags[post_id].append(name)
+        for row in rows:
+            row["hashtag"] = hashtags[row["id"]]
+        return rows
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="comments",
+        serializer_class=PostCommentSerializer,
+        pagination_class=NewestFirstCursorPagination,
+    )
+    def comments(self, request, pk=None):
+        """Endpoint for cursor-paginated comments of the post, newest first"""
+        post = self.get_object()
+        page = self.paginate_queryset(post.comments.select_related("user"))
+        serializer = self.serializer_class(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="likers",
+        serializer_class=LikerSerializer,
+        pagination_class=NewestFirstCursorPagination,
+    )
+    def likers(self, request, pk=None):
+        """Endpoint for cursor-paginated users who liked the post"""
+        post = self.get_object()
+        likes = post.likes.filter(user__isnull=False).select_related("user__profile")
+        page = self.paginate_queryset(likes)
+        serializer = self.serializer_class(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     def get_permissions(self):
         if self.action == "post_like_unlike":
@@ -75,10 +298,14 @@ class PostViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        soft_delete("post", instance)
+
     @action(
         methods=["POST"],
         detail=True,
         url_path="post_like_unlike",
+        throttle_classes=[ActionTokenBucketThrottle],
         serializer_class=PostLikeSerializer,
     )
     def post_like_unlike(self, request, pk=None):
@@ -88,11 +315,28 @@ class PostViewSet(viewsets.ModelViewSet):
 
         if not post.likes.filter(user=user).exists():
             Like.objects.create(user=user, post=post)
-            serializer = self.serializer_class(post)
+            post.refresh_from_db(fields=["likes_count", "recent_likers"])
+            serializer = self.serializer_class(post, context={"request": request})
             return Response(serializer.data, status=status.HTTP_200_OK)
         post.likes.filter(user=user).delete()
         return Response({"status": "unliked"})
 
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="attachments",
+        serializer_class=AttachmentSerializer,
+    )
+    def attachments(self, request, pk=None):
+        """Endpoint for starting a chunked upload of a post attachment"""
+        post = self.get_object()
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request, "post": post}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user, post=post, position=post.attachments.count())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     # Only for documentation purposes
     @extend_schema(
         parameters=[
@@ -106,14 +350,46 @@ class PostViewSet(viewsets.ModelViewSet):
                 type={"type": "string"},
                 description="Filter by hashtag  (ex. ?hashtag=pa)",
             ),
+            OpenApiParameter(
+                "mode",
+                type={"type": "string"},
+                enum=FEED_MODES,
+                description="latest posts or top ranked by engagement (ex. ?mode=top)",
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
+        mode = request.query_params.get("mode", "latest")
+        if mode not in FEED_MODES:
+            raise ValidationError(f"mode must be one of {', '.join(FEED_MODES)}")
+        if mode == "top":
+            return self.ranked_list(request)
         return super().list(request, *args, **kwargs)
 
+    def ranked_list(self, request):
+        """Page of the cached ranking, rendered by the list serializer"""
+        filters = {
+            param: request.query_params.get(param) for param in ("title", "hashtag")
+        }
+        ids = RankedFeed.ids(
+            self.filter_by_params(self.get_followed_queryset()), request.user, filters
+        )
+        page_ids = self.paginate_queryset(ids)
+        posts = self.get_queryset().in_bulk(page_ids)
+        serializer = self.get_serializer(
+            [posts[pk] for pk in page_ids if pk in posts], many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
 
 @extend_schema(description="Endpoint for managing comments")
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ArchiveFallbackMixin,
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    SparseQuerysetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = (
@@ -121,16 +397,27 @@ class CommentViewSet(viewsets.ModelViewSet):
         IsAuthenticated,
         IsUserHaveProfile,
     )
+    etag_fields = ("version", "updated_at", "post__version", "post__updated_at")
+    archive_queryset = ArchivedComment.objects.all()
+    archive_serializer_class = ArchivedCommentDetailSerializer
+    archive_like_field = "comment"
+    idempotent_actions = ("create", "comment_like_unlike")
 
     def get_queryset(self):
         queryset = self.queryset
         following_users = self.request.user.profile.following.all()
         queryset = queryset.filter(
-            Q(user=self.request.user) | Q(user__in=following_users)
-        )
-        return queryset.select_related("post__user").prefetch_related(
-            "likes__user",
+            Q(user=self.request.user) | Q(user__in=following_users),
+            Q(post__isnull=True) | Q(post__deleted_at__isnull=True),
+            user__is_active=True,
         )
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.annotate(
+                liked_by_me=Exists(
+                    Like.objects.filter(comment=OuterRef("pk"), user=self.request.user)
+                )
+            )
+        return queryset.select_related("post__user")
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -146,6 +433,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         methods=["POST"],
         detail=True,
         url_path="comment_like_unlike",
+        throttle_classes=[ActionTokenBucketThrottle],
         serializer_class=CommentLikeSerializer,
     )
     def comment_like_unlike(self, request, pk=None):
@@ -155,14 +443,32 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         if not comment.likes.filter(user=user).exists():
             Like.objects.create(user=user, comment=comment)
-            serializer = self.serializer_class(comment)
-            return Response({"status": "liked"}, status=status.HTTP_200_OK)
+            comment.refresh_from_db(fields=["likes_count", "recent_likers"])
+            serializer = self.serializer_class(comment, context={"request": request})
+            return Response(serializer.data, status=status.HTTP_200_OK)
         comment.likes.filter(user=user).delete()
         return Response({"status": "unliked comment"})
 
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="likers",
+        serializer_class=LikerSerializer,
+        pagination_class=NewestFirstCursorPagination,
+    )
+    def likers(self, request, pk=None):
+        """Endpoint for cursor-paginated users who liked the comment"""
+        comment = self.get_object()
+        likes = comment.likes.filter(user__isnull=False).select_related("user__profile")
+        page = self.paginate_queryset(likes)
+        serializer = self.serializer_class(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 @extend_schema(description="Endpoint for looking user's liked posts")
-class LikedListPostsProfileOnlyView(mixins.ListModelMixin, viewsets.GenericViewSet):
+class LikedListPostsProfileOnlyView(
+    SparseQuerysetMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
     queryset = Like.objects.all()
     serializer_class = LikeListPostSerializer
     permission_classes = (IsOwnerOrIsAdminOrReadOnly, IsAuthenticated)
@@ -170,14 +476,21 @@ class LikedListPostsProfileOnlyView(mixins.ListModelMixin, viewsets.GenericViewS
     def get_queryset(self):
         queryset = self.queryset
         user = self.request.user
+        # Posts hidden by a soft delete, or by their author's, are left out
         queryset = queryset.select_related("post__user").filter(
-            comment__isnull=True, user=user
+            comment__isnull=True,
+            user=user,
+            post__isnull=False,
+            post__deleted_at__isnull=True,
+            post__user__is_active=True,
         )
         return queryset
 
 
 @extend_schema(description="Endpoint for looking user's liked comments")
-class LikedListCommentsProfileOnlyView(mixins.ListModelMixin, viewsets.GenericViewSet):
+class LikedListCommentsProfileOnlyView(
+    SparseQuerysetMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
     queryset = Like.objects.all()
     serializer_class = LikeListCommentSerializer
     permission_classes = (IsOwnerOrIsAdminOrReadOnly, IsAuthenticated)
@@ -185,7 +498,156 @@ class LikedListCommentsProfileOnlyView(mixins.ListModelMixin, viewsets.GenericVi
     def get_queryset(self):
         queryset = self.queryset
         user = self.request.user
-        queryset = queryset.filter(post__isnull=True, user=user).select_related(
-            "comment__post__user"
-        )
+        # Comments are hidden with their post or their author
+        queryset = queryset.filter(
+            Q(comment__post__isnull=True) | Q(comment__post__deleted_at__isnull=True),
+            post__isnull=True,
+            user=user,
+            comment__isnull=False,
+            comment__user__is_active=True,
+        ).select_related("comment__post__user")
         return queryset
+
+
+@extend_schema(description="Endpoint for resumable chunked uploads of attachments")
+class AttachmentViewSet(
+    mixins.RetrieveModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet
+):
+    queryset = Attachment.objects.all()
+    serializer_class = AttachmentSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        remove_attachment(instance)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                UPLOAD_OFFSET_HEADER,
+                type=int,
+                location=OpenApiParameter.HEADER,
+                required=True,
+                description="Bytes already received, as returned by the last call",
+            ),
+        ],
+        request={
+            "application/offset+octet-stream": {"type": "string", "format": "binary"}
+        },
+    )
+    @action(methods=["PATCH"], detail=True, url_path="upload")
+    def upload(self, request, pk=None):
+        """Endpoint for appending the next chunk, sent as the raw request body"""
+        attachment = self.get_object()
+        try:
+            offset = int(request.headers[UPLOAD_OFFSET_HEADER])
+        except (KeyError, ValueError):
+            raise ValidationError(f"{UPLOAD_OFFSET_HEADER} header must be an integer")
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+        if length > MAX_CHUNK_SIZE:
+            raise ValidationError(f"Chunks can be up to {MAX_CHUNK_SIZE} bytes")
+        attachment = write_chunk(attachment.pk, offset, request.stream, length)
+        response = Response(self.serializer_class(attachment).data)
+        response[UPLOAD_OFFSET_HEADER] = attachment.received
+        return response
+
+
+@extend_schema(description="Endpoint for what changed in the feed since the last sync")
+class SyncViewSet(viewsets.GenericViewSet):
+    queryset = ChangeLogEntry.objects.all()
+    serializer_class = SyncSerializer
+    permission_classes = (IsAuthenticated, IsUserHaveProfile)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "since",
+                type={"type": "integer"},
+                description=(
+                    "Watermark returned by the previous sync; without it, or when "
+                    "it is too old, reset is true and the client refetches (ex. ?since=42)"
+                ),
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        try:
+            since = int(request.query_params.get("since", 0))
+        except ValueError:
+            raise ValidationError("since must be an integer")
+        user = request.user
+        user_ids = [user.pk, *user.profile.following.values_list("pk", flat=True)]
+        changes = changes_since(since, user_ids)
+        entries = changes.pop("entries", [])
+
+        deleted = defaultdict(list)
+        changed = defaultdict(set)
+        follows = {False: [], True: []}
+        for entry in entries:
+            if entry.kind == "follow":
+                follows[entry.deleted].append(
+                    {"profile": entry.object_id, "user": entry.actor_id}
+                )
+            elif entry.deleted:
+                deleted[entry.kind].append(entry.object_id)
+            else:
+                changed[entry.kind].add(entry.object_id)
+            # Parents are resent so their counters and latest comments stay fresh
+            if entry.post_id is not None and entry.kind != "post":
+                changed["post"].add(entry.post_id)
+            if entry.comment_id is not None:
+                changed["comment"].add(entry.comment_id)
+
+        posts = (
+            Post.objects.filter(
+                pk__in=changed["post"] - set(deleted["post"]),
+                user_id__in=user_ids,
+                deleted_at__isnull=True,
+            )
+            .select_related("user")
+            .annotate(comments_count=Count("comments"))
+            .prefetch_related(
+                Prefetch("hashtag", queryset=HashTag.objects.order_by("id"))
+            )
+            .order_by("id")
+        )
+        comments = (
+            Comment.objects.filter(
+                Q(post__isnull=True) | Q(post__deleted_at__isnull=True),
+                pk__in=changed["comment"] - set(deleted["comment"]),
+                user_id__in=user_ids,
+                user__is_active=True,
+            )
+            .annotate(
+                liked_by_me=Exists(
+                    Like.objects.filter(comment=OuterRef("pk"), user=user)
+                )
+            )
+            .select_related("post")
+            .order_by("id")
+        )
+        likes = Like.objects.filter(
+            pk__in=changed["like"] - set(deleted["like"]), user=user
+        ).order_by("id")
+        own_likes = {
+            entry.object_id
+            for entry in entries
+            if entry.kind == "like" and entry.actor_id == user.pk
+        }
+        serializer = self.get_serializer(
+            {
+                **changes,
+                "posts": posts,
+                "deleted_posts": sorted(deleted["post"]),
+                "comments": comments,
+                "deleted_comments": sorted(deleted["comment"]),
+                "likes": likes,
+                "deleted_likes": sorted(set(deleted["like"]) & own_likes),
+                "follows": follows[False],
+                "unfollows": follows[True],
+                "deleted_users": sorted(deleted["user"]),
+            }
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
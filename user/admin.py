@@ -2,11 +2,13 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.utils.translation import gettext as _
 
+from social_media_api.large_tables import LargeTableAdmin
 from user.models import User, Profile
+from user.stats import COUNTER_FIELDS
 
 
 @admin.register(User)
-class UserAdmin(DjangoUserAdmin):
+class UserAdmin(LargeTableAdmin, DjangoUserAdmin):
     """Define admin model for custom User model with no email field."""
 
     fieldsets = (
@@ -36,8 +38,17 @@ class UserAdmin(DjangoUserAdmin):
         ),
     )
     list_display = ("email", "first_name", "last_name", "is_staff")
-    search_fields = ("email", "first_name", "last_name")
+    # The unique index on email serves exact matches only
+    search_fields = ("email__exact",)
     ordering = ("email",)
 
 
-admin.site.register(Profile)
+@admin.register(Profile)
+class ProfileAdmin(LargeTableAdmin):
+    list_display = ("id", "username", "user", *COUNTER_FIELDS, "deleted_at")
+    list_select_related = ("user",)
+    # Prefix range over the indexed username_lower column
+    search_fields = ("^username",)
+    ordering = ("id",)
+    raw_id_fields = ("user", "followers", "following")
+    readonly_fields = (*COUNTER_FIELDS, "version", "updated_at")
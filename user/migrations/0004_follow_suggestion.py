@@ -0,0 +1,55 @@
+# Generated by Django 4.2.4 on 2026-10-19 08:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0003_remove_like_comment_remove_like_post_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FollowSuggestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("mutual_count", models.PositiveIntegerField()),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "suggested",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="follow_suggestions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("user", "rank"),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="followsuggestion",
+            constraint=models.UniqueConstraint(
+                fields=("user", "suggested"), name="unique_follow_suggestion"
+            ),
+        ),
+    ]
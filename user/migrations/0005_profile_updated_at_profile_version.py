@@ -0,0 +1,22 @@
+# Generated by Django 4.2.4 on 2026-10-19 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0004_follow_suggestion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
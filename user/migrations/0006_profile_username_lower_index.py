@@ -0,0 +1,20 @@
+# Generated by Django 4.2.4 on 2026-10-19 09:05
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0005_profile_updated_at_profile_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                django.db.models.functions.text.Lower("username"),
+                name="profile_username_lower_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-19 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0006_profile_username_lower_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
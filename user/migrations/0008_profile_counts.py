@@ -0,0 +1,71 @@
+# Generated by Django 4.2.4 on 2026-10-19 09:25
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counts(apps, schema_editor):
+    Profile = apps.get_model("user", "Profile")
+    Post = apps.get_model("social_network", "Post")
+    ArchivedPost = apps.get_model("social_network", "ArchivedPost")
+    counts = {}
+    for field, through in (
+        ("followers_count", Profile.followers.through),
+        ("following_count", Profile.following.through),
+    ):
+        rows = through.objects.values_list("profile_id").annotate(total=Count("id"))
+        for profile_id, total in rows.order_by():
+            counts.setdefault(profile_id, {})[field] = total
+    by_user = dict(Profile.objects.values_list("user_id", "pk"))
+    for posts in (Post.objects.filter(deleted_at__isnull=True), ArchivedPost.objects):
+        rows = posts.values_list("user_id").annotate(total=Count("id"))
+        for user_id, total in rows.order_by():
+            if user_id in by_user:
+                fields = counts.setdefault(by_user[user_id], {})
+                fields["posts_count"] = fields.get("posts_count", 0) + total
+    for profile_id, fields in counts.items():
+        Profile.objects.filter(pk=profile_id).update(**fields)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0007_profile_deleted_at"),
+        ("social_network", "0009_hashtag_name_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="followers_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="following_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="posts_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["posts_count"], name="user_profil_posts_c_cf2f25_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["followers_count"], name="user_profil_followe_ff1e69_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["following_count"], name="user_profil_followi_f6d0d8_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_counts, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.4 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_username_lower(apps, schema_editor):
+    Profile = apps.get_model("user", "Profile")
+    rows = Profile.objects.only("id", "username").order_by("pk")
+    batch = []
+    for profile in rows.iterator(chunk_size=BATCH_SIZE):
+        profile.username_lower = profile.username.lower()
+        batch.append(profile)
+        if len(batch) == BATCH_SIZE:
+            Profile.objects.bulk_update(
+                batch, ["username_lower"], batch_size=BATCH_SIZE
+            )
+            batch = []
+    Profile.objects.bulk_update(batch, ["username_lower"], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0008_profile_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="username_lower",
+            field=models.CharField(default="", editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_username_lower, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="profile",
+            name="profile_username_lower_idx",
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["username_lower"], name="profile_username_lower_idx"
+            ),
+        ),
+    ]
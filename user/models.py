@@ -6,10 +6,12 @@ from django.contrib.auth.models import (
     BaseUserManager,
 )  # A new class is imported. #
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext as _
 from django.utils.text import slugify
 
 from social_media_api import settings
+from social_media_api.prefix_search import normalize
 
 
 class UserManager(BaseUserManager):
@@ -59,19 +61,39 @@ class User(AbstractUser):
         return self.email
 
 
+class VersionedQuerySet(models.QuerySet):
+    def touch(self) -> int:
+        """Bump version and modification time without loading rows"""
+        return self.update(version=models.F("version") + 1, updated_at=timezone.now())
+
+
+class VersionedModel(models.Model):
+    """Base for models served with ETag and Last-Modified validators"""
+
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1)
+
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+
 def profile_picture_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
     filename = f"{slugify(instance.username)}-{uuid.uuid4()}.{extension}"
     return os.path.join("uploads/pictures/", filename)
 
 
-class Profile(models.Model):
+class Profile(VersionedModel):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="profile",
     )
     username = models.CharField(max_length=255, unique=True)
+    # Written on save, see social_media_api.prefix_search.normalize
+    username_lower = models.CharField(max_length=255, editable=False)
     picture = models.ImageField(
         null=True, upload_to=profile_picture_file_path, blank=True
     )
@@ -82,9 +104,50 @@ class Profile(models.Model):
     following = models.ManyToManyField(
         settings.AUTH_USER_MODEL, related_name="profiles_following", blank=True
     )
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ("id",)
+        indexes = [
+            models.Index(fields=("username_lower",), name="profile_username_lower_idx"),
+            models.Index(fields=("posts_count",)),
+            models.Index(fields=("followers_count",)),
+            models.Index(fields=("following_count",)),
+        ]
 
     def __str__(self):
         return self.username
+
+    def save(self, *args, **kwargs):
+        self.username_lower = normalize(self.username)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "username" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "username_lower"}
+        super().save(*args, **kwargs)
+
+
+class FollowSuggestion(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="follow_suggestions",
+    )
+    suggested = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    mutual_count = models.PositiveIntegerField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ("user", "rank")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "suggested"), name="unique_follow_suggestion"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.suggested} for {self.user}"
@@ -12,4 +12,6 @@ class IsOwnerOrIsAdminOrReadOnly(permissions.BasePermission):
 
 class IsUserHaveProfile(permissions.BasePermission):
     def has_permission(self, request, view):
-        return Profile.objects.filter(user=request.user).exists()
+        return Profile.objects.filter(
+            user=request.user, deleted_at__isnull=True
+        ).exists()
@@ -0,0 +1,74 @@
+import heapq
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from user.models import FollowSuggestion, Profile, User
+
+TOP_K = 20
+CHUNK_SIZE = 500
+# Keeps IN lists under SQLite's bound parameter limit
+QUERY_BATCH = 900
+
+
+def following_map(user_ids) -> dict:
+    """Map every given user id to the set of user ids they follow"""
+    user_ids = list(user_ids)
+    following = defaultdict(set)
+    for start in range(0, len(user_ids), QUERY_BATCH):
+        edges = Profile.following.through.objects.filter(
+            profile__user_id__in=user_ids[start : start + QUERY_BATCH]
+        ).values_list("profile__user_id", "user_id")
+        for user_id, followed_id in edges:
+            following[user_id].add(followed_id)
+    return following
+
+
+def rank_suggestions(user_id, following, second_hop, top_k=TOP_K) -> list:
+    """Rank friends-of-friends by the number of followed users following them"""
+    followed = following.get(user_id, set())
+    counts = Counter()
+    for followed_id in followed:
+        counts.update(second_hop.get(followed_id, ()))
+    for excluded in followed | {user_id}:
+        counts.pop(excluded, None)
+    return heapq.nlargest(top_k, counts.items(), key=lambda item: (item[1], -item[0]))
+
+
+def compute_suggestions(user_ids, top_k=TOP_K) -> None:
+    """Recompute and store suggestions of the given users"""
+    user_ids = list(user_ids)
+    following = following_map(user_ids)
+    second_hop = following_map(set().union(*following.values()))
+    suggestions = [
+        FollowSuggestion(
+            user_id=user_id,
+            suggested_id=suggested_id,
+            mutual_count=mutual_count,
+            rank=rank,
+        )
+        for user_id in user_ids
+        for rank, (suggested_id, mutual_count) in enumerate(
+            rank_suggestions(user_id, following, second_hop, top_k), start=1
+        )
+    ]
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user_id__in=user_ids).delete()
+        FollowSuggestion.objects.bulk_create(suggestions)
+
+
+def compute_all_suggestions(chunk_size=CHUNK_SIZE, top_k=TOP_K) -> int:
+    """Walk all users in id order chunk by chunk"""
+    processed = 0
+    last_id = 0
+    while True:
+        chunk = list(
+            User.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not chunk:
+            return processed
+        compute_suggestions(chunk, top_k)
+        processed += len(chunk)
+        last_id = chunk[-1]
@@ -0,0 +1,95 @@
+from django.db.models import Count, Exists, F, OuterRef, Window
+from django.db.models.functions import RowNumber
+
+from user.models import Profile
+
+MAX_BATCH = 100
+SAMPLE_SIZE = 3
+
+
+def followed_by_viewer(viewer):
+    """Subquery of the user ids the viewer follows"""
+    return Profile.following.through.objects.filter(profile__user_id=viewer.pk).values(
+        "user_id"
+    )
+
+
+def mutual_followers(viewer, profile_ids, sample_size=SAMPLE_SIZE) -> dict:
+    """
+    Users the viewer follows who follow each profile: the total and the
+    best known few, from one intersection query ranked by a window function.
+    """
+    rows = (
+        Profile.followers.through.objects.filter(
+            profile_id__in=profile_ids,
+            user_id__in=followed_by_viewer(viewer),
+            user__is_active=True,
+            user__profile__deleted_at__isnull=True,
+        )
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=F("profile_id"),
+                order_by=(F("user__profile__followers_count").desc(), F("user_id")),
+            ),
+            total=Window(Count("id"), partition_by=F("profile_id")),
+        )
+        .filter(rank__lte=sample_size)
+        .order_by("profile_id", "rank")
+        .values_list("profile_id", "user__profile__username", "total")
+    )
+    mutuals = {}
+    for profile_id, username, total in rows:
+        mutual = mutuals.setdefault(profile_id, {"count": total, "sample": []})
+        mutual["sample"].append(username)
+    return mutuals
+
+
+def profile_relationships(viewer, profile_ids) -> list:
+    """Follow flags and mutual followers of a batch of profiles, in two queries"""
+    profiles = (
+        Profile.objects.filter(pk__in=profile_ids, deleted_at__isnull=True)
+        .annotate(
+            viewer_follows=Exists(
+                Profile.followers.through.objects.filter(
+                    profile_id=OuterRef("pk"), user_id=viewer.pk
+                )
+            ),
+            follows_viewer=Exists(
+                Profile.following.through.objects.filter(
+                    profile_id=OuterRef("pk"), user_id=viewer.pk
+                )
+            ),
+        )
+        .order_by("pk")
+        .values_list("pk", "viewer_follows", "follows_viewer")
+    )
+    mutuals = mutual_followers(viewer, profile_ids)
+    empty = {"count": 0, "sample": []}
+    return [
+        {
+            "profile_id": profile_id,
+            "following": following,
+            "followed_by": followed_by,
+            "mutual_count": mutuals.get(profile_id, empty)["count"],
+            "mutual_sample": mutuals.get(profile_id, empty)["sample"],
+        }
+        for profile_id, following, followed_by in profiles
+    ]
+
+
+def mutual_followers_of(viewer, profile):
+    """Profiles of the users the viewer follows who follow the profile"""
+    return (
+        Profile.objects.filter(
+            deleted_at__isnull=True,
+            user__is_active=True,
+            user_id__in=followed_by_viewer(viewer),
+        )
+        .filter(
+            user_id__in=Profile.followers.through.objects.filter(
+                profile_id=profile.pk
+            ).values("user_id")
+        )
+        .order_by("-followers_count", "id")
+    )
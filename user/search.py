@@ -0,0 +1,21 @@
+from social_media_api.prefix_search import normalize, prefix_filter
+from user.models import Profile
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+
+def autocomplete_profiles(prefix: str, limit: int = AUTOCOMPLETE_LIMIT):
+    """
+    Profiles whose username starts with the prefix, most followed first.
+    The prefix is matched as a range over username_lower, so the lookup
+    walks profile_username_lower_idx instead of scanning with LIKE.
+    """
+    prefix = normalize(prefix.strip())
+    if not prefix:
+        return Profile.objects.none()
+    return (
+        Profile.objects.only("id", "username", "picture", "followers_count")
+        .filter(prefix_filter("username_lower", prefix), deleted_at__isnull=True)
+        .order_by("-followers_count", "username_lower", "id")[:limit]
+    )
@@ -2,10 +2,11 @@ from django.contrib.auth import get_user_model, authenticate
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from user.models import Profile, User
+from social_media_api.sparse import SparseFieldsMixin
+from user.models import Profile, User, FollowSuggestion
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
         fields = ["id", "email", "password", "is_staff", "profile"]
@@ -58,7 +59,7 @@ class FollowsSerializer(serializers.ModelSerializer):
         return instance.email
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(ProfileSerializer, self).validate(attrs)
         user = self.context["request"].user
@@ -71,7 +72,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         fields = ("id", "username", "bio")
 
 
-class FollowersProfileSerializer(serializers.ModelSerializer):
+class FollowersProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     followers = FollowsSerializer(many=True, read_only=True)
 
     class Meta:
@@ -79,7 +80,7 @@ class FollowersProfileSerializer(serializers.ModelSerializer):
         fields = ("followers",)
 
 
-class FollowingProfileSerializer(serializers.ModelSerializer):
+class FollowingProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     following = FollowsSerializer(many=True, read_only=True)
 
     class Meta:
@@ -87,7 +88,7 @@ class FollowingProfileSerializer(serializers.ModelSerializer):
         fields = ("following",)
 
 
-class ProfilePictureSerializer(serializers.ModelSerializer):
+class ProfilePictureSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = (
@@ -102,9 +103,50 @@ class ProfileListSerializer(ProfileSerializer):
 
     class Meta:
         model = Profile
-        fields = ("id", "username", "picture", "bio", "followers", "following")
-        read_only_fields = ("id", "picture")
+        fields = (
+            "id",
+            "username",
+            "picture",
+            "bio",
+            "posts_count",
+            "followers_count",
+            "following_count",
+            "followers",
+            "following",
+        )
+        read_only_fields = (
+            "id",
+            "picture",
+            "posts_count",
+            "followers_count",
+            "following_count",
+        )
 
 
 class ProfileDetailSerializer(ProfileListSerializer):
     pass
+
+
+class FollowSuggestionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    profile_id = serializers.IntegerField(source="suggested.profile.id", read_only=True)
+    username = serializers.CharField(
+        source="suggested.profile.username", read_only=True
+    )
+
+    class Meta:
+        model = FollowSuggestion
+        fields = ("profile_id", "username", "mutual_count")
+
+
+class ProfileAutocompleteSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Profile
+        fields = ("id", "username", "picture", "followers_count")
+
+
+class RelationshipSerializer(serializers.Serializer):
+    profile_id = serializers.IntegerField()
+    following = serializers.BooleanField()
+    followed_by = serializers.BooleanField()
+    mutual_count = serializers.IntegerField()
+    mutual_sample = serializers.ListField(child=serializers.CharField())
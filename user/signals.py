@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from user.models import FollowSuggestion, Profile
+from user.stats import adjust_counter
+from user.tasks import refresh_follow_suggestions
+
+
+@receiver(m2m_changed, sender=Profile.following.through)
+def refresh_suggestions_on_follow(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        if not pk_set:
+            return
+        user_ids = list(
+            Profile.objects.filter(pk__in=pk_set).values_list("user_id", flat=True)
+        )
+    else:
+        user_ids = [instance.user_id]
+        if action == "post_add":
+            FollowSuggestion.objects.filter(
+                user_id=instance.user_id, suggested_id__in=pk_set
+            ).delete()
+    for user_id in user_ids:
+        transaction.on_commit(
+            lambda user_id=user_id: refresh_follow_suggestions.enqueue(user_id)
+        )
+
+
+FOLLOW_COUNTERS = {
+    Profile.followers.through: "followers_count",
+    Profile.following.through: "following_count",
+}
+
+
+@receiver(m2m_changed, sender=Profile.followers.through)
+@receiver(m2m_changed, sender=Profile.following.through)
+def count_follows(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep follow counters in step with the m2m rows, bumping profile versions.
+    Removals are counted before the rows go, as pk_set may hold absent ids.
+    """
+    field = FOLLOW_COUNTERS[sender]
+    if action == "post_add" and pk_set:
+        if reverse:
+            adjust_counter(Profile.objects.filter(pk__in=pk_set), field, 1)
+        else:
+            adjust_counter(Profile.objects.filter(pk=instance.pk), field, len(pk_set))
+    elif action in ("pre_remove", "pre_clear"):
+        if reverse:
+            rows = sender.objects.filter(user_id=instance.pk)
+            if action == "pre_remove":
+                rows = rows.filter(profile_id__in=pk_set)
+            profile_ids = list(rows.values_list("profile_id", flat=True))
+            adjust_counter(Profile.objects.filter(pk__in=profile_ids), field, -1)
+        else:
+            rows = sender.objects.filter(profile_id=instance.pk)
+            if action == "pre_remove":
+                rows = rows.filter(user_id__in=pk_set)
+            adjust_counter(Profile.objects.filter(pk=instance.pk), field, -rows.count())
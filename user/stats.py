@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from user.models import Profile
+
+COUNTER_FIELDS = ("posts_count", "followers_count", "following_count")
+CHUNK_SIZE = 500
+
+
+def adjust_counter(queryset, field, delta) -> int:
+    """Shift a stored counter of the profiles in one UPDATE, bumping their version"""
+    if not delta:
+        return 0
+    return queryset.update(
+        **{field: Greatest(F(field) + delta, 0)},
+        version=F("version") + 1,
+        updated_at=timezone.now(),
+    )
+
+
+def actual_counts(profiles) -> dict:
+    """Counters of the profiles recounted from the rows they summarize"""
+    from social_network.models import ArchivedPost, Post
+
+    by_user = {profile.user_id: profile.pk for profile in profiles}
+    counts = {profile.pk: dict.fromkeys(COUNTER_FIELDS, 0) for profile in profiles}
+    for field, through in (
+        ("followers_count", Profile.followers.through),
+        ("following_count", Profile.following.through),
+    ):
+        rows = (
+            through.objects.filter(profile_id__in=counts)
+            .values_list("profile_id")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for profile_id, total in rows:
+            counts[profile_id][field] = total
+    for posts in (
+        Post.objects.filter(user_id__in=by_user, deleted_at__isnull=True),
+        ArchivedPost.objects.filter(user_id__in=by_user),
+    ):
+        rows = posts.values_list("user_id").annotate(total=Count("id")).order_by()
+        for user_id, total in rows:
+            counts[by_user[user_id]]["posts_count"] += total
+    return counts
+
+
+def reconcile_profiles(profile_ids) -> int:
+    """Fix drifted counters of the given profiles, returns how many changed"""
+    with transaction.atomic():
+        # Locked so concurrent increments land on top of the recount
+        profiles = list(
+            Profile.objects.select_for_update()
+            .filter(pk__in=profile_ids)
+            .only("user_id", *COUNTER_FIELDS)
+        )
+        counts = actual_counts(profiles)
+        drifted = []
+        for profile in profiles:
+            actual = counts[profile.pk]
+            if any(getattr(profile, name) != actual[name] for name in COUNTER_FIELDS):
+                for name in COUNTER_FIELDS:
+                    setattr(profile, name, actual[name])
+                profile.version = F("version") + 1
+                profile.updated_at = timezone.now()
+                drifted.append(profile)
+        Profile.objects.bulk_update(
+            drifted, [*COUNTER_FIELDS, "version", "updated_at"], batch_size=CHUNK_SIZE
+        )
+    return len(drifted)
+
+
+def reconcile_all_profiles(chunk_size=CHUNK_SIZE):
+    """Walk all profiles in id order chunk by chunk, yielding (checked, fixed)"""
+    last_id = 0
+    while True:
+        profile_ids = list(
+            Profile.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not profile_ids:
+            return
+        yield len(profile_ids), reconcile_profiles(profile_ids)
+        last_id = profile_ids[-1]
@@ -1,7 +1,9 @@
 from celery import shared_task
 
+from social_media_api.batching import batched_task
 from social_network.models import Post
 from user.models import User
+from user.recommendations import compute_all_suggestions, compute_suggestions
 
 
 @shared_task
@@ -11,3 +13,15 @@ def create_post(user_id: int) -> int:
     text = f"New post from user: {user.username}"
     Post.objects.create(user=user, title=title, text=text)
     return Post.objects.count()
+
+
+@shared_task
+def compute_follow_suggestions() -> int:
+    return compute_all_suggestions()
+
+
+@batched_task(max_size=200, flush_after=5)
+def refresh_follow_suggestions(user_ids: list) -> int:
+    user_ids = sorted(set(user_ids))
+    compute_suggestions(user_ids)
+    return len(user_ids)
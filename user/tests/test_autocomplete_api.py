@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import Profile
+
+AUTOCOMPLETE_URL = reverse("user:profile-autocomplete")
+
+
+class ProfileAutocompleteTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        names = ["Alice", "alex", "Albert", "bob", "al_deleted"]
+        self.users = [
+            get_user_model().objects.create_user(f"{name}@tests.com", "password")
+            for name in names
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=name, bio="bio")
+            for name, user in zip(names, self.users)
+        ]
+        Profile.objects.filter(pk=self.profiles[-1].pk).update(
+            deleted_at="2023-01-01T00:00:00Z"
+        )
+        self.profiles[1].followers.add(self.users[0], self.users[3])
+        self.profiles[2].followers.add(self.users[3])
+        self.client.force_authenticate(self.users[0])
+
+    def test_prefix_matches_ranked_by_followers(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "AL"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [(row["username"], row["followers_count"]) for row in res.data],
+            [("alex", 2), ("Albert", 1), ("Alice", 0)],
+        )
+
+    def test_limit_and_empty_prefix(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "al", "limit": 1})
+        self.assertEquals([row["username"] for row in res.data], ["alex"])
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": " "})
+        self.assertEquals(res.data, [])
+
+    def test_non_ascii_prefix_matches_any_case(self):
+        user = get_user_model().objects.create_user("elise@tests.com", "password")
+        Profile.objects.create(user=user, username="Élise", bio="bio")
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "é"})
+
+        self.assertEquals([row["username"] for row in res.data], ["Élise"])
+
+    def test_renamed_profile_is_found_by_its_new_name(self):
+        profile = self.profiles[3]
+        profile.username = "Zoë"
+        profile.save(update_fields=["username"])
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "ZO"})
+
+        self.assertEquals([row["username"] for row in res.data], ["Zoë"])
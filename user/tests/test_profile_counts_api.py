@@ -0,0 +1,102 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.deletion import soft_delete
+from social_network.models import Post
+from user.models import Profile
+from user.stats import reconcile_profiles
+
+PROFILES_URL = reverse("user:profile-list")
+
+
+def follow_url(profile_id):
+    return reverse("user:profile-detail", args=[profile_id]) + "follow_unfollow/"
+
+
+class ProfileCountsTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(f"{name}@tests.com", "password")
+            for name in ("a", "b", "c")
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=user.email[0], bio="bio")
+            for user in self.users
+        ]
+        self.client.force_authenticate(self.users[0])
+
+    def counts(self, profile):
+        profile.refresh_from_db()
+        return profile.posts_count, profile.followers_count, profile.following_count
+
+    def test_follow_and_unfollow_update_counts(self):
+        self.client.post(follow_url(self.profiles[1].id))
+        self.client.force_authenticate(self.users[2])
+        self.client.post(follow_url(self.profiles[1].id))
+
+        self.assertEquals(self.counts(self.profiles[1]), (0, 2, 0))
+        self.assertEquals(self.counts(self.profiles[0]), (0, 0, 1))
+
+        self.client.post(follow_url(self.profiles[1].id))
+        self.profiles[1].followers.remove(self.users[2])
+
+        self.assertEquals(self.counts(self.profiles[1]), (0, 1, 0))
+        self.assertEquals(self.counts(self.profiles[2]), (0, 0, 0))
+
+    def test_posts_count_follows_create_and_soft_delete(self):
+        posts = [
+            Post.objects.create(user=self.users[0], title=f"t{i}", text="text")
+            for i in range(3)
+        ]
+        soft_delete("post", posts[0])
+        soft_delete("post", posts[0])
+        posts[1].delete()
+
+        self.assertEquals(self.counts(self.profiles[0]), (1, 0, 0))
+
+    def test_user_soft_delete_leaves_nothing_to_reconcile(self):
+        posts = [
+            Post.objects.create(user=self.users[1], title=f"t{i}", text="text")
+            for i in range(3)
+        ]
+        soft_delete("post", posts[0])
+
+        soft_delete("user", self.users[1])
+
+        self.assertEquals(self.counts(self.profiles[1]), (0, 0, 0))
+        self.assertEquals(reconcile_profiles([self.profiles[1].id]), 0)
+
+    def test_ordering_and_min_filters(self):
+        self.profiles[2].followers.add(self.users[0], self.users[1])
+        self.profiles[1].followers.add(self.users[0])
+
+        res = self.client.get(PROFILES_URL, {"ordering": "-followers_count"})
+        self.assertEquals(
+            [(row["username"], row["followers_count"]) for row in res.data["results"]],
+            [("c", 2), ("b", 1), ("a", 0)],
+        )
+
+        res = self.client.get(PROFILES_URL, {"min_followers": 1, "ordering": "id"})
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(PROFILES_URL, {"min_followers": 2})
+        self.assertEquals([row["username"] for row in res.data["results"]], ["c"])
+
+    def test_reconcile_fixes_drifted_counts(self):
+        Post.objects.create(user=self.users[1], title="t", text="text")
+        self.profiles[1].followers.add(self.users[0])
+        Profile.objects.update(posts_count=7, followers_count=0, following_count=3)
+
+        out = StringIO()
+        call_command("reconcile_profile_counts", chunk_size=2, stdout=out)
+
+        self.assertIn("Checked 3 profiles, fixed 3", out.getvalue())
+        self.assertEquals(self.counts(self.profiles[1]), (1, 1, 0))
+        self.assertEquals(self.counts(self.profiles[0]), (0, 0, 0))
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import Profile
+
+RELATIONSHIPS_URL = reverse("user:profile-relationships")
+
+
+def mutual_followers_url(profile_id):
+    return reverse("user:profile-mutual-followers", args=[profile_id])
+
+
+class RelationshipTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(f"user{i}@tests.com", "password")
+            for i in range(7)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"user{i}", bio="bio")
+            for i, user in enumerate(self.users)
+        ]
+        self.client.force_authenticate(self.users[0])
+
+    def follow(self, follower, followed):
+        self.profiles[followed].followers.add(self.users[follower])
+        self.profiles[follower].following.add(self.users[followed])
+
+    def test_flags_and_mutual_sample_for_batch(self):
+        for followed in (1, 2, 3, 4):
+            self.follow(0, followed)
+        for follower in (1, 2, 3, 4, 6):
+            self.follow(follower, 5)
+        self.follow(6, 4)
+        self.follow(1, 0)
+        self.follow(2, 1)
+
+        res = self.client.get(
+            RELATIONSHIPS_URL,
+            {"ids": f"{self.profiles[1].id},{self.profiles[5].id},999"},
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        first, second = res.data
+        self.assertEquals(
+            first,
+            {
+                "profile_id": self.profiles[1].id,
+                "following": True,
+                "followed_by": True,
+                "mutual_count": 1,
+                "mutual_sample": ["user2"],
+            },
+        )
+        self.assertEquals(second["following"], False)
+        self.assertEquals(second["mutual_count"], 4)
+        # Ranked by how followed the mutuals are
+        self.assertEquals(second["mutual_sample"], ["user1", "user4", "user2"])
+
+    def test_mutual_followers_list(self):
+        for followed in (1, 2, 3):
+            self.follow(0, followed)
+        for follower in (1, 3, 4):
+            self.follow(follower, 5)
+
+        res = self.client.get(mutual_followers_url(self.profiles[5].id))
+
+        self.assertEquals(
+            [row["username"] for row in res.data["results"]], ["user1", "user3"]
+        )
+
+    def test_invalid_and_oversized_batches_rejected(self):
+        res = self.client.get(RELATIONSHIPS_URL, {"ids": "1,a"})
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        ids = ",".join(str(i) for i in range(1, 102))
+        res = self.client.get(RELATIONSHIPS_URL, {"ids": ids})
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
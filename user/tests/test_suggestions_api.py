@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import FollowSuggestion, Profile
+from user.recommendations import compute_all_suggestions
+
+SUGGESTIONS_URL = reverse("user:profile-suggestions")
+
+
+class FollowSuggestionTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(f"user{i}@tests.com", "password")
+            for i in range(5)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"user{i}", bio="bio")
+            for i, user in enumerate(self.users)
+        ]
+        self.client.force_authenticate(self.users[0])
+
+    def follow(self, follower, followed):
+        self.profiles[follower].following.add(self.users[followed])
+
+    def test_suggestions_ranked_by_mutual_follows(self):
+        self.follow(0, 1)
+        self.follow(0, 2)
+        self.follow(1, 3)
+        self.follow(2, 3)
+        self.follow(2, 4)
+        self.follow(1, 0)
+
+        compute_all_suggestions(chunk_size=2)
+        res = self.client.get(SUGGESTIONS_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            res.data,
+            [
+                {
+                    "profile_id": self.profiles[3].id,
+                    "username": "user3",
+                    "mutual_count": 2,
+                },
+                {
+                    "profile_id": self.profiles[4].id,
+                    "username": "user4",
+                    "mutual_count": 1,
+                },
+            ],
+        )
+
+    def test_following_drops_suggestion(self):
+        self.follow(0, 1)
+        self.follow(1, 3)
+        compute_all_suggestions()
+
+        follow_url = (
+            reverse("user:profile-detail", args=[self.profiles[3].id])
+            + "follow_unfollow/"
+        )
+        self.client.post(follow_url)
+
+        self.assertFalse(
+            FollowSuggestion.objects.filter(
+                user=self.users[0], suggested=self.users[3]
+            ).exists()
+        )
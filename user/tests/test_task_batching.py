@@ -0,0 +1,82 @@
+from unittest import mock
+
+import fakeredis
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from social_media_api.batching import BatchedTask
+from user.models import FollowSuggestion, Profile
+from user.tasks import refresh_follow_suggestions
+
+
+class BatchedTaskTests(TestCase):
+    def setUp(self) -> None:
+        self.users = [
+            get_user_model().objects.create_user(f"user{i}@tests.com", "password")
+            for i in range(3)
+        ]
+        self.profiles = [
+            Profile.objects.create(user=user, username=f"user{i}", bio="bio")
+            for i, user in enumerate(self.users)
+        ]
+        self.profiles[0].following.add(self.users[1])
+        self.profiles[1].following.add(self.users[2])
+
+        self.server = fakeredis.FakeServer()
+        patches = [
+            mock.patch.object(
+                BatchedTask, "redis_client", fakeredis.FakeRedis(server=self.server)
+            ),
+            mock.patch.object(refresh_follow_suggestions.task, "delay"),
+            mock.patch.object(refresh_follow_suggestions.task, "apply_async"),
+        ]
+        self.delay, self.apply_async = [patch.start() for patch in patches][1:]
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+    def test_items_flushed_in_one_execution(self):
+        for user in (self.users[0], self.users[1], self.users[0]):
+            refresh_follow_suggestions.enqueue(user.id)
+
+        self.apply_async.assert_called_once_with(countdown=5)
+        self.delay.assert_not_called()
+
+        self.assertEquals(refresh_follow_suggestions.task(), 2)
+        self.assertEquals(
+            list(FollowSuggestion.objects.values_list("user_id", "suggested_id")),
+            [(self.users[0].id, self.users[2].id)],
+        )
+        self.assertIsNone(refresh_follow_suggestions.task())
+
+    def test_full_batch_flushed_right_away(self):
+        with mock.patch.object(refresh_follow_suggestions, "max_size", 2):
+            refresh_follow_suggestions.enqueue(self.users[0].id)
+            refresh_follow_suggestions.enqueue(self.users[1].id)
+
+        self.delay.assert_called_once_with()
+
+    def test_item_sent_alone_when_redis_is_down(self):
+        self.server.connected = False
+
+        refresh_follow_suggestions.enqueue(self.users[0].id)
+
+        self.delay.assert_called_once_with([self.users[0].id])
+
+    def test_failed_batch_is_put_back_in_order(self):
+        for user in self.users:
+            refresh_follow_suggestions.enqueue(user.id)
+        self.apply_async.reset_mock()
+
+        with mock.patch.object(
+            refresh_follow_suggestions, "func", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                refresh_follow_suggestions.task()
+
+        self.apply_async.assert_called_once_with(countdown=5)
+        self.assertEquals(
+            refresh_follow_suggestions.get_redis().lrange(
+                refresh_follow_suggestions.key, 0, -1
+            ),
+            [str(user.id).encode() for user in self.users],
+        )
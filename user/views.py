@@ -1,4 +1,7 @@
-from drf_spectacular.utils import extend_schema
+from collections import defaultdict
+
+from django.db.models import Prefetch
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import generics, viewsets, status
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.decorators import action
@@ -9,8 +12,25 @@ from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from user.models import Profile
+from social_media_api.cache import CachedRetrieveMixin, TwoTierCache
+from social_media_api.conditional import ConditionalGetMixin
+from social_media_api.fast_render import FastListMixin
+from social_media_api.idempotency import IdempotencyMixin
+from social_media_api.sparse import SparseQuerysetMixin, parse_list_param
+from social_media_api.throttling import ActionTokenBucketThrottle
+from social_network.deletion import soft_delete
+from user.models import Profile, User
 from user.permissions import IsOwnerOrIsAdminOrReadOnly
+from user.relationships import (
+    MAX_BATCH,
+    mutual_followers_of,
+    profile_relationships,
+)
+from user.search import (
+    AUTOCOMPLETE_LIMIT,
+    AUTOCOMPLETE_MAX_LIMIT,
+    autocomplete_profiles,
+)
 from user.serializers import (
     UserSerializer,
     ProfileListSerializer,
@@ -20,7 +40,11 @@ from user.serializers import (
     FollowersProfileSerializer,
     FollowingProfileSerializer,
     AuthTokenSerializer,
+    FollowSuggestionSerializer,
+    ProfileAutocompleteSerializer,
+    RelationshipSerializer,
 )
+from user.stats import COUNTER_FIELDS
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -33,13 +57,16 @@ class CreateTokenView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
         return self.request.user
 
+    def perform_destroy(self, instance):
+        soft_delete("user", instance)
+
 
 @extend_schema(description="Endpoint for logout user from the system")
 class LogoutView(APIView):
@@ -56,28 +83,128 @@ class LogoutView(APIView):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
 
+COUNTER_FILTERS = {
+    "min_posts": "posts_count",
+    "min_followers": "followers_count",
+    "min_following": "following_count",
+}
+PROFILE_CACHE = TwoTierCache("profiles", ttl=300)
+
+
 @extend_schema(
     description="This endpoint gives user opportunity to manage own profile and view others"
 )
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(
+    IdempotencyMixin,
+    ConditionalGetMixin,
+    CachedRetrieveMixin,
+    FastListMixin,
+    SparseQuerysetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
     permission_classes = (IsOwnerOrIsAdminOrReadOnly, IsAuthenticated)
+    fast_list_fields = (
+        ("id", "id"),
+        ("username", "username"),
+        ("picture", "picture"),
+        ("bio", "bio"),
+        ("posts_count", "posts_count"),
+        ("followers_count", "followers_count"),
+        ("following_count", "following_count"),
+        ("followers", None),
+        ("following", None),
+    )
+    idempotent_actions = ("create", "follow_unfollow")
+    retrieve_cache = PROFILE_CACHE
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.queryset.filter(deleted_at__isnull=True)
 
         """Filtering by username"""
 
         username = self.request.query_params.get("username")
         if username:
             queryset = queryset.filter(username__icontains=username)
+
+        """Filtering and ordering by the stored counters"""
+
+        for param, field in COUNTER_FILTERS.items():
+            minimum = self.request.query_params.get(param)
+            if minimum:
+                try:
+                    queryset = queryset.filter(**{f"{field}__gte": int(minimum)})
+                except ValueError:
+                    raise ValidationError(f"{param} must be an integer")
+        ordering = self.request.query_params.get("ordering")
+        if ordering:
+            if ordering.lstrip("-") not in COUNTER_FIELDS:
+                raise ValidationError(
+                    f"ordering must be one of {', '.join(COUNTER_FIELDS)}"
+                )
+            queryset = queryset.order_by(ordering, "id")
         return (
             queryset.select_related("user")
-            .prefetch_related("following", "followers")
+            .prefetch_related(
+                Prefetch("following", queryset=User.objects.order_by("id")),
+                Prefetch("followers", queryset=User.objects.order_by("id")),
+            )
             .distinct()
         )
 
+    # Only for documentation purposes
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "username",
+                type={"type": "string"},
+                description="Filter by username (ex. ?username=al)",
+            ),
+            OpenApiParameter(
+                "ordering",
+                type={"type": "string"},
+                description=(
+                    "Order by posts_count, followers_count or following_count, "
+                    "prefix with - for descending (ex. ?ordering=-followers_count)"
+                ),
+            ),
+            *(
+                OpenApiParameter(
+                    param,
+                    type={"type": "integer"},
+                    description=f"Minimal {field} (ex. ?{param}=10)",
+                )
+                for param, field in COUNTER_FILTERS.items()
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def fast_list_rows(self, rows):
+        profile_ids = [row["id"] for row in rows]
+        for key in ("followers", "following"):
+            emails = defaultdict(list)
+            through = getattr(Profile, key).through.objects.filter(
+                profile_id__in=profile_ids
+            )
+            for profile_id, email in through.order_by("user_id").values_list(
+                "profile_id", "user__email"
+            ):
+                emails[profile_id].append(email)
+            for row in rows:
+                row[key] = emails[row["id"]]
+        storage = Profile._meta.get_field("picture").storage
+        for row in rows:
+            if row["picture"]:
+                row["picture"] = self.request.build_absolute_uri(
+                    storage.url(row["picture"])
+                )
+            else:
+                row["picture"] = None
+        return rows
+
     def get_serializer_class(self):
         if self.action == "list":
             return ProfileListSerializer
@@ -88,6 +215,9 @@ class ProfileViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        soft_delete("profile", instance)
+
     @action(
         methods=["GET"],
         detail=False,
@@ -99,6 +229,97 @@ class ProfileViewSet(viewsets.ModelViewSet):
         serializer = self.serializer_class(profile)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="suggestions",
+        serializer_class=FollowSuggestionSerializer,
+    )
+    def suggestions(self, request, pk=None):
+        """Endpoint for precomputed profiles to follow"""
+        queryset = request.user.follow_suggestions.select_related("suggested__profile")
+        serializer = self.serializer_class(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type={"type": "string"},
+                description="Username prefix, case insensitive (ex. ?q=al)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type={"type": "integer"},
+                description="Number of profiles to return (ex. ?limit=5)",
+            ),
+        ]
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="autocomplete",
+        serializer_class=ProfileAutocompleteSerializer,
+    )
+    def autocomplete(self, request, pk=None):
+        """Endpoint for most followed profiles matching a username prefix"""
+        try:
+            limit = int(request.query_params.get("limit", AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            raise ValidationError("Limit must be an integer")
+        limit = min(max(limit, 0), AUTOCOMPLETE_MAX_LIMIT)
+        queryset = autocomplete_profiles(request.query_params.get("q", ""), limit)
+        serializer = self.serializer_class(
+            queryset, many=True, context={"request": request}
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "ids",
+                type={"type": "string"},
+                description=f"Up to {MAX_BATCH} comma separated profile ids (ex. ?ids=1,2)",
+            ),
+        ]
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="relationships",
+        serializer_class=RelationshipSerializer,
+    )
+    def relationships(self, request, pk=None):
+        """Endpoint for follow flags and mutual followers of a batch of profiles"""
+        try:
+            profile_ids = {int(item) for item in parse_list_param(request, "ids")}
+        except ValueError:
+            raise ValidationError("ids must be comma separated integers")
+        if len(profile_ids) > MAX_BATCH:
+            raise ValidationError(f"Up to {MAX_BATCH} ids can be asked at once")
+        serializer = self.serializer_class(
+            profile_relationships(request.user, profile_ids), many=True
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="mutual_followers",
+        serializer_class=ProfileAutocompleteSerializer,
+    )
+    def mutual_followers(self, request, pk=None):
+        """Endpoint for paginated profiles you follow that follow this profile"""
+        profile = self.get_object()
+        queryset = mutual_followers_of(request.user, profile).only(
+            "id", "username", "picture", "followers_count"
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.serializer_class(
+            page, many=True, context={"request": request}
+        )
+        return self.get_paginated_response(serializer.data)
+
     @action(
         methods=["GET"],
         detail=True,
@@ -128,6 +349,7 @@ class ProfileViewSet(viewsets.ModelViewSet):
         detail=True,
         url_path="follow_unfollow",
         permission_classes=[IsAuthenticated],
+        throttle_classes=[ActionTokenBucketThrottle],
     )
     def follow_unfollow(self, request, pk=None):
         """Endpoint for following & unfollowing profile"""